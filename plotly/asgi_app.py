@@ -0,0 +1,134 @@
+"""
+AI成熟度模型可视化服务器的ASGI入口
+
+把 server.py 中的Flask应用（路由完全相同）通过a2wsgi包装为ASGI应用，由asyncio事件循环（uvicorn）接收连接：
+几百个同时打开页面的浏览器及其keep-alive连接只占用事件循环中的协程，而不是各占一个线程。
+请求在a2wsgi的固定大小线程池中执行，读取文件等阻塞I/O不会阻塞事件循环；
+同时处理的请求数由信号量限制，超出的请求排队等待，而不是被拒绝或耗尽内存。
+实时刷新的 /events 事件流直接在事件循环中提供，不占用信号量名额和线程池线程。
+
+    python start_server.py --asgi
+    uvicorn asgi_app:app --app-dir plotly
+"""
+
+import asyncio
+import os
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.wsgi import FileWrapper
+
+from server import (LIVE_RELOAD, LIVE_RELOAD_HEARTBEAT, app as flask_app, live_reload_clients, live_reload_lock,
+                    preload_artifacts, start_live_reload)
+
+# 同时处理的请求数上限，超出的请求在事件循环中排队
+MAX_CONCURRENCY = int(os.environ.get('SERVER_ASGI_CONCURRENCY', 256))
+
+# 执行Flask视图的线程数（每个进程）
+THREADS = int(os.environ.get('SERVER_ASGI_THREADS', 32))
+
+# 大文件（超出产物缓存）每次读取的块大小，每块只需一次线程与事件循环之间的往返
+FILE_CHUNK_SIZE = 256 * 1024
+
+semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+def file_wrapper(file, buffer_size=8192):
+    """wsgi.file_wrapper reading send_file() bodies in large blocks"""
+    return FileWrapper(file, max(buffer_size, FILE_CHUNK_SIZE))
+
+def wsgi_app(environ, start_response):
+    """The Flask app, with large-block file reads and without its own Date header"""
+    environ['wsgi.file_wrapper'] = file_wrapper
+
+    def start(status, headers, exc_info=None):
+        # Date由服务器添加（werkzeug的条件响应也会设置，避免重复）
+        return start_response(status, [(name, value) for name, value in headers if name.lower() != 'date'], exc_info)
+
+    return flask_app(environ, start)
+
+wsgi = WSGIMiddleware(wsgi_app, workers=THREADS)
+
+async def wait_disconnect(receive):
+    """Return when the client goes away"""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+class EventClient:
+    """Live reload client of an /events stream, fed by server.publish() from the watcher thread"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.messages = asyncio.Queue()
+
+    def put(self, message):
+        # publish()在文件监视线程中调用，把消息交给事件循环
+        self.loop.call_soon_threadsafe(self.messages.put_nowait, message)
+
+async def handle_events(receive, send):
+    """Live reload event stream (see server.live_reload_events), served on the event loop
+
+    An open stream lasts as long as the page, so it holds neither a semaphore
+    slot nor a thread pool thread; it only costs a coroutine and a queue.
+    """
+    start_live_reload()
+    client = EventClient(asyncio.get_running_loop())
+    with live_reload_lock:
+        live_reload_clients.add(client)
+    watcher = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                # 禁止反向代理缓冲事件流
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        # 断线后浏览器在1秒后自动重连
+        await send({'type': 'http.response.body', 'body': b'retry: 1000\n\n', 'more_body': True})
+        while True:
+            message = asyncio.ensure_future(client.messages.get())
+            finished, _ = await asyncio.wait({message, watcher}, timeout=LIVE_RELOAD_HEARTBEAT,
+                                             return_when=asyncio.FIRST_COMPLETED)
+            if message not in finished:
+                message.cancel()
+            if watcher in finished:
+                return
+            # 没有事件时定期发送注释行，以便及时发现断开的连接
+            text = message.result() if message in finished else ': keep-alive\n\n'
+            await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+    finally:
+        watcher.cancel()
+        with live_reload_lock:
+            live_reload_clients.discard(client)
+
+async def handle_lifespan(receive, send):
+    """Preload the artifacts when the worker starts, release the thread pool when it stops"""
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                count = await loop.run_in_executor(wsgi.executor, preload_artifacts)
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            print(f"✅ 进程 {os.getpid()} 已预加载 {count} 个产物到内存缓存")
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            wsgi.executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'http' and LIVE_RELOAD and scope['path'] == '/events' and scope['method'] == 'GET':
+        await handle_events(receive, send)
+    elif scope['type'] == 'http':
+        async with semaphore:
+            await wsgi(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await handle_lifespan(receive, send)
+    else:
+        await wsgi(scope, receive, send)
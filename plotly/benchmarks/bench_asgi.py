@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Compare the serving modes under many concurrent connections.
+
+Starts start_server.py in each mode on a free local port: the Flask
+development server (the default mode), --production (gunicorn gthread, or
+werkzeug's threaded server without gunicorn) and --asgi (uvicorn). Each mode
+is then loaded with 100, 500 and 1000 concurrent keep-alive connections,
+like a room of browsers opening /interactive_en at once. The client is a
+single asyncio process, so it can hold a thousand connections
+without a thousand threads. It reports requests per second, p50/p99
+latency and the failed requests (connection errors and timeouts) of every
+mode and concurrency level.
+
+The charts must have been built first (python script/build_all.py).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from bench_server import ACCEPT_ENCODING, start_server, stop_server
+
+# Mode -> start_server.py arguments
+MODES = {
+    'dev': [],
+    'production': ['--production'],
+    'asgi': ['--asgi'],
+}
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, body length, whether the connection stays open)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        length = 0
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+            await reader.readexactly(size + 2)
+            length += size
+            if size == 0:
+                break
+    else:
+        length = int(headers.get('content-length', 0))
+        await reader.readexactly(length)
+    keep_alive = headers.get('connection', '').lower() != 'close' and lines[0].startswith('HTTP/1.1')
+    return status, length, keep_alive
+
+async def client(host, port, request, counter, latencies, statuses, errors, timeout):
+    """One keep-alive connection sending requests back to back until the shared counter runs out"""
+    reader = writer = None
+    while counter[0] > 0:
+        counter[0] -= 1
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.write(request)
+            status, _, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+async def run_load(host, port, path, connections, requests, timeout):
+    """Send requests to path from this many concurrent connections"""
+    request = (f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n'
+               f'Accept-Encoding: {ACCEPT_ENCODING}\r\nConnection: keep-alive\r\n\r\n').encode('latin-1')
+    counter = [requests]
+    latencies = []
+    statuses = {}
+    errors = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, request, counter, latencies, statuses, errors, timeout)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'connections': connections,
+        'requests': len(latencies),
+        'failed': sum(errors.values()),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else None,
+        'statuses': statuses,
+        'errors': errors,
+    }
+
+def format_ms(value):
+    return f'{value:9.1f}' if value is not None else f"{'-':>9}"
+
+def print_table(results, path):
+    """Print the comparison table"""
+    header = f"{'mode':<12} {'connections':>11} {'requests':>9} {'failed':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}"
+    print(f"\nGET {path}")
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(f"{result['mode']:<12} {result['connections']:>11} {result['requests']:>9} {result['failed']:>7} "
+              f"{result['rps']:>9.0f} {format_ms(result['p50_ms'])} {format_ms(result['p99_ms'])}")
+
+def main(modes=None, connections=None, requests_per_connection=5, path='/interactive_en', workers=None,
+         timeout=30.0, json_output=None):
+    """Load every mode at every concurrency level and print the table"""
+    modes = modes or list(MODES)
+    connections = connections or [100, 500, 1000]
+    workers = workers or os.cpu_count() or 1
+    results = []
+    for mode in modes:
+        args = MODES[mode] + (['--workers', str(workers)] if mode != 'dev' else [])
+        try:
+            process, url = start_server(args)
+        except RuntimeError as e:
+            print(f"{mode}: {e}", file=sys.stderr)
+            continue
+        try:
+            host, port = url.rsplit('//', 1)[1].split(':')
+            # Warm the connection handling and caches of every worker
+            asyncio.run(run_load(host, int(port), path, 10, 100, timeout))
+            for count in connections:
+                result = asyncio.run(run_load(host, int(port), path, count, count * requests_per_connection, timeout))
+                result['mode'] = mode
+                results.append(result)
+                print(f"  {mode:<12} {count:>5} connections: {result['rps']:.0f} req/s, {result['failed']} failed")
+        finally:
+            stop_server(process)
+
+    print_table(results, path)
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'workers': workers, 'results': results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the dev, production and ASGI serving modes at 100/500/1000 concurrent connections')
+    parser.add_argument(
+        '--modes',
+        nargs='+',
+        choices=list(MODES),
+        help='Modes to compare (default: all)'
+    )
+    parser.add_argument(
+        '--connections', '-c',
+        nargs='+',
+        type=int,
+        help='Concurrent connection counts (default: 100 500 1000)'
+    )
+    parser.add_argument(
+        '--requests-per-connection', '-n',
+        type=int,
+        default=5,
+        help='Requests per connection at each level (default: 5)'
+    )
+    parser.add_argument(
+        '--path',
+        default='/interactive_en',
+        help='Route to request (default: /interactive_en)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Worker processes of the production and ASGI modes (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=30.0,
+        help='Seconds before a request counts as failed (default: 30)'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the raw results as JSON'
+    )
+
+    args = parser.parse_args()
+
+    main(args.modes, args.connections, args.requests_per_connection, args.path, args.workers, args.timeout, args.json)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the vectorized aggregation of saved assessments.
+
+Generates synthetic assessments of the real model: each assessor has a
+maturity between L0 and L5 and has completed most capabilities below it and
+a few above. They become (assessment, capability ID) pairs, the rows of the
+server's progress table. For 1k, 10k and 100k assessments it times:
+
+* matrix: the pairs to the capability × assessment boolean matrix
+  (assessment_stats.assessment_matrix);
+* aggregate: every statistic of assessment_stats.aggregate;
+* json: the statistics serialized as the server endpoint sends them;
+* python loop: the per-capability and per-cell counts computed with
+  dicts and a loop over the pairs, for comparison (--no-baseline to skip).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'script'))
+
+from assessment_stats import MODEL_FILES, aggregate, assessment_matrix, capability_rows, to_json
+from model_snapshot import load_model
+
+DEFAULT_COUNTS = [1000, 10000, 100000]
+
+def synthetic_pairs(rows, assessments, seed=0):
+    """(assessment IDs, capability IDs) of synthetic assessments, one item per completed capability"""
+    rng = np.random.default_rng(seed)
+    maturity = rng.uniform(0, rows['level'].max() + 1, assessments)
+    # Likely below the assessor's maturity, unlikely above it
+    probability = np.clip(maturity[None, :] - rows['level'][:, None], 0.05, 0.95)
+    row, column = np.nonzero(rng.random((len(rows['ids']), assessments)) < probability)
+    names = np.array([f'team-{index:06d}' for index in range(assessments)], dtype=object)
+    return names[column], rows['ids'].to_numpy()[row]
+
+def python_loop(rows, assessment_ids, capability_ids):
+    """Per-capability and per-(assessment, cell) counts with dicts, as without NumPy"""
+    cell_of = {}
+    for start, cell in zip(rows['cell_starts'], rows['cells']):
+        cell_of[start] = cell
+    capability_cell = {}
+    cell = None
+    for index, capability_id in enumerate(rows['ids']):
+        cell = cell_of.get(index, cell)
+        capability_cell[capability_id] = cell
+    completed = {}
+    cell_counts = {}
+    for assessment_id, capability_id in zip(assessment_ids, capability_ids):
+        cell = capability_cell.get(capability_id)
+        if cell is None:
+            continue
+        completed[capability_id] = completed.get(capability_id, 0) + 1
+        key = (assessment_id, cell)
+        cell_counts[key] = cell_counts.get(key, 0) + 1
+    return completed, cell_counts
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def measure(model, rows, assessments, baseline):
+    """Timings of every stage for this many assessments"""
+    assessment_ids, capability_ids = synthetic_pairs(rows, assessments)
+    (matrix, _, _), matrix_seconds = timed(assessment_matrix, rows, assessment_ids, capability_ids)
+    stats, aggregate_seconds = timed(aggregate, model, rows, matrix)
+    _, json_seconds = timed(lambda: json.dumps(to_json(stats), ensure_ascii=False))
+    result = {
+        'assessments': assessments,
+        'pairs': len(capability_ids),
+        'matrix_bytes': matrix.nbytes,
+        'matrix_seconds': matrix_seconds,
+        'aggregate_seconds': aggregate_seconds,
+        'json_seconds': json_seconds,
+        'python_loop_seconds': None,
+    }
+    if baseline:
+        _, result['python_loop_seconds'] = timed(python_loop, rows, assessment_ids, capability_ids)
+    return result
+
+def format_ms(seconds):
+    return f'{seconds * 1000:>11.1f}' if seconds is not None else f"{'-':>11}"
+
+def print_table(results):
+    """Print the benchmark table"""
+    header = (f"{'assessments':>11} {'pairs':>10} {'matrix MiB':>10} {'matrix ms':>11} {'aggregate ms':>12} "
+              f"{'json ms':>11} {'total ms':>11} {'loop ms':>11}")
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        total = result['matrix_seconds'] + result['aggregate_seconds'] + result['json_seconds']
+        print(f"{result['assessments']:>11} {result['pairs']:>10} {result['matrix_bytes'] / 2 ** 20:>10.1f} "
+              f"{format_ms(result['matrix_seconds'])} {result['aggregate_seconds'] * 1000:>12.1f} "
+              f"{format_ms(result['json_seconds'])} {format_ms(total)} {format_ms(result['python_loop_seconds'])}")
+
+def main(counts=None, locale='en', baseline=True, json_output=None):
+    """Benchmark every assessment count and print the table"""
+    model = load_model(MODEL_FILES[locale])
+    rows = capability_rows(model)
+    # Warm up pandas and NumPy
+    measure(model, rows, 100, False)
+    results = [measure(model, rows, count, baseline) for count in counts or DEFAULT_COUNTS]
+
+    print(f"{len(rows['ids'])} capabilities ({locale} model)")
+    print_table(results)
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time the vectorized aggregation of 1k-100k saved assessments')
+    parser.add_argument(
+        '--counts', '-n',
+        nargs='+',
+        type=int,
+        help='Assessment counts (default: 1000 10000 100000)'
+    )
+    parser.add_argument(
+        '--locale', '-l',
+        choices=list(MODEL_FILES),
+        default='en',
+        help='Model of the synthetic assessments (default: en)'
+    )
+    parser.add_argument(
+        '--no-baseline',
+        action='store_true',
+        help='Skip the pure Python comparison'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the raw results as JSON'
+    )
+
+    args = parser.parse_args()
+
+    main(args.counts, args.locale, not args.no_baseline, args.json)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark of the in-memory model representation.
+
+For the real models and synthetic models of growing size, compares the
+memory retained by the nested dicts returned by json.load() with the
+MaturityModel the generators now use (see maturity_model.py), and times
+a lookup of every (dimension, level) cell in both. The capability texts of
+a MaturityModel are memory-mapped from its snapshot and, like any
+file-backed pages, are not counted as heap.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.join(BENCHMARK_DIR, '..', 'script')
+RESOURCE_DIR = os.path.join(BENCHMARK_DIR, '..', '..', 'resource')
+sys.path.insert(0, SCRIPT_DIR)
+
+from bench_scaling import parse_size
+from model_snapshot import load_model
+from synthetic_model import generate_model
+
+REAL_MODELS = ['model_of_level.json', 'model_of_level_en.json']
+
+DEFAULT_SIZES = ['5x6x4', '20x8x8', '40x10x8']
+
+def retained_bytes(load):
+    """Bytes still allocated after load() returns, while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = load()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+def load_json(model_file):
+    with open(model_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def dict_lookups(model, cells):
+    for dimension, level in cells:
+        level_data = model['levels'][level]
+        level_data.get('capabilities', {}).get(dimension)
+
+def model_lookups(model, cells):
+    for dimension, level in cells:
+        model.capabilities(dimension, level)
+
+def best_time(function, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def measure(label, model_file):
+    """Retained memory and cell lookup time of both representations of a model file"""
+    # Compile the snapshot first so that only loading is measured
+    load_model(model_file)
+    raw, dict_bytes = retained_bytes(lambda: load_json(model_file))
+    model, model_bytes = retained_bytes(lambda: load_model(model_file))
+    cells = [(dimension.name, level.key) for dimension in model.dimensions for level in model.levels]
+    return {
+        'model': label,
+        'capabilities': len(model),
+        'dict_bytes': dict_bytes,
+        'model_bytes': model_bytes,
+        'dict_lookup_seconds': best_time(dict_lookups, raw, cells),
+        'model_lookup_seconds': best_time(model_lookups, model, cells),
+        'cells': len(cells),
+    }
+
+def print_table(results):
+    """Print the memory table"""
+    header = f"{'model':<24} {'capabilities':>12} {'dict KiB':>10} {'model KiB':>10} {'ratio':>6} {'dict us/cell':>13} {'model us/cell':>14}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        ratio = result['dict_bytes'] / result['model_bytes'] if result['model_bytes'] else float('inf')
+        print(f"{result['model']:<24} {result['capabilities']:>12} {result['dict_bytes'] / 1024:>10.1f} "
+              f"{result['model_bytes'] / 1024:>10.1f} {ratio:>6.1f} "
+              f"{result['dict_lookup_seconds'] / result['cells'] * 1e6:>13.2f} "
+              f"{result['model_lookup_seconds'] / result['cells'] * 1e6:>14.2f}")
+
+def main(sizes, string_length=40, json_output=None):
+    """Measure the real models and every synthetic size"""
+    results = [measure(name, os.path.join(RESOURCE_DIR, name)) for name in REAL_MODELS]
+    with tempfile.TemporaryDirectory() as work_dir:
+        for dimensions, levels, capabilities in sizes:
+            model_file = os.path.join(work_dir, f'{dimensions}x{levels}x{capabilities}.json')
+            with open(model_file, 'w', encoding='utf-8') as f:
+                json.dump(generate_model(dimensions, levels, capabilities, string_length), f, ensure_ascii=False)
+            results.append(measure(f'{dimensions}x{levels}x{capabilities}', model_file))
+
+    print_table(results)
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the memory of json.load() models with MaturityModel')
+    parser.add_argument(
+        '--sizes',
+        nargs='+',
+        type=parse_size,
+        default=[parse_size(size) for size in DEFAULT_SIZES],
+        help=f"Synthetic model sizes as DIMENSIONSxLEVELSxCAPABILITIES (default: {' '.join(DEFAULT_SIZES)})"
+    )
+    parser.add_argument(
+        '--string-length',
+        type=int,
+        default=40,
+        help='Approximate length of every generated string (default: 40)'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the raw results as JSON'
+    )
+
+    args = parser.parse_args()
+
+    main(args.sizes, args.string_length, args.json)
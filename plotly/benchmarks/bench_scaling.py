@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark of the fishbone generator.
+
+Generates synthetic models of growing size (see synthetic_model.py) and
+times every step of building the English pages on each of them:
+load_maturity_data, generate_capabilities_data, both create_*_fishbone_diagram
+builders, write_html of the ultra version, the interactive chart div and the
+interactive template assembly.
+
+For every (size, stage) the report shows the best wall time over the
+repeats, the tracemalloc peak of one extra run and the bytes the stage
+produced, plus a scaling exponent against the previous size
+(log time ratio / log capability count ratio). An exponent well above 1
+flags a super-linear hot spot.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SCRIPT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'script')
+sys.path.insert(0, SCRIPT_DIR)
+
+import ai_maturity_fishbone_plotly_en as generator
+from fishbone_engine import skeleton_json
+from synthetic_model import generate_catalog, generate_model
+
+DEFAULT_SIZES = ['5x6x4', '10x6x6', '20x8x8', '40x10x8']
+
+# Scaling exponents above this are marked in the report
+SUPERLINEAR_THRESHOLD = 1.3
+
+PLOTLYJS_SRC = 'plotly.min.js'
+
+def parse_size(spec):
+    """Parse DIMENSIONSxLEVELSxCAPABILITIES, e.g. 40x10x8"""
+    try:
+        dimensions, levels, capabilities = (int(part) for part in spec.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{spec}', expected DIMENSIONSxLEVELSxCAPABILITIES")
+    return dimensions, levels, capabilities
+
+def stage_load(ctx):
+    ctx['data'] = generator.load_maturity_data(ctx['model_file'])
+    return os.path.getsize(ctx['model_file'])
+
+def stage_capabilities(ctx):
+    ctx['capabilities'] = generator.generate_capabilities_data(ctx['data'])
+    return len(json.dumps(ctx['capabilities'], ensure_ascii=False).encode('utf-8'))
+
+def stage_ultra(ctx):
+    # Measure a cold build, not the skeleton cache
+    skeleton_json.cache_clear()
+    ctx['ultra'] = generator.create_ultra_clean_fishbone_diagram(ctx['data'], catalog=ctx['catalog'])
+    return None
+
+def stage_interactive(ctx):
+    skeleton_json.cache_clear()
+    ctx['interactive'] = generator.create_interactive_fishbone_diagram(ctx['data'], catalog=ctx['catalog'])
+    return None
+
+def stage_write_html(ctx):
+    output_file = os.path.join(ctx['output_dir'], 'ultra.html')
+    ctx['ultra'].write_html(output_file, config=generator.VERSIONS['ultra']['config'], include_plotlyjs=PLOTLYJS_SRC)
+    return os.path.getsize(output_file)
+
+def stage_interactive_div(ctx):
+    ctx['plot_div'] = ctx['interactive'].to_html(
+        full_html=False, include_plotlyjs=False, config=generator.VERSIONS['interactive']['config'])
+    return len(ctx['plot_div'].encode('utf-8'))
+
+def stage_template(ctx):
+    output_file = os.path.join(ctx['output_dir'], 'interactive.html')
+    generator.write_interactive_html(output_file, ctx['plot_div'], ctx['capabilities'], PLOTLYJS_SRC)
+    return os.path.getsize(output_file)
+
+# Stages in pipeline order; each returns the bytes it produced (None: figure JSON size)
+STAGES = [
+    ('load_maturity_data', stage_load),
+    ('generate_capabilities_data', stage_capabilities),
+    ('create_ultra_clean', stage_ultra),
+    ('create_interactive', stage_interactive),
+    ('write_html (ultra)', stage_write_html),
+    ('interactive div', stage_interactive_div),
+    ('interactive template', stage_template),
+]
+
+# Figure whose JSON size is reported for the builder stages
+FIGURE_OF_STAGE = {
+    'create_ultra_clean': 'ultra',
+    'create_interactive': 'interactive',
+}
+
+def measure(name, stage, ctx, repeat):
+    """Best wall time over repeat runs, then tracemalloc peak and output bytes of one more run"""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage(ctx)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        output_bytes = stage(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if output_bytes is None:
+        output_bytes = len(ctx[FIGURE_OF_STAGE[name]].to_json().encode('utf-8'))
+    return {'seconds': best, 'peak_bytes': peak, 'output_bytes': output_bytes}
+
+def run_size(size, string_length, repeat, work_dir):
+    """Run every stage on one synthetic model size"""
+    dimensions, levels, capabilities = size
+    model_file = os.path.join(work_dir, 'model.json')
+    with open(model_file, 'w', encoding='utf-8') as f:
+        json.dump(generate_model(dimensions, levels, capabilities, string_length), f, ensure_ascii=False, indent=2)
+
+    ctx = {
+        'model_file': model_file,
+        'output_dir': work_dir,
+        'catalog': generate_catalog(generator.CATALOG, dimensions),
+    }
+    return {name: measure(name, stage, ctx, repeat) for name, stage in STAGES}
+
+def capability_count(size):
+    """Number of capabilities in a synthetic model (L0 has none)"""
+    dimensions, levels, capabilities = size
+    return dimensions * max(levels - 1, 0) * capabilities
+
+def scaling_exponent(previous, current, name):
+    """Growth exponent of a stage's time between two report entries, relative to the capability count"""
+    if previous is None or previous['capabilities'] in (0, current['capabilities']):
+        return None
+    t0, t1 = previous['stages'][name]['seconds'], current['stages'][name]['seconds']
+    if t0 <= 0 or t1 <= 0:
+        return None
+    return math.log(t1 / t0) / math.log(current['capabilities'] / previous['capabilities'])
+
+def print_table(report):
+    """Print the scaling table"""
+    header = f"{'size':<18} {'stage':<28} {'time ms':>10} {'peak MiB':>10} {'bytes':>12} {'scaling':>8}"
+    print(header)
+    print('-' * len(header))
+    previous = None
+    for entry in report:
+        label = f"{entry['size']} ({entry['capabilities']})"
+        for name, _ in STAGES:
+            result = entry['stages'][name]
+            exponent = scaling_exponent(previous, entry, name)
+            if exponent is None:
+                scaling = '-'
+            else:
+                scaling = f'{exponent:.2f}' + (' !' if exponent > SUPERLINEAR_THRESHOLD else '')
+            print(f"{label:<18} {name:<28} {result['seconds'] * 1000:>10.2f} "
+                  f"{result['peak_bytes'] / 1024 / 1024:>10.2f} {result['output_bytes']:>12} {scaling:>8}")
+            label = ''
+        previous = entry
+    print(f"\nscaling: time exponent vs the previous size's capability count; '!' marks > {SUPERLINEAR_THRESHOLD}")
+
+def main(sizes, string_length=40, repeat=3, json_output=None):
+    """Run the benchmark on every size and report the scaling table"""
+    report = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            dimensions, levels, capabilities = size
+            print(f"Benchmarking {dimensions} dimensions x {levels} levels x {capabilities} capabilities...",
+                  file=sys.stderr)
+            report.append({
+                'size': f'{dimensions}x{levels}x{capabilities}',
+                'capabilities': capability_count(size),
+                'string_length': string_length,
+                'stages': run_size(size, string_length, repeat, work_dir),
+            })
+
+    print_table(report)
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure how the fishbone generator scales with the model size')
+    parser.add_argument(
+        '--sizes',
+        nargs='+',
+        type=parse_size,
+        default=[parse_size(size) for size in DEFAULT_SIZES],
+        help=f"Model sizes as DIMENSIONSxLEVELSxCAPABILITIES (default: {' '.join(DEFAULT_SIZES)})"
+    )
+    parser.add_argument(
+        '--string-length',
+        type=int,
+        default=40,
+        help='Approximate length of every generated string (default: 40)'
+    )
+    parser.add_argument(
+        '--repeat', '-r',
+        type=int,
+        default=3,
+        help='Timed runs per stage; the best one is reported (default: 3)'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the raw results as JSON'
+    )
+
+    args = parser.parse_args()
+
+    main(args.sizes, args.string_length, args.repeat, args.json)
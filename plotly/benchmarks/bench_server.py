@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Load test of the web server.
+
+Starts ``start_server.py --production`` on a free local port (or targets an
+already running server with --url), then, for every route, sends a fixed
+number of requests from a fixed number of concurrent keep-alive
+connections and reports requests per second and the p50/p99 latency.
+Every client accepts brotli and gzip, like a browser. The
+'revalidate' rows repeat a page request with the ETag of the first
+response, as a returning browser does.
+
+The charts must have been built first (python script/build_all.py).
+"""
+
+import argparse
+import http.client
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+PLOTLY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Route label -> path; '{plotlyjs}' is replaced by the bundle referenced by the pages
+ROUTES = {
+    'home': '/',
+    'interactive': '/interactive',
+    'ultra': '/ultra',
+    'interactive_en': '/interactive_en',
+    'ultra_en': '/ultra_en',
+    'plotly.js': '/{plotlyjs}',
+    'figure shell': '/figure/en/ultra',
+    'figure JSON': '/api/figure/en/ultra',
+    'render': '/render/en/ultra',
+    'list': '/list',
+}
+
+# Routes also measured with If-None-Match
+REVALIDATE_ROUTES = ['interactive', 'ultra_en', 'figure JSON', 'render']
+
+ACCEPT_ENCODING = 'br, gzip'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(server_args):
+    """Run start_server.py with these arguments on a free port and wait until it answers"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, 'start_server.py', '--bind', f'127.0.0.1:{port}'] + server_args,
+        cwd=PLOTLY_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('the server exited during startup (are the charts built?)')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('the server did not start within 60s')
+
+def stop_server(process):
+    """Stop the server gracefully (SIGTERM) and wait for it"""
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=40)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def request(connection, path, headers):
+    """Send one request and read the whole response; returns (status, headers, body)"""
+    connection.request('GET', path, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.headers, response.read()
+
+def run_route(address, path, headers, requests, concurrency):
+    """Send requests to one path from concurrency keep-alive connections"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client():
+        connection = http.client.HTTPConnection(*address, timeout=30)
+        local = []
+        local_statuses = {}
+        try:
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+                start = time.perf_counter()
+                status, _, _ = request(connection, path, headers)
+                local.append(time.perf_counter() - start)
+                local_statuses[status] = local_statuses.get(status, 0) + 1
+        finally:
+            connection.close()
+        with lock:
+            latencies.extend(local)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'statuses': statuses,
+    }
+
+def resolve_routes(address):
+    """Concrete paths of ROUTES and the ETags used by the revalidate rows"""
+    connection = http.client.HTTPConnection(*address, timeout=30)
+    try:
+        _, _, body = request(connection, ROUTES['ultra_en'], {})
+        match = re.search(rb'src="/?(plotly-[0-9a-z-]+\.min\.js)"', body)
+        plotlyjs = match.group(1).decode() if match else 'plotly.min.js'
+        paths = {label: path.format(plotlyjs=plotlyjs) for label, path in ROUTES.items()}
+        etags = {}
+        for label in REVALIDATE_ROUTES:
+            _, headers, _ = request(connection, paths[label], {'Accept-Encoding': ACCEPT_ENCODING})
+            if headers.get('ETag'):
+                etags[label] = headers['ETag']
+    finally:
+        connection.close()
+    return paths, etags
+
+def print_table(results, concurrency):
+    """Print the load test table"""
+    header = f"{'route':<24} {'requests':>9} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}  statuses"
+    print(f"\n{concurrency} concurrent connections")
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        statuses = ', '.join(f'{status}: {count}' for status, count in sorted(result['statuses'].items()))
+        print(f"{result['route']:<24} {result['requests']:>9} {result['rps']:>10.0f} "
+              f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}  {statuses}")
+
+def main(url=None, requests=2000, concurrency=32, workers=None, threads=8, warmup=100, json_output=None):
+    """Load test every route and print the table"""
+    process = None
+    if url is None:
+        process, url = start_server(['--production', '--workers', str(workers or os.cpu_count() or 1), '--threads', str(threads)])
+    try:
+        parts = urlsplit(url)
+        address = (parts.hostname, parts.port or 80)
+        paths, etags = resolve_routes(address)
+        results = []
+        scenarios = [(label, paths[label], {}) for label in ROUTES]
+        scenarios += [(f'{label} (revalidate)', paths[label], {'If-None-Match': etag}) for label, etag in etags.items()]
+        for label, path, extra_headers in scenarios:
+            headers = dict(extra_headers, **{'Accept-Encoding': ACCEPT_ENCODING})
+            run_route(address, path, headers, warmup, concurrency)
+            result = run_route(address, path, headers, requests, concurrency)
+            result['route'] = label
+            result['path'] = path
+            results.append(result)
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    print_table(results, concurrency)
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'concurrency': concurrency, 'results': results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load test every route of the server: requests/sec and p99 latency')
+    parser.add_argument(
+        '--url',
+        help='Base URL of a running server (default: start start_server.py --production on a free port)'
+    )
+    parser.add_argument(
+        '--requests', '-n',
+        type=int,
+        default=2000,
+        help='Requests per route (default: 2000)'
+    )
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        default=32,
+        help='Concurrent keep-alive connections (default: 32)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Worker processes of the started server (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=8,
+        help='Threads per worker of the started server (default: 8)'
+    )
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=100,
+        help='Untimed requests per route before measuring (default: 100)'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the raw results as JSON'
+    )
+
+    args = parser.parse_args()
+
+    main(args.url, args.requests, args.concurrency, args.workers, args.threads, args.warmup, args.json)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark of the command line entry points and the server.
+
+Runs every entry point in a fresh interpreter, reports the best wall time
+over several runs and, from one extra run under ``python -X importtime``,
+the total import time, whether plotly was imported and the slowest
+top-level imports. Metadata-only commands such as ``--list`` should not
+import plotly at all.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+PLOTLY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPT_DIR = os.path.join(PLOTLY_DIR, 'script')
+
+# Entry point name -> (arguments after the interpreter, working directory)
+ENTRY_POINTS = {
+    'zh --list': (['ai_maturity_fishbone_plotly.py', '--list'], SCRIPT_DIR),
+    'en --list': (['ai_maturity_fishbone_plotly_en.py', '--list'], SCRIPT_DIR),
+    'build_all --help': (['build_all.py', '--help'], SCRIPT_DIR),
+    'import server': (['-c', 'import server'], PLOTLY_DIR),
+}
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def run(arguments, cwd, importtime=False):
+    """Run the interpreter on arguments and return (wall seconds, stderr)"""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + arguments
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return time.perf_counter() - start, result.stderr
+
+def parse_importtime(stderr):
+    """Top-level imports as {module: cumulative microseconds}, plus every imported module name"""
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        modules.add(name)
+        if len(indent) == 1:
+            top_level[name] = top_level.get(name, 0) + int(cumulative)
+    return top_level, modules
+
+def measure(name, repeat, top):
+    """Wall time and import profile of one entry point"""
+    arguments, cwd = ENTRY_POINTS[name]
+    best = min(run(arguments, cwd)[0] for _ in range(repeat))
+    _, stderr = run(arguments, cwd, importtime=True)
+    top_level, modules = parse_importtime(stderr)
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'entry_point': name,
+        'wall_seconds': best,
+        'import_seconds': sum(top_level.values()) / 1e6,
+        'plotly_imported': any(module == 'plotly' or module.startswith('plotly.') for module in modules),
+        'slowest_imports': [{'module': module, 'seconds': us / 1e6} for module, us in slowest],
+    }
+
+def print_table(results):
+    """Print the startup table"""
+    header = f"{'entry point':<20} {'wall ms':>10} {'imports ms':>11} {'plotly':>7}  slowest imports"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        slowest = ', '.join(f"{entry['module']} {entry['seconds'] * 1000:.0f}ms" for entry in result['slowest_imports'])
+        print(f"{result['entry_point']:<20} {result['wall_seconds'] * 1000:>10.1f} "
+              f"{result['import_seconds'] * 1000:>11.1f} {'yes' if result['plotly_imported'] else 'no':>7}  {slowest}")
+
+def main(entry_points=None, repeat=5, top=3, json_output=None):
+    """Measure the startup of the requested entry points"""
+    results = [measure(name, repeat, top) for name in entry_points or list(ENTRY_POINTS)]
+    print_table(results)
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure the startup time and imports of the entry points')
+    parser.add_argument(
+        '--entry-points',
+        nargs='+',
+        choices=list(ENTRY_POINTS),
+        help='Entry points to measure (default: all)'
+    )
+    parser.add_argument(
+        '--repeat', '-r',
+        type=int,
+        default=5,
+        help='Timed runs per entry point; the best one is reported (default: 5)'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=3,
+        help='Number of slowest top-level imports to list (default: 3)'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the raw results as JSON'
+    )
+
+    args = parser.parse_args()
+
+    main(args.entry_points, args.repeat, args.top, args.json)
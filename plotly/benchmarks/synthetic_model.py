@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Synthetic maturity models shaped like resource/model_of_level_en.json.
+
+Used by the benchmarks to measure how the generators scale with the number
+of dimensions, levels, capabilities per cell and the length of the strings.
+"""
+
+import argparse
+import json
+import random
+import sys
+
+# Colors of the English catalog, cycled for the synthetic dimensions
+DIMENSION_COLORS = ['#FF6B6B', '#45B7D1', '#4ECDC4', '#96CEB4', '#FFEAA7']
+
+WORDS = [
+    'ai', 'assisted', 'automated', 'code', 'review', 'pipeline', 'delivery', 'model',
+    'prompt', 'agent', 'quality', 'governance', 'knowledge', 'platform', 'testing',
+    'security', 'metrics', 'workflow', 'team', 'practice', 'feedback', 'context',
+]
+
+def sentence(rng, length):
+    """Pseudo-random text of about length characters"""
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)[:length].strip().capitalize()
+
+def dimension_names(dimensions):
+    """Names of the synthetic capability dimensions"""
+    return [f'Dimension {d + 1}' for d in range(dimensions)]
+
+def generate_model(dimensions=5, levels=6, capabilities=4, string_length=40, seed=0):
+    """Build a model dict in the format of model_of_level_en.json
+
+    Args:
+        dimensions (int): Number of capability dimensions
+        levels (int): Number of maturity levels (L0 has no capabilities, like the real model)
+        capabilities (int): Capabilities per (dimension, level) cell
+        string_length (int): Approximate length of every capability, description and feature string
+        seed (int): Seed of the pseudo-random text
+    """
+    rng = random.Random(seed)
+    names = dimension_names(dimensions)
+    model = {'levels': {}}
+    for l in range(levels):
+        level = {
+            'title': f'L{l} {sentence(rng, 20)}',
+            'description': sentence(rng, string_length),
+            'features': sentence(rng, string_length * 2),
+        }
+        if l > 0:
+            level['capabilities'] = {
+                name: [sentence(rng, string_length) for _ in range(capabilities)]
+                for name in names
+            }
+        model['levels'][f'L{l}'] = level
+    return model
+
+def generate_catalog(base_catalog, dimensions):
+    """Copy of a generator's CATALOG listing the synthetic dimensions"""
+    catalog = dict(base_catalog)
+    catalog['dimensions'] = [
+        (name, DIMENSION_COLORS[d % len(DIMENSION_COLORS)])
+        for d, name in enumerate(dimension_names(dimensions))
+    ]
+    return catalog
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write a synthetic maturity model JSON')
+    parser.add_argument('--dimensions', type=int, default=5, help='Number of capability dimensions (default: 5)')
+    parser.add_argument('--levels', type=int, default=6, help='Number of maturity levels (default: 6)')
+    parser.add_argument('--capabilities', type=int, default=4, help='Capabilities per cell (default: 4)')
+    parser.add_argument('--string-length', type=int, default=40, help='Approximate string length (default: 40)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--output', '-o', default='-', help='Output file (default: stdout)')
+
+    args = parser.parse_args()
+
+    model = generate_model(args.dimensions, args.levels, args.capabilities, args.string_length, args.seed)
+    if args.output == '-':
+        json.dump(model, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(model, f, ensure_ascii=False, indent=2)
@@ -1,32 +1,12 @@
-import argparse
-import json
 import os
 import sys
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import fishbone_build
+from fishbone_build import generate_capabilities_data, load_maturity_data
+from fishbone_engine import render_figure
+from fishbone_layout import dimension_offsets, reference_x
 
 
-def load_maturity_data(file_path):
-    """加载AI成熟度模型数据"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def generate_capabilities_data(data):
-    """生成能力数据的JSON格式，供JavaScript使用"""
-    capabilities_data = {}
-    
-    levels = list(data['levels'].keys())
-    for level in levels:
-        level_data = data['levels'][level]
-        if 'capabilities' in level_data:
-            for capability_type, capabilities in level_data['capabilities'].items():
-                if capability_type not in capabilities_data:
-                    capabilities_data[capability_type] = {}
-                capabilities_data[capability_type][level] = capabilities
-    
-    return capabilities_data
-
 def create_interactive_html_template():
     """创建交互式HTML模板"""
     template = """
@@ -35,7 +15,7 @@ def create_interactive_html_template():
 <head>
     <meta charset="utf-8">
     <title>AI软件交付能力成熟度模型 - 交互式版本</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <script src="{plotlyjs_src}"></script>
     <style>
         body {
             font-family: Arial, sans-serif;
@@ -62,7 +42,8 @@ def create_interactive_html_template():
             margin-left: 350px;
             flex: 1;
             padding: 5px;
-            overflow: hidden;
+            overflow-x: hidden;
+            overflow-y: auto;
             height: 100vh;
             display: flex;
             flex-direction: column;
@@ -162,6 +143,12 @@ def create_interactive_html_template():
             font-size: 14px;
         }
         
+        .save-status {
+            margin-top: 4px;
+            font-size: 12px;
+            color: #666;
+        }
+        
         .capability-group.人员能力 {
             border-left: 4px solid #FF6B6B;
         }
@@ -207,6 +194,7 @@ def create_interactive_html_template():
         
         <div class="progress-info">
             <div id="progress-text">已完成: 0 / 0 (0%)</div>
+            <div id="save-status" class="save-status"></div>
         </div>
         
         <div id="capabilities-container">
@@ -236,20 +224,162 @@ def create_interactive_html_template():
         // 初始化
         let completedCapabilities = new Set();
         
-        // 从localStorage加载已完成的能力
+        // 进度按评估保存在服务器上：URL中带 ?assessment=<id> 时为团队评估，否则为此浏览器的个人评估；从磁盘直接打开页面时保存在localStorage中
+        const PROGRESS_KEY = 'ai_maturity_progress';
+        const PROGRESS_DEBOUNCE_MS = 500;
+        const PROGRESS_RETRY_MS = 5000;
+        const PROGRESS_POLL_MS = 15000;
+        const sharedAssessment = new URLSearchParams(location.search).get('assessment');
+        let progressApi = location.protocol.startsWith('http')
+            ? '/api/progress/' + encodeURIComponent(sharedAssessment || personalAssessment())
+            : null;
+        let progressRevision = 0;
+        let pendingOperations = new Map();
+        let sendingOperations = null;
+        let flushTimer = null;
+        
+        // 此浏览器的个人评估ID
+        function personalAssessment() {
+            let id = localStorage.getItem('ai_maturity_assessment');
+            if (!id) {
+                id = 'personal-' + Math.random().toString(36).slice(2, 12);
+                localStorage.setItem('ai_maturity_assessment', id);
+            }
+            return id;
+        }
+        
+        function setSaveStatus(text) {
+            document.getElementById('save-status').textContent = text;
+        }
+        
+        // 加载评估中已完成的能力
         function loadProgress() {
-            const saved = localStorage.getItem('ai_maturity_progress');
-            if (saved) {
-                completedCapabilities = new Set(JSON.parse(saved));
+            const saved = JSON.parse(localStorage.getItem(PROGRESS_KEY) || '[]');
+            if (!progressApi) {
+                completedCapabilities = new Set(saved);
                 updateCheckboxes();
                 updateProgress();
+                return;
+            }
+            fetch(progressApi, { cache: 'no-store' })
+                .then(response => {
+                    if (!response.ok) throw new Error(response.status);
+                    return response.json();
+                })
+                .then(progress => {
+                    progressRevision = progress.revision;
+                    completedCapabilities = new Set(progress.completed);
+                    // 把旧版本保存在此浏览器中的进度迁移到新的个人评估
+                    if (!sharedAssessment && progress.revision === 0) {
+                        saved.forEach(capabilityId => queueToggle(capabilityId, true));
+                    }
+                    updateCheckboxes();
+                    updateProgress();
+                    setInterval(pollProgress, PROGRESS_POLL_MS);
+                })
+                .catch(() => {
+                    progressApi = null;
+                    completedCapabilities = new Set(saved);
+                    updateCheckboxes();
+                    updateProgress();
+                    setSaveStatus('离线：进度仅保存在此浏览器中');
+                });
+        }
+        
+        // 记录一次勾选变化，在PROGRESS_DEBOUNCE_MS内没有新的变化后与其他变化合并为一批发送
+        function queueToggle(capabilityId, completed) {
+            if (completed) {
+                completedCapabilities.add(capabilityId);
+            } else {
+                completedCapabilities.delete(capabilityId);
             }
+            pendingOperations.set(capabilityId, completed);
+            clearTimeout(flushTimer);
+            flushTimer = setTimeout(flushProgress, PROGRESS_DEBOUNCE_MS);
         }
         
-        // 保存进度到localStorage
+        // 把待发送的勾选变化作为一批增量操作发送
+        function flushProgress(keepalive) {
+            clearTimeout(flushTimer);
+            if (!progressApi) {
+                localStorage.setItem(PROGRESS_KEY, JSON.stringify([...completedCapabilities]));
+                pendingOperations.clear();
+                setSaveStatus('已保存在此浏览器中');
+                return;
+            }
+            if (pendingOperations.size === 0) return;
+            if (sendingOperations) {
+                // 同一时间只发送一批，保证各批按顺序生效
+                flushTimer = setTimeout(flushProgress, PROGRESS_DEBOUNCE_MS);
+                return;
+            }
+            const batch = pendingOperations;
+            pendingOperations = new Map();
+            sendingOperations = batch;
+            setSaveStatus('保存中...');
+            fetch(progressApi, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ operations: [...batch].map(([id, done]) => ({ id, done })) }),
+                keepalive: keepalive === true
+            })
+                .then(response => {
+                    if (!response.ok) throw new Error(response.status);
+                    if (!sharedAssessment) localStorage.removeItem(PROGRESS_KEY);
+                    setSaveStatus('所有更改已保存');
+                })
+                .catch(() => {
+                    // 保留发送失败的变化以便重试（期间再次勾选的以新状态为准）
+                    batch.forEach((done, id) => {
+                        if (!pendingOperations.has(id)) pendingOperations.set(id, done);
+                    });
+                    setSaveStatus('保存失败，正在重试...');
+                    flushTimer = setTimeout(flushProgress, PROGRESS_RETRY_MS);
+                })
+                .finally(() => {
+                    sendingOperations = null;
+                });
+        }
+        
+        // 应用其他评估人自上次已知修订号以来的更改
+        function pollProgress() {
+            if (document.hidden || !progressApi) return;
+            fetch(progressApi + '?since=' + progressRevision, { cache: 'no-store' })
+                .then(response => {
+                    // 400：服务器不认识此修订号（例如数据库被重置过），改为加载完整状态
+                    if (response.status === 400) {
+                        return fetch(progressApi, { cache: 'no-store' }).then(full => full.ok ? full.json() : null);
+                    }
+                    return response.ok ? response.json() : null;
+                })
+                .then(result => {
+                    if (!result) return;
+                    progressRevision = result.revision;
+                    let changes = result.changes;
+                    if (!changes) {
+                        // 完整状态：此处已勾选而服务器上未勾选的能力取消勾选
+                        changes = {};
+                        completedCapabilities.forEach(capabilityId => { changes[capabilityId] = false; });
+                        result.completed.forEach(capabilityId => { changes[capabilityId] = true; });
+                    }
+                    for (const [capabilityId, completed] of Object.entries(changes)) {
+                        // 本地尚未保存的勾选优先
+                        if (pendingOperations.has(capabilityId) || (sendingOperations && sendingOperations.has(capabilityId))) continue;
+                        if (completed) {
+                            completedCapabilities.add(capabilityId);
+                        } else {
+                            completedCapabilities.delete(capabilityId);
+                        }
+                    }
+                    updateCheckboxes();
+                    updateProgress();
+                })
+                .catch(() => {});
+        }
+        
+        // 立即保存，不等待防抖
         function saveProgress() {
-            localStorage.setItem('ai_maturity_progress', JSON.stringify([...completedCapabilities]));
-            alert('进度已保存！');
+            flushProgress();
         }
         
         // 生成能力列表HTML
@@ -292,26 +422,17 @@ def create_interactive_html_template():
             const checkbox = document.getElementById(capabilityId);
             const label = checkbox.nextElementSibling;
             
-            if (checkbox.checked) {
-                completedCapabilities.add(capabilityId);
-                label.classList.add('completed');
-            } else {
-                completedCapabilities.delete(capabilityId);
-                label.classList.remove('completed');
-            }
+            label.classList.toggle('completed', checkbox.checked);
+            queueToggle(capabilityId, checkbox.checked);
             
             updateProgress();
         }
         
         // 更新复选框状态
         function updateCheckboxes() {
-            completedCapabilities.forEach(capabilityId => {
-                const checkbox = document.getElementById(capabilityId);
-                const label = checkbox ? checkbox.nextElementSibling : null;
-                if (checkbox) {
-                    checkbox.checked = true;
-                    if (label) label.classList.add('completed');
-                }
+            document.querySelectorAll('.capability-checkbox').forEach(checkbox => {
+                checkbox.checked = completedCapabilities.has(checkbox.id);
+                checkbox.nextElementSibling.classList.toggle('completed', checkbox.checked);
             });
         }
         
@@ -330,8 +451,8 @@ def create_interactive_html_template():
             document.querySelectorAll('.capability-checkbox').forEach(checkbox => {
                 if (!checkbox.checked) {
                     checkbox.checked = true;
-                    completedCapabilities.add(checkbox.id);
                     checkbox.nextElementSibling.classList.add('completed');
+                    queueToggle(checkbox.id, true);
                 }
             });
             updateProgress();
@@ -342,18 +463,35 @@ def create_interactive_html_template():
             document.querySelectorAll('.capability-checkbox').forEach(checkbox => {
                 if (checkbox.checked) {
                     checkbox.checked = false;
-                    completedCapabilities.delete(checkbox.id);
                     checkbox.nextElementSibling.classList.remove('completed');
+                    queueToggle(checkbox.id, false);
                 }
             });
             updateProgress();
         }
         
+        // 大模型的图表高度是固定的（见fishbone_layout），此时图表容器跟随图表高度而不是视口高度，由主内容区滚动
+        function fitChartHeight() {
+            const chart = document.querySelector('#plotly-div .plotly-graph-div');
+            if (chart && chart.layout && chart.layout.height) {
+                chart.style.setProperty('height', chart.layout.height + 'px', 'important');
+            }
+        }
+        
         // 页面加载完成后初始化
         document.addEventListener('DOMContentLoaded', function() {
+            fitChartHeight();
             generateCapabilitiesHTML();
             loadProgress();
         });
+        
+        // 页面隐藏或关闭前发送尚未保存的勾选变化
+        document.addEventListener('visibilitychange', function() {
+            if (document.hidden) flushProgress(true);
+        });
+        window.addEventListener('pagehide', function() {
+            flushProgress(true);
+        });
     </script>
 </body>
 </html>
@@ -362,6 +500,9 @@ def create_interactive_html_template():
 
 def create_fishbone_diagram(data):
     """创建鱼骨图"""
+    # plotly只在真正构建图表时导入，--list等命令无需承担导入开销
+    import plotly.graph_objects as go
+    
     fig = go.Figure()
     
     # 定义颜色方案
@@ -404,8 +545,8 @@ def create_fishbone_diagram(data):
     )
     
     # 添加成熟度级别标记点
-    levels = list(data['levels'].keys())
-    level_names = [data['levels'][level]['title'] for level in levels]
+    levels = [level.key for level in data.levels]
+    level_names = [level.title for level in data.levels]
     
     fig.add_trace(go.Scatter(
         x=list(range(len(levels))),
@@ -425,9 +566,8 @@ def create_fishbone_diagram(data):
         # 收集该维度在各级别的能力数据
         capability_data = []
         for i, level in enumerate(levels):
-            level_data = data['levels'][level]
-            if 'capabilities' in level_data and capability_type in level_data['capabilities']:
-                capabilities = level_data['capabilities'][capability_type]
+            capabilities = data.capabilities(capability_type, level)
+            if capabilities is not None:
                 capability_data.append({
                     'level': i,
                     'level_name': level,
@@ -485,7 +625,7 @@ def create_fishbone_diagram(data):
             tickmode='array',
             tickvals=list(range(len(levels))),
             ticktext=levels,
-            range=[-1, 6]
+            range=[-1, max(6, len(levels))]
         ),
         yaxis=dict(
             title='能力维度',
@@ -517,6 +657,9 @@ def create_fishbone_diagram(data):
 
 def create_detailed_fishbone_diagram(data):
     """创建详细版鱼骨图，包含更多信息"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
     fig = make_subplots(
         rows=1, cols=1,
         subplot_titles=('AI成熟度模型详细鱼骨图',)
@@ -559,11 +702,11 @@ def create_detailed_fishbone_diagram(data):
         yanchor='middle'
     )
     
-    levels = list(data['levels'].keys())
+    levels = [level.key for level in data.levels]
     
     # 为每个级别添加详细信息
-    for i, level in enumerate(levels):
-        level_data = data['levels'][level]
+    for i, level_data in enumerate(data.levels):
+        level = level_data.key
         
         # 添加级别主节点
         fig.add_trace(go.Scatter(
@@ -574,12 +717,12 @@ def create_detailed_fishbone_diagram(data):
             text=[level],
             textposition='top center',
             name=f'级别 {level}',
-            hovertemplate=f'<b>{level_data["title"]}</b><br>{level_data["description"]}<br><br>特征: {level_data["features"]}<extra></extra>'
+            hovertemplate=f'<b>{level_data.title}</b><br>{level_data.description}<br><br>特征: {level_data.features}<extra></extra>'
         ))
         
         # 为每个能力维度添加详细分支
-        if 'capabilities' in level_data:
-            for capability_type, capabilities in level_data['capabilities'].items():
+        if level_data.has_capabilities:
+            for capability_type, capabilities in data.level_capabilities(level):
                 if capability_type in capability_positions:
                     y_pos = capability_positions[capability_type]
                     color = colors[capability_type]
@@ -642,7 +785,7 @@ def create_detailed_fishbone_diagram(data):
             tickmode='array',
             tickvals=list(range(len(levels))),
             ticktext=levels,
-            range=[-1, 6]
+            range=[-1, max(6, len(levels))]
         ),
         yaxis=dict(
             title='能力维度',
@@ -660,6 +803,8 @@ def create_detailed_fishbone_diagram(data):
 
 def create_static_fishbone_diagram(data):
     """创建静态信息展示的鱼骨图，所有信息直接显示在页面上"""
+    import plotly.graph_objects as go
+    
     fig = go.Figure()
     
     # 定义颜色方案
@@ -671,14 +816,8 @@ def create_static_fishbone_diagram(data):
         '治理能力': '#FFEAA7'
     }
     
-    # 能力维度的Y坐标（紧凑间距）
-    capability_positions = {
-        '人员能力': 4,
-        '流程能力': 2,
-        '技术能力': -2,
-        '知识能力': -4,
-        '治理能力': -6
-    }
+    # 能力维度的Y坐标（紧凑间距），由布局引擎按维度数量计算
+    capability_positions = dict(zip(colors, dimension_offsets(len(colors))))
     
     # 绘制主干线（水平线）
     fig.add_trace(go.Scatter(
@@ -702,8 +841,8 @@ def create_static_fishbone_diagram(data):
     )
     
     # 添加成熟度级别标记点和标签
-    levels = list(data['levels'].keys())
-    level_names = [data['levels'][level]['title'] for level in levels]
+    levels = [level.key for level in data.levels]
+    level_names = [level.title for level in data.levels]
     
     # 适中的X轴间距 - 根据实际级别数量动态生成，避免重叠
     x_positions = [2 + i * 3 for i in range(len(levels))]  # 每个级别之间间隔3个单位
@@ -740,9 +879,8 @@ def create_static_fishbone_diagram(data):
         
         # 收集该维度在各级别的能力数据
         for i, level in enumerate(levels):
-            level_data = data['levels'][level]
-            if 'capabilities' in level_data and capability_type in level_data['capabilities']:
-                capabilities = level_data['capabilities'][capability_type]
+            capabilities = data.capabilities(capability_type, level)
+            if capabilities is not None:
                 x_pos = x_positions[i]
                 
                 # 绘制从主干到能力维度的连接线
@@ -782,9 +920,8 @@ def create_static_fishbone_diagram(data):
                 )
     
     # 添加级别描述信息 - 紧凑布局
-    for i, level in enumerate(levels):
-        level_data = data['levels'][level]
-        description_text = f"<b>{level_data['title']}</b><br>{level_data['description']}<br><br>特征: {level_data['features']}"
+    for i, level_data in enumerate(data.levels):
+        description_text = f"<b>{level_data.title}</b><br>{level_data.description}<br><br>特征: {level_data.features}"
         x_pos = x_positions[i]
         
         fig.add_annotation(
@@ -807,9 +944,9 @@ def create_static_fishbone_diagram(data):
     
     # 添加可移动的参考线
     # 行业位置线（初始位置在L2和L3之间）
-    industry_position = (x_positions[1] + x_positions[2]) / 2
-    # 组织位置线（初始位置在L1和L2之间）
-    organization_position = (x_positions[0] + x_positions[1]) / 2
+    industry_position = reference_x(x_positions, (1, 2))
+    # 组织位置线（初始位置在L1和L2之间）；级别不足时落在最后一个级别上
+    organization_position = reference_x(x_positions, (0, 1))
     
     # 设置布局 - 大幅增加画布尺寸
     fig.update_layout(
@@ -909,603 +1046,189 @@ def create_static_fishbone_diagram(data):
     
     return fig
 
-def create_ultra_clean_fishbone_diagram(data):
-    """创建超清晰布局的鱼骨图，采用分层显示策略"""
-    fig = go.Figure()
-    
-    # 定义颜色方案
-    colors = {
-        '人员能力': '#FF6B6B',
-        '流程能力': '#4ECDC4', 
-        '技术能力': '#45B7D1',
-        '知识能力': '#96CEB4',
-        '治理能力': '#FFEAA7'
-    }
-    
-    # 能力维度的Y坐标（紧凑间距）
-    capability_positions = {
-        '人员能力': 4,
-        '流程能力': 2,
-        '技术能力': -2,
-        '知识能力': -4,
-        '治理能力': -6
-    }
-    
-    levels = list(data['levels'].keys())
-    level_names = [data['levels'][level]['title'] for level in levels]
-    
-    # X轴位置 - 适中的间距，避免重叠
-    x_positions = [3 + i * 4 for i in range(len(levels))]
-    
-    # 绘制主干线（水平线）
-    fig.add_trace(go.Scatter(
-        x=[0, max(x_positions) + 2.7],
-        y=[0, 0],
-        mode='lines',
-        line=dict(color='black', width=5),
-        name='AI成熟度演进主线',
-        showlegend=False
-    ))
-    
-    # 在主干线末尾添加向右的箭头
-    fig.add_annotation(
-        x=max(x_positions) + 2.7,
-        y=0,
-        text='▶',
-        showarrow=False,
-        font=dict(size=20, color='black'),
-        xanchor='left',
-        yanchor='middle'
-    )
-    
-    # 添加成熟度级别标记点
-    fig.add_trace(go.Scatter(
-        x=x_positions,
-        y=[0] * len(levels),
-        mode='markers+text',
-        marker=dict(size=20, color='darkred', symbol='diamond'),
-        text=level_names,
-        textposition='top center',
-        textfont=dict(size=14, color='darkred'),
-        name='成熟度级别',
-        showlegend=False
-    ))
-    
-    # 为每个能力维度绘制分支
-    for capability_type, y_pos in capability_positions.items():
-        color = colors[capability_type]
-        
-        # 添加能力维度主标签（更大更醒目）- 进一步向右移动
-        fig.add_annotation(
-            x=0.5,  # 进一步向右移动
-            y=y_pos,
-            text=f'<b>{capability_type}</b>',
-            showarrow=False,
-            font=dict(size=20, color=color),
-            xanchor='right',
-            yanchor='middle',  # 垂直居中对齐
-            bgcolor='rgba(255, 255, 255, 0.95)',
-            bordercolor=color,
-            borderwidth=3
-        )
-        
-        # 为每个级别绘制该维度的信息
-        for i, level in enumerate(levels):
-            level_data = data['levels'][level]
-            if 'capabilities' in level_data and capability_type in level_data['capabilities']:
-                capabilities = level_data['capabilities'][capability_type]
-                x_pos = x_positions[i]
-                
-                # 绘制连接线
-                fig.add_trace(go.Scatter(
-                    x=[x_pos, x_pos],
-                    y=[0, y_pos],
-                    mode='lines',
-                    line=dict(color=color, width=3),
-                    showlegend=False
-                ))
-                
-                # 端点
-                fig.add_trace(go.Scatter(
-                    x=[x_pos],
-                    y=[y_pos],
-                    mode='markers',
-                    marker=dict(size=12, color=color),
-                    showlegend=False
-                ))
-                
-                # 能力详情文本框 - 直接放在节点位置，不偏移
-                capabilities_text = '<br>'.join([f'• {cap}' for cap in capabilities])
-                
-                fig.add_annotation(
-                    x=x_pos,
-                    y=y_pos,
-                    text=capabilities_text,
-                    showarrow=False,  # 不显示箭头
-                    font=dict(size=10, color='black'),
-                    bgcolor='rgba(255, 255, 255, 0.98)',
-                    bordercolor=color,
-                    borderwidth=2,
-                    align='left',
-                    width=280,  # 增加文本框宽度以适应更大的间距
-                    xanchor='center',  # 水平居中
-                    yanchor='middle'   # 垂直居中
-                )
-    
-    # 在顶部添加级别描述信息 - 紧凑布局
-    description_y = 7
-    for i, level in enumerate(levels):
-        level_data = data['levels'][level]
-        description_text = f"<b>{level_data['title']}</b><br><br>{level_data['description']}<br><br><b>特征:</b> {level_data['features']}"
-        x_pos = x_positions[i]
-        
-        fig.add_annotation(
-            x=x_pos,
-            y=description_y,
-            text=description_text,
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1.5,
-            arrowcolor='darkred',
-            arrowwidth=2,
-            ax=0,
-            ay=-40,
-            font=dict(size=9, color='darkred'),
-            bgcolor='rgba(255, 248, 248, 0.98)',
-            bordercolor='darkred',
-            borderwidth=2,
-            align='left',
-            width=200,
-            standoff=10
-        )
-    
-    # 添加可移动的参考线
-    # 行业位置线（初始位置在L2和L3之间）
-    industry_position = (x_positions[1] + x_positions[2]) / 2
-    # 组织位置线（初始位置在L1和L2之间）
-    organization_position = (x_positions[0] + x_positions[1]) / 2
-    
-    # 设置布局
-    fig.update_layout(
-        title={
-            'text': 'AI软件交付能力成熟度模型全景图',
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 24, 'color': 'darkblue'}
+# 中文翻译目录：超清晰布局版本和交互式版本由共享渲染引擎生成，这里只提供中文文案
+CATALOG = {
+    # 能力维度及其颜色，顺序决定分支的上下位置
+    'dimensions': [
+        ('人员能力', '#FF6B6B'),
+        ('流程能力', '#4ECDC4'),
+        ('技术能力', '#45B7D1'),
+        ('知识能力', '#96CEB4'),
+        ('治理能力', '#FFEAA7')
+    ],
+    'trunk_name': 'AI成熟度演进主线',
+    'levels_name': '成熟度级别',
+    'titles': {
+        'ultra': 'AI软件交付能力成熟度模型全景图',
+        'interactive': 'AI软件交付成熟度模型 - 交互式版本（左侧可勾选已完成能力）'
+    },
+    'xaxis_title': '成熟度级别',
+    'yaxis_title': '能力维度',
+    'cell_hover': '<b>{dimension} - {level}</b><br><br>{capabilities}',
+    'cell_summary': '共{count}项能力<br>详见侧边栏',
+    'level_description': '<b>{title}</b><br><br>{description}<br><br><b>特征:</b> {features}',
+    'level_hover': '<b>{title}</b><br><br><b>描述:</b><br>{description}<br><br><b>特征:</b><br>{features}',
+    # 参考线位于两个级别（按序号）的中间
+    'reference_lines': {
+        'industry': {'name': '行业位置', 'label': '<b>行业位置</b><br>(可拖拽)', 'levels': (1, 2)},
+        'organization': {'name': '组织位置', 'label': '<b>组织位置</b><br>(可拖拽)', 'levels': (0, 1)}
+    },
+    'reference_lines_editable': True,
+    # 中文版图表沿用自身的几何参数（文本框更窄、坐标范围和边距不同，且不带悬停标记），覆盖fishbone_engine.VARIANTS中的默认值
+    'geometry': {
+        'ultra': {
+            'x_range_padding': (-1, 2),
+            'y_range': (-10, 10),
+            'dimension_label': {'x': 0.5},
+            'cell_box': {'width': 280},
+            'description': {'min_y': 7},
+            'hover_markers': False,
+            'layout': {'margin': {'l': 100}}
         },
-        xaxis=dict(
-            title=dict(text='成熟度级别', font=dict(size=16)),
-            tickmode='array',
-            tickvals=x_positions,
-            ticktext=levels,
-            tickfont=dict(size=14),
-            range=[-1, max(x_positions) + 2],
-            showgrid=True,
-            gridcolor='lightgray',
-            gridwidth=1
-        ),
-        yaxis=dict(
-            title=dict(text='能力维度', font=dict(size=16)),
-            tickfont=dict(size=14),
-            showticklabels=False,  # 隐藏Y轴标签，只保留有颜色的标签
-            range=[-10, 10],
-            showgrid=True,
-            gridcolor='lightgray',
-            gridwidth=1
-        ),
-        width=1900,  # 优化宽度以适应一屏显示
-        height=1200,  # 保持高度
-        showlegend=False,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        margin=dict(l=100, r=100, t=100, b=100),
-        # 添加可拖拽的参考线
-        shapes=[
-            # 行业位置线
-            dict(
-                type="line",
-                x0=industry_position,
-                y0=-10,
-                x1=industry_position,
-                y1=10,
-                line=dict(
-                    color="orange",
-                    width=3,
-                    dash="dash"
-                ),
-                editable=True,
-                name="行业位置"
-            ),
-            # 组织位置线
-            dict(
-                type="line",
-                x0=organization_position,
-                y0=-10,
-                x1=organization_position,
-                y1=10,
-                line=dict(
-                    color="purple",
-                    width=3,
-                    dash="dash"
-                ),
-                editable=True,
-                name="组织位置"
-            )
-        ],
-        # 添加注释说明
-        annotations=list(fig.layout.annotations) + [
-            dict(
-                x=industry_position,
-                y=9,
-                text="<b>行业位置</b><br>(可拖拽)",
-                showarrow=True,
-                arrowhead=2,
-                arrowcolor="orange",
-                font=dict(size=12, color="orange"),
-                bgcolor="rgba(255, 255, 255, 0.9)",
-                bordercolor="orange",
-                borderwidth=2,
-                ax=0,
-                ay=-30
-            ),
-            dict(
-                x=organization_position,
-                y=9,
-                text="<b>组织位置</b><br>(可拖拽)",
-                showarrow=True,
-                arrowhead=2,
-                arrowcolor="purple",
-                font=dict(size=12, color="purple"),
-                bgcolor="rgba(255, 255, 255, 0.9)",
-                bordercolor="purple",
-                borderwidth=2,
-                ax=0,
-                ay=-30
-            )
-        ]
-    )
-    
-    return fig
-
-def create_interactive_fishbone_diagram(data):
-    """创建带有checkbox功能的交互式鱼骨图"""
-    fig = go.Figure()
-    
-    # 定义颜色方案
-    colors = {
-        '人员能力': '#FF6B6B',
-        '流程能力': '#4ECDC4', 
-        '技术能力': '#45B7D1',
-        '知识能力': '#96CEB4',
-        '治理能力': '#FFEAA7'
-    }
-    
-    # 能力维度的Y坐标
-    capability_positions = {
-        '人员能力': 4,
-        '流程能力': 2,
-        '技术能力': -2,
-        '知识能力': -4,
-        '治理能力': -6
+        'interactive': {
+            'x_range_padding': (-1.0, 1.5),
+            'y_range': (-8, 12),
+            'cell_box': {'width': 120},
+            'description': {'min_y': 10, 'width': 180},
+            'hover_markers': False,
+            'yaxis_title_annotation': {'x': -0.8},
+            'layout': {'margin': {'l': 80, 'r': 20}}
+        }
     }
-    
-    levels = list(data['levels'].keys())
-    level_names = [data['levels'][level]['title'] for level in levels]
-    
-    # X轴位置 - 优化间距以更好利用右侧空间
-    x_positions = [2 + i * 3.5 for i in range(len(levels))]
-    
-    # 绘制主干线 - 调整长度以适应新的X轴范围
-    fig.add_trace(go.Scatter(
-        x=[-0.5, max(x_positions) + 1.2],
-        y=[0, 0],
-        mode='lines',
-        line=dict(color='black', width=5),
-        name='AI成熟度演进主线',
-        showlegend=False
-    ))
-    
-    # 在主干线末尾添加向右的箭头
-    arrow_x = max(x_positions) + 1.2
-    fig.add_annotation(
-        x=arrow_x,
-        y=0,
-        text='▶',
-        showarrow=False,
-        font=dict(size=20, color='black'),
-        xanchor='left',
-        yanchor='middle'
-    )
-    
-    # 添加成熟度级别标记点
-    fig.add_trace(go.Scatter(
-        x=x_positions,
-        y=[0] * len(levels),
-        mode='markers+text',
-        marker=dict(size=20, color='darkred', symbol='diamond'),
-        text=level_names,
-        textposition='top center',
-        textfont=dict(size=14, color='darkred'),
-        name='成熟度级别',
-        showlegend=False
-    ))
-    
-    # 为每个能力维度绘制分支
-    for capability_type, y_pos in capability_positions.items():
-        color = colors[capability_type]
-        
-        # 添加能力维度主标签
-        fig.add_annotation(
-            x=-0.3,
-            y=y_pos,
-            text=f'<b>{capability_type}</b>',
-            showarrow=False,
-            font=dict(size=16, color=color),
-            xanchor='right',
-            yanchor='middle',
-            bgcolor='rgba(255, 255, 255, 0.95)',
-            bordercolor=color,
-            borderwidth=2
-        )
-        
-        # 为每个级别绘制该维度的信息
-        for i, level in enumerate(levels):
-            level_data = data['levels'][level]
-            if 'capabilities' in level_data and capability_type in level_data['capabilities']:
-                capabilities = level_data['capabilities'][capability_type]
-                x_pos = x_positions[i]
-                
-                # 绘制连接线
-                fig.add_trace(go.Scatter(
-                    x=[x_pos, x_pos],
-                    y=[0, y_pos],
-                    mode='lines',
-                    line=dict(color=color, width=3),
-                    showlegend=False
-                ))
-                
-                # 端点
-                fig.add_trace(go.Scatter(
-                    x=[x_pos],
-                    y=[y_pos],
-                    mode='markers',
-                    marker=dict(size=12, color=color),
-                    showlegend=False
-                ))
-                
-                # 简化的能力信息显示（因为详细信息在侧边栏）
-                fig.add_annotation(
-                    x=x_pos,
-                    y=y_pos,
-                    text=f'共{len(capabilities)}项能力<br>详见侧边栏',
-                    showarrow=False,
-                    font=dict(size=10, color='black'),
-                    bgcolor='rgba(255, 255, 255, 0.98)',
-                    bordercolor=color,
-                    borderwidth=2,
-                    align='center',
-                    width=120,
-                    xanchor='center',
-                    yanchor='middle'
-                )
-    
-    # 在顶部添加级别描述信息 - 调整位置避免重叠
-    description_y = 10
-    for i, level in enumerate(levels):
-        level_data = data['levels'][level]
-        description_text = f"<b>{level_data['title']}</b><br><br>{level_data['description']}<br><br><b>特征:</b> {level_data['features']}"
-        x_pos = x_positions[i]
-        
-        fig.add_annotation(
-            x=x_pos,
-            y=description_y,
-            text=description_text,
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1.2,
-            arrowcolor='darkred',
-            arrowwidth=2,
-            ax=0,
-            ay=-50,
-            font=dict(size=8, color='darkred'),
-            bgcolor='rgba(255, 248, 248, 0.98)',
-            bordercolor='darkred',
-            borderwidth=1,
-            align='left',
-            width=180,
-            standoff=5
-        )
-    
-    # 设置布局
-    fig.update_layout(
-        title={
-            'text': 'AI软件交付成熟度模型 - 交互式版本（左侧可勾选已完成能力）',
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 18, 'color': 'darkblue'}
-        },
-        xaxis=dict(
-            title=dict(text='成熟度级别', font=dict(size=14)),
-            tickmode='array',
-            tickvals=x_positions,
-            ticktext=levels,
-            tickfont=dict(size=12),
-            range=[-1.0, max(x_positions) + 1.5],
-            showgrid=True,
-            gridcolor='lightgray',
-            gridwidth=1
-        ),
-        yaxis=dict(
-            title=dict(text=''),  # 清空默认标题，用annotation替代
-            tickfont=dict(size=12),
-            showticklabels=False,
-            range=[-8, 12],
-            showgrid=True,
-            gridcolor='lightgray',
-            gridwidth=1
-        ),
-        showlegend=False,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        margin=dict(l=80, r=20, t=60, b=40),
-        autosize=True
-    )
-    
-    # 添加与主干线对齐的Y轴标题
-    fig.add_annotation(
-        x=-0.8,
-        y=0,
-        text='<b>能力维度</b>',
-        showarrow=False,
-        font=dict(size=14, color='black'),
-        xanchor='center',
-        yanchor='middle',
-        textangle=-90,  # 垂直显示
-        bgcolor='rgba(255, 255, 255, 0.8)',
-        bordercolor='gray',
-        borderwidth=1
-    )
-    
-    return fig
+}
 
-def main(version='all'):
-    """主函数
+def create_ultra_clean_fishbone_diagram(data, batched=True, catalog=None):
+    """创建超清晰布局的鱼骨图，采用分层显示策略
     
     Args:
-        version (str): 指定生成的版本
-            - 'all': 生成所有版本（默认）
-            - 'basic': 基础版本
-            - 'detailed': 详细版本
-            - 'static': 静态展示版本
-            - 'ultra': 超清晰布局版本
-            - 'interactive': 交互式版本（带checkbox）
+        batched (bool): 是否按维度批量生成连接线和端点trace（默认开启）
+        catalog (dict): 可选，替代CATALOG的翻译目录（例如维度更多的模型）
     """
-    # 创建输出目录
-    output_dir = '../output'
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"已创建输出目录: {output_dir}")
-    
-    # 加载数据
-    data = load_maturity_data('../../resource/model_of_level.json')
-    
-    generated_files = []
-    
-    if version == 'all' or version == 'basic':
-        # 创建基础鱼骨图
-        print("正在生成基础版本...")
-        fig1 = create_fishbone_diagram(data)
-        fig1.show()
-        output_file = os.path.join(output_dir, 'ai_sd_maturity_basic.html')
-        fig1.write_html(output_file)
-        generated_files.append(f"- 基础版本: {output_file}")
-    
-    if version == 'all' or version == 'detailed':
-        # 创建详细鱼骨图
-        print("正在生成详细版本...")
-        fig2 = create_detailed_fishbone_diagram(data)
-        fig2.show()
-        output_file = os.path.join(output_dir, 'ai_sd_maturity_detailed.html')
-        fig2.write_html(output_file)
-        generated_files.append(f"- 详细版本: {output_file}")
-    
-    if version == 'all' or version == 'static':
-        # 创建静态信息展示鱼骨图
-        print("正在生成静态展示版本...")
-        fig3 = create_static_fishbone_diagram(data)
-        fig3.show()
-        output_file = os.path.join(output_dir, 'ai_sd_maturity_static.html')
-        fig3.write_html(output_file, 
-                        config={'editable': True, 'toImageButtonOptions': {'format': 'png', 'filename': 'ai_maturity_fishbone_static', 'height': 1000, 'width': 1600, 'scale': 1}})
-        generated_files.append(f"- 静态展示版本: {output_file}")
-    
-    if version == 'all' or version == 'ultra':
-        # 创建超清晰布局鱼骨图
-        print("正在生成超清晰布局版本...")
-        fig4 = create_ultra_clean_fishbone_diagram(data)
-        fig4.show()
-        output_file = os.path.join(output_dir, 'ai_sd_maturity_overview_ultra.html')
-        fig4.write_html(output_file, 
-                        config={'editable': True, 'toImageButtonOptions': {'format': 'png', 'filename': 'ai_maturity_fishbone', 'height': 1200, 'width': 1900, 'scale': 1}})
-        generated_files.append(f"- 超清晰布局版本: {output_file}")
-    
-    if version == 'all' or version == 'interactive':
-        # 创建交互式鱼骨图（带checkbox）
-        print("正在生成交互式版本（带checkbox）...")
-        fig5 = create_interactive_fishbone_diagram(data)
-        capabilities_data = generate_capabilities_data(data)
-        
-        # 先生成完整的HTML，然后保存为临时文件
-        temp_file = os.path.join(output_dir, 'temp_plot.html')
-        fig5.write_html(temp_file, include_plotlyjs='cdn')
-        
-        # 读取生成的HTML内容
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            plot_html = f.read()
-        
-        # 删除临时文件
-        os.remove(temp_file)
-        
-        # 提取body内容
-        import re
-        body_match = re.search(r'<body[^>]*>(.*?)</body>', plot_html, re.DOTALL)
-        if body_match:
-            plot_content = body_match.group(1).strip()
-        else:
-            plot_content = '<div id="plotly-div"></div>'
-        
-        # 使用自定义模板
-        template = create_interactive_html_template()
-        html_content = template.replace('{plot_div}', plot_content)
-        html_content = html_content.replace('{capabilities_json}', json.dumps(capabilities_data, ensure_ascii=False))
-        
-        output_file = os.path.join(output_dir, 'ai_sd_maturity_interactive.html')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        generated_files.append(f"- 交互式版本（带checkbox）: {output_file}")
-        print(f"交互式版本已生成: {output_file}")
+    return render_figure(data, catalog or CATALOG, 'ultra', batched)
+
+def create_interactive_fishbone_diagram(data, batched=True, catalog=None):
+    """创建带有checkbox功能的交互式鱼骨图
     
-    if not generated_files:
-        print(f"错误：未知的版本参数 '{version}'")
-        print("可用的版本参数：")
-        print("- 'all': 生成所有版本")
-        print("- 'basic': 基础版本")
-        print("- 'detailed': 详细版本")  
-        print("- 'static': 静态展示版本")
-        print("- 'ultra': 超清晰布局版本")
-        print("- 'interactive': 交互式版本（带checkbox）")
-        return
+    Args:
+        batched (bool): 是否按维度批量生成连接线和端点trace（默认开启）
+        catalog (dict): 可选，替代CATALOG的翻译目录（例如维度更多的模型）
+    """
+    return render_figure(data, catalog or CATALOG, 'interactive', batched)
+
+# 各版本的构建配置：构建函数、输出文件名、生成后是否用fig.show()打开和write_html配置
+VERSIONS = {
+    'basic': {
+        'label': '基础版本',
+        'builder': create_fishbone_diagram,
+        'filename': 'ai_sd_maturity_basic.html',
+        'show': True,
+        'config': None
+    },
+    'detailed': {
+        'label': '详细版本',
+        'builder': create_detailed_fishbone_diagram,
+        'filename': 'ai_sd_maturity_detailed.html',
+        'show': True,
+        'config': None
+    },
+    'static': {
+        'label': '静态展示版本',
+        'builder': create_static_fishbone_diagram,
+        'filename': 'ai_sd_maturity_static.html',
+        'show': True,
+        'config': {'editable': True, 'toImageButtonOptions': {'format': 'png', 'filename': 'ai_maturity_fishbone_static', 'height': 1000, 'width': 1600, 'scale': 1}}
+    },
+    'ultra': {
+        'label': '超清晰布局版本',
+        'builder': create_ultra_clean_fishbone_diagram,
+        'filename': 'ai_sd_maturity_overview_ultra.html',
+        'show': True,
+        'config': {'editable': True, 'toImageButtonOptions': {'format': 'png', 'filename': 'ai_maturity_fishbone', 'height': 1200, 'width': 1900, 'scale': 1}}
+    },
+    'interactive': {
+        'label': '交互式版本（带checkbox）',
+        'builder': create_interactive_fishbone_diagram,
+        'filename': 'ai_sd_maturity_interactive.html',
+        'show': False,
+        'config': None,
+        'interactive': True
+    }
+}
+
+# 路径均相对于脚本所在目录，与当前工作目录无关
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, '..', 'output')
+DATA_FILE = os.path.join(SCRIPT_DIR, '..', '..', 'resource', 'model_of_level.json')
+
+# 共享构建流程（fishbone_build）使用的日志信息、命令行帮助和 --list 输出
+TEXT = {
+    'unknown_version': "错误：未知的版本参数 '{version}'",
+    'version_list': [
+        "可用的版本参数：",
+        "- 'all': 生成所有版本",
+        "- 'basic': 基础版本",
+        "- 'detailed': 详细版本",
+        "- 'static': 静态展示版本",
+        "- 'ultra': 超清晰布局版本",
+        "- 'interactive': 交互式版本（带checkbox）",
+    ],
+    'created_output_dir': "已创建输出目录: {path}",
+    'generating': "正在生成{label}...",
+    'failed': "错误：{label}生成失败: {error}",
+    'profile_version': "{label}性能分析：",
+    'profile_load': "数据加载性能分析：",
+    'generated_heading': "鱼骨图已生成完成！",
+    'cached_heading': "以下版本未发生变化，已跳过（使用 --force 强制重新生成）：",
+    'failed_heading': "以下版本生成失败：",
+    'description': '生成AI成熟度模型鱼骨图',
+    'version_help': '指定生成的版本 (默认: all)',
+    'list_help': '显示所有可用的版本',
+    'force_help': '忽略构建缓存，强制重新生成',
+    'headless_help': '无头批处理模式：不调用fig.show()，适用于cron和容器等无显示环境',
+    'summary_json_help': "输出机器可读的构建摘要JSON（文件、字节数、各阶段耗时），'-' 表示输出到标准输出",
+    'profile_help': '性能分析模式：输出每个版本各阶段（load/capabilities/construct/validate/serialize/template/write）的墙钟时间、CPU时间和内存峰值，隐含--force',
+    'profile_dump_help': '将每个版本的cProfile统计写入DIR/<version>.pstats（隐含--profile）',
+    'list': """可用的版本：
+- all: 生成所有版本（默认）
+- basic: 基础版本
+- detailed: 详细版本
+- static: 静态展示版本（包含可拖拽参考线）
+- ultra: 超清晰布局版本（包含可拖拽参考线）
+- interactive: 交互式版本（带checkbox能力跟踪）
+
+推荐使用 'interactive' 版本，它包含侧边栏checkbox让您可以跟踪已完成的能力。"""
+}
+
+# 共享构建流程和命令行所需的本语言配置
+GENERATOR = {
+    'versions': VERSIONS,
+    'all': 'all',
+    'data_file': DATA_FILE,
+    'output_dir': OUTPUT_DIR,
+    'template': create_interactive_html_template,
+    'text': TEXT
+}
+
+def write_interactive_html(output_file, plot_div, capabilities_data, plotlyjs_src):
+    """将交互式页面流式写入输出文件"""
+    fishbone_build.write_interactive_html(output_file, create_interactive_html_template, plot_div,
+                                          capabilities_data, plotlyjs_src)
+
+def build_version(version, data, output_dir=OUTPUT_DIR, timer=None, plotlyjs_src=None):
+    """构建单个版本并写入输出目录，见 fishbone_build.build_version"""
+    return fishbone_build.build_version(GENERATOR, version, data, output_dir, timer, plotlyjs_src)
+
+def render_page(version, fig, data, plotlyjs_src):
+    """在内存中生成已构建图表的完整页面，见 fishbone_build.render_page"""
+    return fishbone_build.render_page(GENERATOR, version, fig, data, plotlyjs_src)
+
+def main(version='all', force=False, headless=False, summary_json=None, profile=False, profile_dump=None):
+    """生成指定版本（'all' 为所有版本），见 fishbone_build.main
     
-    print(f"\n鱼骨图已生成完成！")
-    for file_info in generated_files:
-        print(file_info)
+    Returns:
+        int: 退出码（0 成功，1 有版本生成失败，2 参数错误）
+    """
+    return fishbone_build.main(GENERATOR, version, force, headless, summary_json, profile, profile_dump)
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='生成AI成熟度模型鱼骨图')
-    parser.add_argument(
-        '--version', '-v', 
-        choices=['all', 'basic', 'detailed', 'static', 'ultra', 'interactive'],
-        default='all',
-        help='指定生成的版本 (默认: all)'
-    )
-    parser.add_argument(
-        '--list', '-l',
-        action='store_true',
-        help='显示所有可用的版本'
-    )
-    
-    args = parser.parse_args()
-    
-    if args.list:
-        print("可用的版本：")
-        print("- all: 生成所有版本（默认）")
-        print("- basic: 基础版本")
-        print("- detailed: 详细版本")
-        print("- static: 静态展示版本（包含可拖拽参考线）")
-        print("- ultra: 超清晰布局版本（包含可拖拽参考线）")
-        print("- interactive: 交互式版本（带checkbox能力跟踪）")
-        print("\n推荐使用 'interactive' 版本，它包含侧边栏checkbox让您可以跟踪已完成的能力。")
-        sys.exit(0)
-    
-    main(args.version) 
\ No newline at end of file
+    sys.exit(fishbone_build.cli(GENERATOR))
@@ -1,31 +1,11 @@
-import argparse
-import json
 import os
 import sys
 
-import plotly.graph_objects as go
+import fishbone_build
+from fishbone_build import generate_capabilities_data, load_maturity_data
+from fishbone_engine import render_figure
 
 
-def load_maturity_data(file_path):
-    """Load AI maturity model data"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def generate_capabilities_data(data):
-    """Generate capabilities data in JSON format for JavaScript usage"""
-    capabilities_data = {}
-    
-    levels = list(data['levels'].keys())
-    for level in levels:
-        level_data = data['levels'][level]
-        if 'capabilities' in level_data:
-            for capability_type, capabilities in level_data['capabilities'].items():
-                if capability_type not in capabilities_data:
-                    capabilities_data[capability_type] = {}
-                capabilities_data[capability_type][level] = capabilities
-    
-    return capabilities_data
-
 def create_interactive_html_template():
     """Create interactive HTML template"""
     template = """
@@ -34,7 +14,7 @@ def create_interactive_html_template():
 <head>
     <meta charset="utf-8">
     <title>AI Maturity Model Fishbone Diagram - Interactive Version</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <script src="{plotlyjs_src}"></script>
     <style>
         body {
             font-family: Arial, sans-serif;
@@ -61,7 +41,8 @@ def create_interactive_html_template():
             margin-left: 300px;
             flex: 1;
             padding: 20px;
-            overflow: hidden;
+            overflow-x: hidden;
+            overflow-y: auto;
             height: 100vh;
             display: flex;
             flex-direction: column;
@@ -161,6 +142,12 @@ def create_interactive_html_template():
             font-size: 14px;
         }
         
+        .save-status {
+            margin-top: 4px;
+            font-size: 12px;
+            color: #666;
+        }
+        
         .capability-group[data-type="Personnel"] {
             border-left: 4px solid #FF6B6B;
         }
@@ -206,6 +193,7 @@ def create_interactive_html_template():
         
         <div class="progress-info">
             <div id="progress-text">Completed: 0 / 0 (0%)</div>
+            <div id="save-status" class="save-status"></div>
         </div>
         
         <div id="capabilities-container">
@@ -235,20 +223,162 @@ def create_interactive_html_template():
         // Initialize
         let completedCapabilities = new Set();
         
-        // Load completed capabilities from localStorage
+        // Progress is stored on the server per assessment: ?assessment=<id> in the URL for a team assessment, otherwise a personal assessment of this browser. Opened from disk, the page keeps it in localStorage
+        const PROGRESS_KEY = 'ai_maturity_progress_en';
+        const PROGRESS_DEBOUNCE_MS = 500;
+        const PROGRESS_RETRY_MS = 5000;
+        const PROGRESS_POLL_MS = 15000;
+        const sharedAssessment = new URLSearchParams(location.search).get('assessment');
+        let progressApi = location.protocol.startsWith('http')
+            ? '/api/progress/' + encodeURIComponent(sharedAssessment || personalAssessment())
+            : null;
+        let progressRevision = 0;
+        let pendingOperations = new Map();
+        let sendingOperations = null;
+        let flushTimer = null;
+        
+        // ID of the personal assessment of this browser
+        function personalAssessment() {
+            let id = localStorage.getItem('ai_maturity_assessment');
+            if (!id) {
+                id = 'personal-' + Math.random().toString(36).slice(2, 12);
+                localStorage.setItem('ai_maturity_assessment', id);
+            }
+            return id;
+        }
+        
+        function setSaveStatus(text) {
+            document.getElementById('save-status').textContent = text;
+        }
+        
+        // Load the completed capabilities of the assessment
         function loadProgress() {
-            const saved = localStorage.getItem('ai_maturity_progress_en');
-            if (saved) {
-                completedCapabilities = new Set(JSON.parse(saved));
+            const saved = JSON.parse(localStorage.getItem(PROGRESS_KEY) || '[]');
+            if (!progressApi) {
+                completedCapabilities = new Set(saved);
                 updateCheckboxes();
                 updateProgress();
+                return;
             }
-        }
-        
-        // Save progress to localStorage
+            fetch(progressApi, { cache: 'no-store' })
+                .then(response => {
+                    if (!response.ok) throw new Error(response.status);
+                    return response.json();
+                })
+                .then(progress => {
+                    progressRevision = progress.revision;
+                    completedCapabilities = new Set(progress.completed);
+                    // Move the progress saved in this browser by earlier versions to the new personal assessment
+                    if (!sharedAssessment && progress.revision === 0) {
+                        saved.forEach(capabilityId => queueToggle(capabilityId, true));
+                    }
+                    updateCheckboxes();
+                    updateProgress();
+                    setInterval(pollProgress, PROGRESS_POLL_MS);
+                })
+                .catch(() => {
+                    progressApi = null;
+                    completedCapabilities = new Set(saved);
+                    updateCheckboxes();
+                    updateProgress();
+                    setSaveStatus('Offline: progress is saved in this browser only');
+                });
+        }
+        
+        // Record a toggle and send it with the others of the next batch, once no toggle arrived for PROGRESS_DEBOUNCE_MS
+        function queueToggle(capabilityId, completed) {
+            if (completed) {
+                completedCapabilities.add(capabilityId);
+            } else {
+                completedCapabilities.delete(capabilityId);
+            }
+            pendingOperations.set(capabilityId, completed);
+            clearTimeout(flushTimer);
+            flushTimer = setTimeout(flushProgress, PROGRESS_DEBOUNCE_MS);
+        }
+        
+        // Send the pending toggles as one batch of delta operations
+        function flushProgress(keepalive) {
+            clearTimeout(flushTimer);
+            if (!progressApi) {
+                localStorage.setItem(PROGRESS_KEY, JSON.stringify([...completedCapabilities]));
+                pendingOperations.clear();
+                setSaveStatus('Saved in this browser');
+                return;
+            }
+            if (pendingOperations.size === 0) return;
+            if (sendingOperations) {
+                // One batch at a time, so the batches are applied in order
+                flushTimer = setTimeout(flushProgress, PROGRESS_DEBOUNCE_MS);
+                return;
+            }
+            const batch = pendingOperations;
+            pendingOperations = new Map();
+            sendingOperations = batch;
+            setSaveStatus('Saving...');
+            fetch(progressApi, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ operations: [...batch].map(([id, done]) => ({ id, done })) }),
+                keepalive: keepalive === true
+            })
+                .then(response => {
+                    if (!response.ok) throw new Error(response.status);
+                    if (!sharedAssessment) localStorage.removeItem(PROGRESS_KEY);
+                    setSaveStatus('All changes saved');
+                })
+                .catch(() => {
+                    // Keep the failed toggles for the next attempt, unless they were toggled again meanwhile
+                    batch.forEach((done, id) => {
+                        if (!pendingOperations.has(id)) pendingOperations.set(id, done);
+                    });
+                    setSaveStatus('Not saved, retrying...');
+                    flushTimer = setTimeout(flushProgress, PROGRESS_RETRY_MS);
+                })
+                .finally(() => {
+                    sendingOperations = null;
+                });
+        }
+        
+        // Apply the other assessors' changes since the last known revision
+        function pollProgress() {
+            if (document.hidden || !progressApi) return;
+            fetch(progressApi + '?since=' + progressRevision, { cache: 'no-store' })
+                .then(response => {
+                    // 400: the server does not know this revision (e.g. its database was reset), load the full state
+                    if (response.status === 400) {
+                        return fetch(progressApi, { cache: 'no-store' }).then(full => full.ok ? full.json() : null);
+                    }
+                    return response.ok ? response.json() : null;
+                })
+                .then(result => {
+                    if (!result) return;
+                    progressRevision = result.revision;
+                    let changes = result.changes;
+                    if (!changes) {
+                        // Full state: capabilities checked here but not on the server are unchecked
+                        changes = {};
+                        completedCapabilities.forEach(capabilityId => { changes[capabilityId] = false; });
+                        result.completed.forEach(capabilityId => { changes[capabilityId] = true; });
+                    }
+                    for (const [capabilityId, completed] of Object.entries(changes)) {
+                        // Toggles not yet saved here take precedence
+                        if (pendingOperations.has(capabilityId) || (sendingOperations && sendingOperations.has(capabilityId))) continue;
+                        if (completed) {
+                            completedCapabilities.add(capabilityId);
+                        } else {
+                            completedCapabilities.delete(capabilityId);
+                        }
+                    }
+                    updateCheckboxes();
+                    updateProgress();
+                })
+                .catch(() => {});
+        }
+        
+        // Save now instead of waiting for the debounce
         function saveProgress() {
-            localStorage.setItem('ai_maturity_progress_en', JSON.stringify([...completedCapabilities]));
-            alert('Progress saved!');
+            flushProgress();
         }
         
         // Generate capabilities list HTML
@@ -291,26 +421,17 @@ def create_interactive_html_template():
             const checkbox = document.getElementById(capabilityId);
             const label = checkbox.nextElementSibling;
             
-            if (checkbox.checked) {
-                completedCapabilities.add(capabilityId);
-                label.classList.add('completed');
-            } else {
-                completedCapabilities.delete(capabilityId);
-                label.classList.remove('completed');
-            }
+            label.classList.toggle('completed', checkbox.checked);
+            queueToggle(capabilityId, checkbox.checked);
             
             updateProgress();
         }
         
         // Update checkbox states
         function updateCheckboxes() {
-            completedCapabilities.forEach(capabilityId => {
-                const checkbox = document.getElementById(capabilityId);
-                const label = checkbox ? checkbox.nextElementSibling : null;
-                if (checkbox) {
-                    checkbox.checked = true;
-                    if (label) label.classList.add('completed');
-                }
+            document.querySelectorAll('.capability-checkbox').forEach(checkbox => {
+                checkbox.checked = completedCapabilities.has(checkbox.id);
+                checkbox.nextElementSibling.classList.toggle('completed', checkbox.checked);
             });
         }
         
@@ -329,8 +450,8 @@ def create_interactive_html_template():
             document.querySelectorAll('.capability-checkbox').forEach(checkbox => {
                 if (!checkbox.checked) {
                     checkbox.checked = true;
-                    completedCapabilities.add(checkbox.id);
                     checkbox.nextElementSibling.classList.add('completed');
+                    queueToggle(checkbox.id, true);
                 }
             });
             updateProgress();
@@ -341,686 +462,195 @@ def create_interactive_html_template():
             document.querySelectorAll('.capability-checkbox').forEach(checkbox => {
                 if (checkbox.checked) {
                     checkbox.checked = false;
-                    completedCapabilities.delete(checkbox.id);
                     checkbox.nextElementSibling.classList.remove('completed');
+                    queueToggle(checkbox.id, false);
                 }
             });
             updateProgress();
         }
         
+        // Large models get a fixed figure height (see fishbone_layout); the chart div
+        // then follows it instead of the viewport, and the main content scrolls
+        function fitChartHeight() {
+            const chart = document.querySelector('#plotly-div .plotly-graph-div');
+            if (chart && chart.layout && chart.layout.height) {
+                chart.style.setProperty('height', chart.layout.height + 'px', 'important');
+            }
+        }
+        
         // Initialize after page load
         document.addEventListener('DOMContentLoaded', function() {
+            fitChartHeight();
             generateCapabilitiesHTML();
             loadProgress();
         });
+        
+        // Send the pending toggles before the page is hidden or closed
+        document.addEventListener('visibilitychange', function() {
+            if (document.hidden) flushProgress(true);
+        });
+        window.addEventListener('pagehide', function() {
+            flushProgress(true);
+        });
     </script>
 </body>
 </html>
     """
     return template
 
-def create_ultra_clean_fishbone_diagram(data):
-    """Create ultra-clean layout fishbone diagram with layered display strategy"""
-    fig = go.Figure()
-    
-    # Define color scheme
-    colors = {
-        'Personnel': '#FF6B6B',
-        'Technical': '#45B7D1',
-        'Process': '#4ECDC4', 
-        'Knowledge Management': '#96CEB4',
-        'Governance': '#FFEAA7'
-    }
-    
-    # Y-coordinates for capability dimensions (compact spacing)
-    capability_positions = {
-        'Personnel': 4,
-        'Technical': 2,
-        'Process': -2,
-        'Knowledge Management': -4,
-        'Governance': -6
-    }
-    
-    levels = list(data['levels'].keys())
-    level_names = [data['levels'][level]['title'] for level in levels]
-    
-    # X-axis positions - moderate spacing to avoid overlap
-    x_positions = [3 + i * 4 for i in range(len(levels))]
-    
-    # Draw main trunk (horizontal line)
-    fig.add_trace(go.Scatter(
-        x=[0, max(x_positions) + 2.7],
-        y=[0, 0],
-        mode='lines',
-        line=dict(color='black', width=5),
-        name='AI Maturity Evolution Main Line',
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-    
-    # Add right arrow at the end of main trunk
-    fig.add_annotation(
-        x=max(x_positions) + 2.7,
-        y=0,
-        text='▶',
-        showarrow=False,
-        font=dict(size=20, color='black'),
-        xanchor='left',
-        yanchor='middle'
-    )
-    
-    # Add maturity level markers (without text)
-    fig.add_trace(go.Scatter(
-        x=x_positions,
-        y=[0] * len(levels),
-        mode='markers',
-        marker=dict(size=20, color='darkred', symbol='diamond'),
-        name='Maturity Levels',
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-    
-    # Draw branches for each capability dimension
-    for capability_type, y_pos in capability_positions.items():
-        color = colors[capability_type]
-        
-        # Add main capability dimension label (larger and more prominent)
-        fig.add_annotation(
-            x=-0.5,
-            y=y_pos,
-            text=f'<b>{capability_type}</b>',
-            showarrow=False,
-            font=dict(size=20, color=color),
-            xanchor='right',
-            yanchor='middle',
-            bgcolor='rgba(255, 255, 255, 0.95)',
-            bordercolor=color,
-            borderwidth=3
-        )
-        
-        # Draw information for each level in this dimension
-        for i, level in enumerate(levels):
-            level_data = data['levels'][level]
-            if 'capabilities' in level_data and capability_type in level_data['capabilities']:
-                capabilities = level_data['capabilities'][capability_type]
-                x_pos = x_positions[i]
-                
-                # Draw connection line
-                fig.add_trace(go.Scatter(
-                    x=[x_pos, x_pos],
-                    y=[0, y_pos],
-                    mode='lines',
-                    line=dict(color=color, width=3),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # Create hover-enabled markers for capability details
-                capabilities_text = '<br>'.join([f'• {cap}' for cap in capabilities])
-                hover_text = f'<b>{capability_type} - {level}</b><br><br>{capabilities_text}'
-                
-                # Display full capability details text box - restore original full display
-                capabilities_text_display = '<br>'.join([f'• {cap}' for cap in capabilities])
-                
-                fig.add_annotation(
-                    x=x_pos,
-                    y=y_pos,
-                    text=capabilities_text_display,
-                    showarrow=False,
-                    font=dict(size=10, color='black'),
-                    bgcolor='rgba(255, 255, 255, 0.98)',
-                    bordercolor=color,
-                    borderwidth=2,
-                    align='left',
-                    width=400,
-                    xanchor='center',
-                    yanchor='middle'
-                )
-                
-                # Add appropriately sized invisible marker to cover just the annotation area
-                # For Ultra-Clean version with width=400, use a moderate marker
-                fig.add_trace(go.Scatter(
-                    x=[x_pos],
-                    y=[y_pos],
-                    mode='markers',
-                    marker=dict(size=80, color=color, opacity=0),  # Smaller marker for more precise hover area
-                    showlegend=False,
-                    hovertemplate=hover_text + '<extra></extra>',
-                    name=f'{capability_type}-{level}'
-                ))
-                
-                # Visible end point
-                fig.add_trace(go.Scatter(
-                    x=[x_pos],
-                    y=[y_pos],
-                    mode='markers',
-                    marker=dict(size=12, color=color),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-    
-    # Add level description information at the top - compact layout
-    description_y = 9
-    for i, level in enumerate(levels):
-        level_data = data['levels'][level]
-        description_text = f"<b>{level_data['title']}</b><br><br>{level_data['description']}<br><br><b>Features:</b> {level_data['features']}"
-        x_pos = x_positions[i]
-        
-        # Add hover-enabled markers for level descriptions
-        hover_description = f"<b>{level_data['title']}</b><br><br><b>Description:</b><br>{level_data['description']}<br><br><b>Features:</b><br>{level_data['features']}"
-        
-        fig.add_trace(go.Scatter(
-            x=[x_pos],
-            y=[description_y],
-            mode='markers',
-            marker=dict(size=50, color='darkred', opacity=0),  # Smaller marker for more precise hover area
-            showlegend=False,
-            hovertemplate=hover_description + '<extra></extra>',
-            name=f'Level-{level}'
-        ))
-        
-        fig.add_annotation(
-            x=x_pos,
-            y=description_y,
-            text=f"<b>{level_data['title']}</b><br><br>{level_data['description']}<br><br><b>Features:</b> {level_data['features']}",
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1.5,
-            arrowcolor='darkred',
-            arrowwidth=2,
-            ax=0,
-            ay=-40,
-            font=dict(size=9, color='darkred'),
-            bgcolor='rgba(255, 248, 248, 0.98)',
-            bordercolor='darkred',
-            borderwidth=2,
-            align='left',
-            width=200,
-            standoff=10
-        )
-    
-    # Add reference lines
-    # Industry position line (at L4 position)
-    industry_position = x_positions[4]  # L4 position
-    # GITS position line (between L1 and L2)
-    organization_position = (x_positions[1] + x_positions[2]) / 2
-    
-    # Set layout
-    fig.update_layout(
-        title={
-            'text': 'AI Software Delivery Capability Maturity Model Overview',
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 24, 'color': 'darkblue'}
-        },
-        xaxis=dict(
-            title=dict(text='Maturity Levels', font=dict(size=16)),
-            tickmode='array',
-            tickvals=x_positions,
-            ticktext=levels,
-            tickfont=dict(size=14),
-            range=[-3, max(x_positions) + 2],
-            showgrid=True,
-            gridcolor='lightgray',
-            gridwidth=1
-        ),
-        yaxis=dict(
-            title=dict(text='Capability Dimensions', font=dict(size=16)),
-            tickfont=dict(size=14),
-            showticklabels=False,
-            range=[-10, 12],
-            showgrid=True,
-            gridcolor='lightgray',
-            gridwidth=1
-        ),
-        width=1900,
-        height=1200,
-        showlegend=False,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        margin=dict(l=200, r=100, t=100, b=100),
-        # Configure hover settings
-        hovermode='closest',
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="gray",
-            font_size=12,
-            font_family="Arial"
-        ),
-        # Add reference lines (non-editable)
-        shapes=[
-            # Industry position line
-            dict(
-                type="line",
-                x0=industry_position,
-                y0=-10,
-                x1=industry_position,
-                y1=12,
-                line=dict(
-                    color="orange",
-                    width=3,
-                    dash="dash"
-                ),
-                editable=False,
-                name="Industry Position"
-            ),
-            # Organization position line
-            dict(
-                type="line",
-                x0=organization_position,
-                y0=-10,
-                x1=organization_position,
-                y1=12,
-                line=dict(
-                    color="purple",
-                    width=3,
-                    dash="dash"
-                ),
-                editable=False,
-                name="GITS Position"
-            )
-        ],
-        # Add annotation explanations
-        annotations=list(fig.layout.annotations) + [
-            dict(
-                x=industry_position,
-                y=11,
-                text="<b>Industry Position</b><br>(Reference)",
-                showarrow=True,
-                arrowhead=2,
-                arrowcolor="orange",
-                font=dict(size=12, color="orange"),
-                bgcolor="rgba(255, 255, 255, 0.9)",
-                bordercolor="orange",
-                borderwidth=2,
-                ax=0,
-                ay=-30
-            ),
-            dict(
-                x=organization_position,
-                y=11,
-                text="<b>GITS Position</b><br>(Reference)",
-                showarrow=True,
-                arrowhead=2,
-                arrowcolor="purple",
-                font=dict(size=12, color="purple"),
-                bgcolor="rgba(255, 255, 255, 0.9)",
-                bordercolor="purple",
-                borderwidth=2,
-                ax=0,
-                ay=-30
-            )
-        ]
-    )
-    
-    return fig
+# shared rendering engine, this only supplies the English strings
+CATALOG = {
+    # Capability dimensions and their colors; the order decides branch placement
+    'dimensions': [
+        ('Personnel', '#FF6B6B'),
+        ('Technical', '#45B7D1'),
+        ('Process', '#4ECDC4'),
+        ('Knowledge Management', '#96CEB4'),
+        ('Governance', '#FFEAA7')
+    ],
+    'trunk_name': 'AI Maturity Evolution Main Line',
+    'levels_name': 'Maturity Levels',
+    'titles': {
+        'ultra': 'AI Software Delivery Capability Maturity Model Overview',
+        'interactive': 'AI Maturity Model Fishbone Diagram - Interactive Version (Check completed capabilities on the left)'
+    },
+    'xaxis_title': 'Maturity Levels',
+    'yaxis_title': 'Capability Dimensions',
+    'cell_hover': '<b>{dimension} - {level}</b><br><br>{capabilities}',
+    'cell_summary': ('<b style="font-size:12px">{count} capabilities</b><br>'
+                     '<i style="font-size:10px">Hover for details</i><br>'
+                     '<span style="font-size:8px; color:gray">See sidebar for tracking</span>'),
+    'level_description': '<b>{title}</b><br><br>{description}<br><br><b>Features:</b> {features}',
+    'level_hover': '<b>{title}</b><br><br><b>Description:</b><br>{description}<br><br><b>Features:</b><br>{features}',
+    # Reference lines sit halfway between two levels (by index)
+    'reference_lines': {
+        'industry': {'name': 'Industry Position', 'label': '<b>Industry Position</b><br>(Reference)', 'levels': (4, 4)},
+        'organization': {'name': 'GITS Position', 'label': '<b>GITS Position</b><br>(Reference)', 'levels': (1, 2)}
+    },
+    'reference_lines_editable': False
+}
 
-def create_interactive_fishbone_diagram(data):
-    """Create interactive fishbone diagram with checkbox functionality"""
-    fig = go.Figure()
-    
-    # Add Y-axis title as first annotation (bottom layer with transparency)
-    fig.add_annotation(
-        x=-2.5,
-        y=0,
-        text='<b>Capability Dimensions</b>',
-        showarrow=False,
-        font=dict(size=14, color='rgba(0, 0, 0, 0.5)'),  # Semi-transparent black
-        xanchor='center',
-        yanchor='middle',
-        textangle=-90,
-        bgcolor='rgba(255, 255, 255, 0.3)',  # More transparent background
-        bordercolor='rgba(128, 128, 128, 0.3)',  # Semi-transparent border
-        borderwidth=1
-    )
-    
-    # Define color scheme
-    colors = {
-        'Personnel': '#FF6B6B',
-        'Technical': '#45B7D1',
-        'Process': '#4ECDC4', 
-        'Knowledge Management': '#96CEB4',
-        'Governance': '#FFEAA7'
-    }
-    
-    # Y-coordinates for capability dimensions
-    capability_positions = {
-        'Personnel': 4,
-        'Technical': 2,
-        'Process': -2,
-        'Knowledge Management': -4,
-        'Governance': -6
-    }
-    
-    levels = list(data['levels'].keys())
-    level_names = [data['levels'][level]['title'] for level in levels]
-    
-    # X-axis positions - optimized spacing for better right-side space utilization
-    x_positions = [2 + i * 3.5 for i in range(len(levels))]
-    
-    # Draw main trunk - adjust length to fit new X-axis range
-    fig.add_trace(go.Scatter(
-        x=[-0.5, max(x_positions) + 1.2],
-        y=[0, 0],
-        mode='lines',
-        line=dict(color='black', width=5),
-        name='AI Maturity Evolution Main Line',
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-    
-    # Add right arrow at the end of main trunk
-    arrow_x = max(x_positions) + 1.2
-    fig.add_annotation(
-        x=arrow_x,
-        y=0,
-        text='▶',
-        showarrow=False,
-        font=dict(size=20, color='black'),
-        xanchor='left',
-        yanchor='middle'
-    )
-    
-    # Add maturity level markers (without text)
-    fig.add_trace(go.Scatter(
-        x=x_positions,
-        y=[0] * len(levels),
-        mode='markers',
-        marker=dict(size=20, color='darkred', symbol='diamond'),
-        name='Maturity Levels',
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-    
-    # Draw branches for each capability dimension
-    for capability_type, y_pos in capability_positions.items():
-        color = colors[capability_type]
-        
-        # Add main capability dimension label
-        fig.add_annotation(
-            x=-0.3,
-            y=y_pos,
-            text=f'<b>{capability_type}</b>',
-            showarrow=False,
-            font=dict(size=16, color=color),
-            xanchor='right',
-            yanchor='middle',
-            bgcolor='rgba(255, 255, 255, 0.95)',
-            bordercolor=color,
-            borderwidth=2
-        )
-        
-        # Draw information for each level in this dimension
-        for i, level in enumerate(levels):
-            level_data = data['levels'][level]
-            if 'capabilities' in level_data and capability_type in level_data['capabilities']:
-                capabilities = level_data['capabilities'][capability_type]
-                x_pos = x_positions[i]
-                
-                # Draw connection line
-                fig.add_trace(go.Scatter(
-                    x=[x_pos, x_pos],
-                    y=[0, y_pos],
-                    mode='lines',
-                    line=dict(color=color, width=3),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # Create hover-enabled markers for capability details
-                capabilities_text = '<br>'.join([f'• {cap}' for cap in capabilities])
-                hover_text = f'<b>{capability_type} - {level}</b><br><br>{capabilities_text}'
-                
-                # Simplified capability information display (detailed info in sidebar)
-                # Use different font sizes within the same annotation
-                main_text = f'<b style="font-size:12px">{len(capabilities)} capabilities</b>'
-                hover_text_display = f'<i style="font-size:10px">Hover for details</i>'
-                sidebar_text = f'<span style="font-size:8px; color:gray">See sidebar for tracking</span>'
-                
-                fig.add_annotation(
-                    x=x_pos,
-                    y=y_pos,
-                    text=f'{main_text}<br>{hover_text_display}<br>{sidebar_text}',
-                    showarrow=False,
-                    font=dict(size=10, color='black'),
-                    bgcolor='rgba(255, 255, 255, 0.98)',
-                    bordercolor=color,
-                    borderwidth=2,
-                    align='center',
-                    width=200,
-                    xanchor='center',
-                    yanchor='middle'
-                )
-                
-                # Add appropriately sized invisible marker to cover just the annotation area
-                # For Interactive version with width=200, use a smaller marker for precise targeting
-                fig.add_trace(go.Scatter(
-                    x=[x_pos],
-                    y=[y_pos],
-                    mode='markers',
-                    marker=dict(size=60, color=color, opacity=0),  # Smaller marker for more precise hover area
-                    showlegend=False,
-                    hovertemplate=hover_text + '<extra></extra>',
-                    name=f'{capability_type}-{level}'
-                ))
-                
-                # Visible end point
-                fig.add_trace(go.Scatter(
-                    x=[x_pos],
-                    y=[y_pos],
-                    mode='markers',
-                    marker=dict(size=12, color=color),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
+def create_ultra_clean_fishbone_diagram(data, batched=True, catalog=None):
+    """Create ultra-clean layout fishbone diagram with layered display strategy
     
-    # Add level description information at the top - adjust position to avoid overlap
-    description_y = 12
-    for i, level in enumerate(levels):
-        level_data = data['levels'][level]
-        description_text = f"<b>{level_data['title']}</b><br><br>{level_data['description']}<br><br><b>Features:</b> {level_data['features']}"
-        x_pos = x_positions[i]
-        
-        # Add hover-enabled markers for level descriptions
-        hover_description = f"<b>{level_data['title']}</b><br><br><b>Description:</b><br>{level_data['description']}<br><br><b>Features:</b><br>{level_data['features']}"
-        
-        fig.add_trace(go.Scatter(
-            x=[x_pos],
-            y=[description_y],
-            mode='markers',
-            marker=dict(size=50, color='darkred', opacity=0),  # Smaller marker for more precise hover area
-            showlegend=False,
-            hovertemplate=hover_description + '<extra></extra>',
-            name=f'Level-{level}'
-        ))
-        
-        fig.add_annotation(
-            x=x_pos,
-            y=description_y,
-            text=f"<b>{level_data['title']}</b><br><br>{level_data['description']}<br><br><b>Features:</b> {level_data['features']}",
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1.5,
-            arrowcolor='darkred',
-            arrowwidth=2,
-            ax=0,
-            ay=-40,
-            font=dict(size=9, color='darkred'),
-            bgcolor='rgba(255, 248, 248, 0.98)',
-            bordercolor='darkred',
-            borderwidth=2,
-            align='left',
-            width=160,
-            standoff=10
-        )
+    Args:
+        batched (bool): Build one line trace and one marker trace per dimension
+            instead of three traces per (dimension, level) cell (default: True)
+        catalog (dict): Optional catalog to use instead of CATALOG (e.g. for models with other dimensions)
+    """
+    return render_figure(data, catalog or CATALOG, 'ultra', batched)
+
+def create_interactive_fishbone_diagram(data, batched=True, catalog=None):
+    """Create interactive fishbone diagram with checkbox functionality
     
-    # Set layout
-    fig.update_layout(
-        title={
-            'text': 'AI Maturity Model Fishbone Diagram - Interactive Version (Check completed capabilities on the left)',
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 18, 'color': 'darkblue'}
+    Args:
+        batched (bool): Build one line trace and one marker trace per dimension
+            instead of three traces per (dimension, level) cell (default: True)
+        catalog (dict): Optional catalog to use instead of CATALOG (e.g. for models with other dimensions)
+    """
+    return render_figure(data, catalog or CATALOG, 'interactive', batched)
+
+# Build configuration of each version: builder, output file name, whether a build opens it with fig.show() and write_html config
+VERSIONS = {
+    'ultra': {
+        'label': 'Ultra-clean layout version',
+        'builder': create_ultra_clean_fishbone_diagram,
+        'filename': 'ai_sd_maturity_ultra_en.html',
+        'show': True,
+        'config': {
+            'editable': False, 
+            'staticPlot': False,
+            'displayModeBar': True,
+            'displaylogo': False,
+            'modeBarButtonsToRemove': ['select2d', 'lasso2d', 'editInChartStudio'],
+            'toImageButtonOptions': {'format': 'png', 'filename': 'ai_sd_maturity_fishbone_en', 'height': 1200, 'width': 1900, 'scale': 1}
+        }
+    },
+    'interactive': {
+        'label': 'Interactive version (with checkbox)',
+        'builder': create_interactive_fishbone_diagram,
+        'filename': 'ai_sd_maturity_interactive_en.html',
+        'show': False,
+        'config': {
+            'editable': False,
+            'staticPlot': False,
+            'displayModeBar': True,
+            'displaylogo': False,
+            'modeBarButtonsToRemove': ['select2d', 'lasso2d', 'editInChartStudio'],
+            'toImageButtonOptions': {'format': 'png', 'filename': 'ai_sd_maturity_interactive_en', 'height': 800, 'width': 1200, 'scale': 1}
         },
-        xaxis=dict(
-            title=dict(text='Maturity Levels', font=dict(size=14)),
-            tickmode='array',
-            tickvals=x_positions,
-            ticktext=levels,
-            tickfont=dict(size=12),
-            range=[-2.5, max(x_positions) + 1.5],
-            showgrid=True,
-            gridcolor='lightgray',
-            gridwidth=1
-        ),
-        yaxis=dict(
-            title=dict(text=''),
-            tickfont=dict(size=12),
-            showticklabels=False,
-            range=[-8, 14],
-            showgrid=True,
-            gridcolor='lightgray',
-            gridwidth=1
-        ),
-        showlegend=False,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        margin=dict(l=50, r=50, t=60, b=40),
-        autosize=True,
-        # Configure hover settings
-        hovermode='closest',
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="gray",
-            font_size=12,
-            font_family="Arial"
-        )
-    )
-    
+        'interactive': True
+    }
+}
 
-    
-    return fig
+# Paths are resolved against the script directory, independent of the working directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, '..', 'output')
+DATA_FILE = os.path.join(SCRIPT_DIR, '..', '..', 'resource', 'model_of_level_en.json')
 
-def main(version='both'):
-    """Main function
-    
-    Args:
-        version (str): Specify the version to generate
-            - 'ultra': Ultra-clean layout version
-            - 'interactive': Interactive version (with checkbox)
-            - 'both': Generate both versions
+# Log messages, command line help and --list output of the shared build (fishbone_build)
+TEXT = {
+    'unknown_version': "Error: Unknown version parameter '{version}'",
+    'version_list': [
+        "Available version parameters:",
+        "- 'ultra': Ultra-clean layout version",
+        "- 'interactive': Interactive version (with checkbox)",
+        "- 'both': Generate both versions",
+    ],
+    'created_output_dir': "Created output directory: {path}",
+    'generating': "Generating {label}...",
+    'failed': "Error: failed to generate {label}: {error}",
+    'profile_version': "Profile of the {label}:",
+    'profile_load': "Profile of loading the model:",
+    'generated_heading': "Fishbone diagram generation completed!",
+    'cached_heading': "Up to date, skipped (use --force to rebuild):",
+    'failed_heading': "Failed to generate:",
+    'description': 'Generate AI Maturity Model Fishbone Diagram (English Version)',
+    'version_help': 'Specify the version to generate (default: both)',
+    'list_help': 'Show all available versions',
+    'force_help': 'Ignore the build cache and rebuild every requested version',
+    'headless_help': 'Headless batch mode: never call fig.show(), for cron jobs and containers without a display',
+    'summary_json_help': "Write a machine-readable build summary (files, byte sizes, stage timings); '-' for stdout",
+    'profile_help': 'Profiling mode: report wall time, CPU time and memory peak of every stage (load/capabilities/construct/validate/serialize/template/write) per version; implies --force',
+    'profile_dump_help': 'Write a cProfile stats file per version to DIR/<version>.pstats (implies --profile)',
+    'list': """Available versions:
+- ultra: Ultra-clean layout version (with draggable reference lines)
+- interactive: Interactive version (with checkbox capability tracking)
+- both: Generate both versions (default)
+
+Recommended to use 'interactive' version, which includes sidebar checkboxes for tracking completed capabilities."""
+}
+
+# Everything the shared build and command line need from this locale
+GENERATOR = {
+    'versions': VERSIONS,
+    'all': 'both',
+    'data_file': DATA_FILE,
+    'output_dir': OUTPUT_DIR,
+    'template': create_interactive_html_template,
+    'text': TEXT
+}
+
+def write_interactive_html(output_file, plot_div, capabilities_data, plotlyjs_src):
+    """Stream the interactive page to the output file"""
+    fishbone_build.write_interactive_html(output_file, create_interactive_html_template, plot_div,
+                                          capabilities_data, plotlyjs_src)
+
+def build_version(version, data, output_dir=OUTPUT_DIR, timer=None, plotlyjs_src=None):
+    """Build a single version and write it to the output directory, see fishbone_build.build_version"""
+    return fishbone_build.build_version(GENERATOR, version, data, output_dir, timer, plotlyjs_src)
+
+def render_page(version, fig, data, plotlyjs_src):
+    """Render the complete page of a built figure in memory, see fishbone_build.render_page"""
+    return fishbone_build.render_page(GENERATOR, version, fig, data, plotlyjs_src)
+
+def main(version='both', force=False, headless=False, summary_json=None, profile=False, profile_dump=None):
+    """Build 'ultra', 'interactive' or 'both' versions, see fishbone_build.main
+
+    Returns:
+        int: Exit code (0 success, 1 a version failed to build, 2 invalid arguments)
     """
-    # Create output directory
-    output_dir = '../output'
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Created output directory: {output_dir}")
-    
-    # Load data
-    # Get the directory of the current script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_file = os.path.join(script_dir, '../../resource/model_of_level_en.json')
-    data = load_maturity_data(data_file)
-    
-    generated_files = []
-    
-    if version == 'both' or version == 'ultra':
-        # Create ultra-clean layout fishbone diagram
-        print("Generating ultra-clean layout version...")
-        fig = create_ultra_clean_fishbone_diagram(data)
-        fig.show()
-        output_file = os.path.join(output_dir, 'ai_sd_maturity_ultra_en.html')
-        fig.write_html(output_file, 
-                        config={
-                            'editable': False, 
-                            'staticPlot': False,
-                            'displayModeBar': True,
-                            'displaylogo': False,
-                            'modeBarButtonsToRemove': ['select2d', 'lasso2d', 'editInChartStudio'],
-                            'toImageButtonOptions': {'format': 'png', 'filename': 'ai_sd_maturity_fishbone_en', 'height': 1200, 'width': 1900, 'scale': 1}
-                        })
-        generated_files.append(f"- Ultra-clean layout version: {output_file}")
-    
-    if version == 'both' or version == 'interactive':
-        # Create interactive fishbone diagram (with checkbox)
-        print("Generating interactive version (with checkbox)...")
-        fig = create_interactive_fishbone_diagram(data)
-        capabilities_data = generate_capabilities_data(data)
-        
-        # First generate complete HTML, then save as temporary file
-        temp_file = os.path.join(output_dir, 'temp_plot_en.html')
-        fig.write_html(temp_file, 
-                      include_plotlyjs='cdn',
-                      config={
-                          'editable': False,
-                          'staticPlot': False,
-                          'displayModeBar': True,
-                          'displaylogo': False,
-                          'modeBarButtonsToRemove': ['select2d', 'lasso2d', 'editInChartStudio'],
-                          'toImageButtonOptions': {'format': 'png', 'filename': 'ai_sd_maturity_interactive_en', 'height': 800, 'width': 1200, 'scale': 1}
-                      })
-        
-        # Read generated HTML content
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            plot_html = f.read()
-        
-        # Delete temporary file
-        os.remove(temp_file)
-        
-        # Extract body content
-        import re
-        body_match = re.search(r'<body[^>]*>(.*?)</body>', plot_html, re.DOTALL)
-        if body_match:
-            plot_content = body_match.group(1).strip()
-        else:
-            plot_content = '<div id="plotly-div"></div>'
-        
-        # Use custom template
-        template = create_interactive_html_template()
-        html_content = template.replace('{plot_div}', plot_content)
-        html_content = html_content.replace('{capabilities_json}', json.dumps(capabilities_data, ensure_ascii=False))
-        
-        output_file = os.path.join(output_dir, 'ai_sd_maturity_interactive_en.html')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        generated_files.append(f"- Interactive version (with checkbox): {output_file}")
-        print(f"Interactive version generated: {output_file}")
-    
-    if not generated_files:
-        print(f"Error: Unknown version parameter '{version}'")
-        print("Available version parameters:")
-        print("- 'ultra': Ultra-clean layout version")
-        print("- 'interactive': Interactive version (with checkbox)")
-        print("- 'both': Generate both versions")
-        return
-    
-    print(f"\nFishbone diagram generation completed!")
-    for file_info in generated_files:
-        print(file_info)
+    return fishbone_build.main(GENERATOR, version, force, headless, summary_json, profile, profile_dump)
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Generate AI Maturity Model Fishbone Diagram (English Version)')
-    parser.add_argument(
-        '--version', '-v', 
-        choices=['ultra', 'interactive', 'both'],
-        default='both',
-        help='Specify the version to generate (default: both)'
-    )
-    parser.add_argument(
-        '--list', '-l',
-        action='store_true',
-        help='Show all available versions'
-    )
-    
-    args = parser.parse_args()
-    
-    if args.list:
-        print("Available versions:")
-        print("- ultra: Ultra-clean layout version (with draggable reference lines)")
-        print("- interactive: Interactive version (with checkbox capability tracking)")
-        print("- both: Generate both versions (default)")
-        print("\nRecommended to use 'interactive' version, which includes sidebar checkboxes for tracking completed capabilities.")
-        sys.exit(0)
-    
-    main(args.version) 
\ No newline at end of file
+    sys.exit(fishbone_build.cli(GENERATOR))
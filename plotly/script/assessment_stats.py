@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Vectorized aggregation of many saved assessments.
+
+An assessment is the set of capability IDs checked in the interactive
+sidebar, ``<dimension>-<level>-<position>`` (e.g. ``Technical-L2-0``).
+The assessments are loaded into one capability × assessment boolean matrix
+(NumPy, one byte per cell). There is a row per capability of the model,
+dimension by dimension and level by level as in the sidebar, and a column
+per assessment. Capability IDs are mapped to rows with one hash table
+lookup (pandas.Index.get_indexer) and the matrix is filled by a single
+fancy-indexed assignment, with no Python loop over the assessments.
+
+The rows of a (dimension, level) cell are contiguous, so every statistic is
+a few reductions over the matrix. Per-capability completion rates are row
+sums. One np.add.reduceat gives the completed capabilities of every
+assessment in every cell. The per-dimension, per-level and per-assessment
+figures are sums of those counts.
+
+    python script/assessment_stats.py --locale en
+    python script/assessment_stats.py --locale zh --prefix team- --json stats.json
+    python script/assessment_stats.py --locale en --input exported.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from build_stats import EXIT_OK, EXIT_USAGE
+from model_snapshot import load_model
+from progress_store import ProgressStore
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Locale -> model JSON
+MODEL_FILES = {
+    'zh': os.path.join(SCRIPT_DIR, '..', '..', 'resource', 'model_of_level.json'),
+    'en': os.path.join(SCRIPT_DIR, '..', '..', 'resource', 'model_of_level_en.json'),
+}
+
+# Progress database of the server (SERVER_PROGRESS_DB)
+PROGRESS_DB = os.environ.get('SERVER_PROGRESS_DB', os.path.join(SCRIPT_DIR, '..', 'data', 'progress.db'))
+
+# Bucket edges of the completion histogram: 0-10%, 10-20%, ..., 90-100%
+HISTOGRAM_EDGES = np.linspace(0.0, 1.0, 11)
+
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+def capability_rows(model):
+    """Rows of the capability × assessment matrix
+
+    Returns:
+        dict: 'ids' (pandas.Index of the sidebar capability IDs, one per row),
+        'dimension' and 'level' (dimension and level index of every row),
+        'texts', 'cells' ((dimension name, level key) of every non-empty cell)
+        and 'cell_starts' (first row of every cell)
+    """
+    ids = []
+    dimensions = []
+    levels = []
+    texts = []
+    cells = []
+    cell_starts = []
+    for dimension in model.dimensions:
+        for level in model.levels:
+            capabilities = model.capabilities(dimension.name, level.key)
+            if not capabilities:
+                continue
+            cells.append((dimension.name, level.key))
+            cell_starts.append(len(ids))
+            ids.extend(f'{dimension.name}-{level.key}-{position}' for position in range(len(capabilities)))
+            dimensions.extend([dimension.index] * len(capabilities))
+            levels.extend([level.index] * len(capabilities))
+            texts.extend(capabilities)
+    return {
+        'ids': pd.Index(ids),
+        'dimension': np.array(dimensions, dtype=np.intp),
+        'level': np.array(levels, dtype=np.intp),
+        'texts': texts,
+        'cells': cells,
+        'cell_starts': np.array(cell_starts, dtype=np.intp),
+    }
+
+def assessment_matrix(rows, assessment_ids, capability_ids, assessments=None):
+    """Capability × assessment boolean matrix of (assessment, completed capability ID) pairs
+
+    Args:
+        rows (dict): capability_rows() of the model
+        assessment_ids, capability_ids: Parallel sequences with one item per pair
+        assessments: Column labels; by default the assessments with at least one
+            completed capability of the model, in order of first appearance
+
+    Returns:
+        tuple: (matrix, pandas.Index of the assessments, number of pairs whose
+        capability ID is not in the model, e.g. an ID of the other locale)
+    """
+    assessment_ids = np.asarray(assessment_ids, dtype=object)
+    row = rows['ids'].get_indexer(np.asarray(capability_ids, dtype=object))
+    known = row >= 0
+    if assessments is None:
+        column, assessments = pd.factorize(assessment_ids[known])
+        assessments = pd.Index(assessments)
+    else:
+        assessments = pd.Index(assessments)
+        column = assessments.get_indexer(assessment_ids[known])
+    matrix = np.zeros((len(rows['ids']), len(assessments)), dtype=bool)
+    matrix[row[known], column] = True
+    return matrix, assessments, int(len(row) - known.sum())
+
+def sets_matrix(rows, assessments):
+    """assessment_matrix() of {assessment: capability IDs} or a list of capability ID lists
+
+    Every assessment gets a column, also the ones without a completed capability.
+    """
+    if not isinstance(assessments, dict):
+        assessments = {index: ids for index, ids in enumerate(assessments)}
+    sets = [list(ids) for ids in assessments.values()]
+    labels = list(assessments)
+    assessment_ids = np.repeat(np.array(labels, dtype=object), [len(ids) for ids in sets])
+    capability_ids = [capability_id for ids in sets for capability_id in ids]
+    return assessment_matrix(rows, assessment_ids, capability_ids, labels)
+
+def store_matrix(rows, store, prefix=''):
+    """assessment_matrix() of the assessments of a ProgressStore whose ID starts with prefix
+
+    Every stored assessment gets a column, also the ones without a completed capability.
+    """
+    assessments, pairs = store.assessments_with_pairs(prefix)
+    assessment_ids, capability_ids = zip(*pairs) if pairs else ((), ())
+    return assessment_matrix(rows, assessment_ids, capability_ids, assessments)
+
+def coverage_table(counts, sizes, assessments, index):
+    """Coverage of groups of capabilities, from their completed counts (groups × assessments)
+
+    Columns: capabilities, coverage (mean completed share) and complete
+    (share of the assessments with every capability of the group completed).
+    """
+    return pd.DataFrame({
+        'capabilities': sizes,
+        'coverage': counts.sum(axis=1) / (sizes * max(assessments, 1)),
+        'complete': (counts == sizes[:, None]).sum(axis=1) / max(assessments, 1),
+    }, index=index)
+
+def group_counts(cell_counts, cell_groups, groups):
+    """Completed capabilities of every assessment in each group of cells (groups × assessments)"""
+    return np.stack([cell_counts[cell_groups == group].sum(axis=0) for group in range(groups)])
+
+def aggregate(model, rows, matrix):
+    """Completion statistics of the assessments of a matrix
+
+    Returns:
+        dict: 'assessments' (count); 'capabilities', 'cells', 'dimensions' and
+        'levels' (pandas.DataFrame); 'completion' (mean, quantiles and histogram
+        of the completed share of every assessment); 'levels_reached'
+        (pandas.Series: assessments per highest level whose capabilities,
+        and those of every level below it, are all completed)
+    """
+    assessments = matrix.shape[1]
+    cell_starts = rows['cell_starts']
+    cell_sizes = np.diff(np.append(cell_starts, len(rows['ids'])))
+    cell_dimensions = rows['dimension'][cell_starts]
+    cell_levels = rows['level'][cell_starts]
+
+    # Completed capabilities of every assessment in every cell (cells × assessments)
+    cell_counts = np.add.reduceat(matrix, cell_starts, axis=0, dtype=np.int32)
+    dimension_counts = group_counts(cell_counts, cell_dimensions, len(model.dimensions))
+    dimension_sizes = np.bincount(cell_dimensions, weights=cell_sizes, minlength=len(model.dimensions)).astype(np.int32)
+    level_counts = group_counts(cell_counts, cell_levels, len(model.levels))
+    level_sizes = np.bincount(cell_levels, weights=cell_sizes, minlength=len(model.levels)).astype(np.int32)
+
+    completed = matrix.sum(axis=1)
+    capabilities = pd.DataFrame({
+        'dimension': [model.dimensions[d].name for d in rows['dimension']],
+        'level': [model.levels[l].key for l in rows['level']],
+        'text': rows['texts'],
+        'completed': completed,
+        'rate': completed / max(assessments, 1),
+    }, index=rows['ids'])
+
+    has_dimension = dimension_sizes > 0
+    has_level = level_sizes > 0
+    dimensions = coverage_table(dimension_counts[has_dimension], dimension_sizes[has_dimension], assessments,
+                                pd.Index([d.name for d in model.dimensions])[has_dimension])
+    levels = coverage_table(level_counts[has_level], level_sizes[has_level], assessments,
+                            pd.Index([l.key for l in model.levels])[has_level])
+    cells = coverage_table(cell_counts, cell_sizes, assessments,
+                           pd.MultiIndex.from_tuples(rows['cells'], names=['dimension', 'level']))
+
+    # A level without capabilities is reached as soon as the levels below it are
+    level_complete = level_counts == level_sizes[:, None]
+    reached = np.cumprod(level_complete, axis=0).sum(axis=0)
+    levels_reached = pd.Series(np.bincount(reached, minlength=len(model.levels) + 1),
+                               index=['none'] + [l.key for l in model.levels])
+
+    share = cell_counts.sum(axis=0) / max(len(rows['ids']), 1)
+    histogram, _ = np.histogram(share, bins=HISTOGRAM_EDGES)
+    return {
+        'assessments': assessments,
+        'capabilities': capabilities,
+        'cells': cells,
+        'dimensions': dimensions,
+        'levels': levels,
+        'completion': {
+            'mean': float(share.mean()) if assessments else None,
+            'quantiles': pd.Series(np.quantile(share, QUANTILES) if assessments else [None] * len(QUANTILES),
+                                   index=[f'p{round(q * 100)}' for q in QUANTILES]),
+            'histogram': pd.Series(histogram, index=[f'{round(low * 100)}-{round(high * 100)}%'
+                                                     for low, high in zip(HISTOGRAM_EDGES, HISTOGRAM_EDGES[1:])]),
+        },
+        'levels_reached': levels_reached,
+    }
+
+def table_records(table, digits):
+    """JSON records of a DataFrame, its index as columns, shares rounded"""
+    return json.loads(table.reset_index().round(digits).to_json(orient='records', force_ascii=False))
+
+def to_json(stats, digits=4):
+    """The statistics of aggregate() as JSON-serializable dicts and lists"""
+    completion = stats['completion']
+    return {
+        'assessments': stats['assessments'],
+        'completion': {
+            'mean': None if completion['mean'] is None else round(completion['mean'], digits),
+            'quantiles': {name: None if value is None else round(float(value), digits)
+                          for name, value in completion['quantiles'].items()},
+            'histogram': {name: int(count) for name, count in completion['histogram'].items()},
+        },
+        'levels_reached': {name: int(count) for name, count in stats['levels_reached'].items()},
+        'dimensions': table_records(stats['dimensions'].rename_axis('dimension'), digits),
+        'levels': table_records(stats['levels'].rename_axis('level'), digits),
+        'cells': table_records(stats['cells'], digits),
+        'capabilities': table_records(stats['capabilities'].rename_axis('id'), digits),
+    }
+
+def percent(value):
+    return '-' if value is None or pd.isna(value) else f'{value * 100:.1f}%'
+
+def print_report(stats, ignored, top):
+    """Print the statistics of aggregate() as text tables"""
+    completion = stats['completion']
+    print(f"Assessments: {stats['assessments']}" + (f" ({ignored} capability IDs not in the model ignored)" if ignored else ''))
+    print(f"Completion: mean {percent(completion['mean'])}, "
+          + ', '.join(f'{name} {percent(value)}' for name, value in completion['quantiles'].items()))
+    largest = max(completion['histogram'].max(), 1)
+    for bucket, count in completion['histogram'].items():
+        print(f"  {bucket:>8} {count:>8} {'█' * round(40 * count / largest)}")
+    print('\nHighest level completed:')
+    for level, count in stats['levels_reached'].items():
+        print(f'  {level:>8} {count:>8}')
+    print('\nCoverage by dimension × level:')
+    pivot = stats['cells']['coverage'].unstack('level').reindex(index=stats['dimensions'].index, columns=stats['levels'].index)
+    print(pivot.apply(lambda column: column.map(percent)).to_string())
+    for title, table in (('dimension', stats['dimensions']), ('level', stats['levels'])):
+        print(f'\nCoverage by {title}:')
+        print(table.assign(coverage=table['coverage'].map(percent), complete=table['complete'].map(percent)).to_string())
+    ranked = stats['capabilities'].sort_values('rate', kind='stable')
+    for title, table in (('Least', ranked.head(top)), ('Most', ranked.tail(top).iloc[::-1])):
+        print(f'\n{title} completed capabilities:')
+        for capability_id, capability in table.iterrows():
+            print(f"  {percent(capability['rate']):>7}  {capability_id}  {capability['text']}")
+
+def main(locale='en', db=PROGRESS_DB, input_file=None, prefix='', top=10, json_output=None):
+    """Aggregate the saved assessments of a locale and print the report"""
+    model = load_model(MODEL_FILES[locale])
+    rows = capability_rows(model)
+    if input_file:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            matrix, _, ignored = sets_matrix(rows, json.load(f))
+    else:
+        if not os.path.exists(db):
+            print(f"❌ Progress database not found: {db}", file=sys.stderr)
+            return EXIT_USAGE
+        matrix, _, ignored = store_matrix(rows, ProgressStore(db), prefix)
+
+    stats = aggregate(model, rows, matrix)
+    print_report(stats, ignored, top)
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump(to_json(stats), f, ensure_ascii=False, indent=2)
+    return EXIT_OK
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Completion statistics of many saved assessments')
+    parser.add_argument(
+        '--locale', '-l',
+        choices=list(MODEL_FILES),
+        default='en',
+        help='Model whose capability IDs are aggregated (default: en)'
+    )
+    parser.add_argument(
+        '--db',
+        default=PROGRESS_DB,
+        help='Progress database of the server (default: plotly/data/progress.db or SERVER_PROGRESS_DB)'
+    )
+    parser.add_argument(
+        '--input', '-i',
+        metavar='PATH',
+        help='Read the assessments from a JSON file instead: {"assessment": [capability IDs]} or a list of ID lists'
+    )
+    parser.add_argument(
+        '--prefix', '-p',
+        default='',
+        help='Only the assessments of the database whose ID starts with this prefix (e.g. team-)'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='Least and most completed capabilities to list (default: 10)'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the statistics as JSON'
+    )
+
+    args = parser.parse_args()
+
+    sys.exit(main(args.locale, args.db, args.input, args.prefix, args.top, args.json))
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Build every locale × version of the AI maturity fishbone diagrams in one run.
+
+Each locale's model JSON is parsed once in the parent process and handed to
+the worker processes, which render the requested versions in parallel and
+report how long each artifact took.
+
+With --watch, the build keeps running afterwards: when a model JSON changes,
+only that locale's out-of-date versions are rebuilt, in this process so that
+plotly and the figure skeletons stay warm. The pages served live are rebuilt
+first, and a server started with SERVER_LIVE_RELOAD=1 reloads open pages as
+soon as their files are rewritten.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from build_cache import BuildCache, artifact_key, file_sha256, version_params
+from build_stats import EXIT_BUILD_FAILED, EXIT_OK, EXIT_USAGE
+from plotly_assets import available_plotlyjs, ensure_all_plotlyjs
+from watch import watch
+
+# Locale -> generator module; each module exposes DATA_FILE, OUTPUT_DIR, VERSIONS and build_version()
+LOCALES = {
+    'zh': 'ai_maturity_fishbone_plotly',
+    'en': 'ai_maturity_fishbone_plotly_en',
+}
+
+# Models parsed by the parent process, installed in every worker by init_worker()
+MODELS = {}
+
+# Versions rebuilt first in watch mode: the ones the server pages render
+WATCH_PRIORITY = ('interactive', 'ultra')
+
+def load_locale_module(locale):
+    """Import the generator module of a locale"""
+    return importlib.import_module(LOCALES[locale])
+
+def init_worker(models):
+    """Process pool initializer: share the pre-parsed models with the worker"""
+    MODELS.update(models)
+
+def build_artifact(locale, version, output_dir):
+    """Build one (locale, version) artifact in a worker process"""
+    module = load_locale_module(locale)
+    start = time.perf_counter()
+    _, output_file = module.build_version(version, MODELS[locale], output_dir)
+    return {
+        'locale': locale,
+        'version': version,
+        'path': os.path.abspath(output_file),
+        'seconds': time.perf_counter() - start,
+    }
+
+def plan_builds(locales, versions):
+    """Expand locales × versions into the list of buildable (locale, version) pairs"""
+    tasks = []
+    skipped = []
+    for locale in locales:
+        available = load_locale_module(locale).VERSIONS
+        for version in versions or list(available):
+            if version in available:
+                tasks.append((locale, version))
+            else:
+                skipped.append((locale, version))
+    return tasks, skipped
+
+def print_manifest(results, cached, skipped, failed, elapsed):
+    """Print the artifacts produced, how long each one took and the ones that failed"""
+    print("\nBuild manifest:")
+    for result in sorted(results, key=lambda r: (r['locale'], r['version'])):
+        print(f"  [{result['locale']}] {result['version']:<12} {result['seconds']:7.2f}s  {result['path']}")
+    for locale, version in cached:
+        print(f"  [{locale}] {version:<12} up to date")
+    for locale, version in skipped:
+        print(f"  [{locale}] {version:<12} skipped (not available for this locale)")
+    for locale, version, error in failed:
+        print(f"  [{locale}] {version:<12} FAILED: {error}")
+    print(f"\n{len(results)} artifact(s) built in {elapsed:.2f}s" + (f", {len(failed)} failed" if failed else ''))
+
+def main(locales=None, versions=None, workers=None, output_dir=None, force=False):
+    """Render the requested locales × versions in a process pool
+
+    Args:
+        locales (list): Locales to build (default: all)
+        versions (list): Versions to build (default: every version of each locale)
+        workers (int): Number of worker processes (default: one per CPU)
+        output_dir (str): Output directory (default: the generators' OUTPUT_DIR)
+        force (bool): Ignore the build cache and rebuild every requested artifact
+
+    Returns:
+        int: EXIT_OK, EXIT_BUILD_FAILED if any artifact failed (the others are
+        still built and recorded in the cache), EXIT_USAGE if nothing matched
+    """
+    start = time.perf_counter()
+    locales = locales or list(LOCALES)
+    tasks, skipped = plan_builds(locales, versions)
+    if not tasks:
+        print("Nothing to build for the requested locales and versions.")
+        return EXIT_USAGE
+
+    output_dir = output_dir or load_locale_module(locales[0]).OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Pages share content-fingerprinted plotly.js files; the bundles to choose from are part of the cache key
+    plotlyjs_assets = available_plotlyjs()
+
+    # Drop artifacts whose model, builder and layout parameters are unchanged
+    cache = BuildCache(output_dir)
+    model_hashes = {}
+    pending = {}
+    cached = []
+    for locale, version in tasks:
+        module = load_locale_module(locale)
+        if locale not in model_hashes:
+            model_hashes[locale] = file_sha256(module.DATA_FILE)
+        spec = module.VERSIONS[version]
+        key = artifact_key(model_hashes[locale], spec['builder'], version_params(spec, plotlyjs_assets))
+        if not force and cache.is_fresh(spec['filename'], key):
+            cached.append((locale, version))
+        else:
+            pending[(locale, version)] = key
+
+    # Parse each model exactly once, and only if one of its artifacts needs rebuilding
+    models = {}
+    failed = []
+    for locale in sorted({locale for locale, _ in pending}):
+        module = load_locale_module(locale)
+        try:
+            models[locale] = module.load_maturity_data(module.DATA_FILE)
+        except (OSError, ValueError) as e:
+            failed += [(locale, version, f'model not loaded: {e}') for task_locale, version in pending if task_locale == locale]
+    pending = {task: key for task, key in pending.items() if task[0] in models}
+
+    results = []
+    if pending:
+        ensure_all_plotlyjs(output_dir)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(models,)) as pool:
+            futures = {pool.submit(build_artifact, locale, version, output_dir): (locale, version)
+                       for locale, version in pending}
+            for future in as_completed(futures):
+                locale, version = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # One failed artifact must not discard the cache records of the others
+                    traceback.print_exception(type(e), e, e.__traceback__)
+                    failed.append((locale, version, f'{type(e).__name__}: {e}'))
+                    continue
+                module = load_locale_module(locale)
+                spec = module.VERSIONS[version]
+                cache.record(spec['filename'], pending[(locale, version)],
+                             module.DATA_FILE, model_hashes[locale], spec['builder'], version_params(spec, plotlyjs_assets))
+                results.append(result)
+        cache.save()
+
+    print_manifest(results, cached, skipped, failed, time.perf_counter() - start)
+    return EXIT_BUILD_FAILED if failed else EXIT_OK
+
+def rebuild_locale(locale, versions, output_dir, changed_at):
+    """Rebuild the out-of-date versions of one locale in this process after its model changed"""
+    module = load_locale_module(locale)
+    tasks, _ = plan_builds([locale], versions)
+    tasks.sort(key=lambda task: WATCH_PRIORITY.index(task[1]) if task[1] in WATCH_PRIORITY else len(WATCH_PRIORITY))
+    try:
+        model_hash = file_sha256(module.DATA_FILE)
+        data = module.load_maturity_data(module.DATA_FILE)
+    except (OSError, ValueError) as e:
+        # Usually a typo in the model being edited: report it and wait for the next save
+        print(f"  [{locale}] model not loaded, waiting for the next change: {e}")
+        return
+
+    plotlyjs_assets = available_plotlyjs()
+    cache = BuildCache(output_dir)
+    for _, version in tasks:
+        spec = module.VERSIONS[version]
+        params = version_params(spec, plotlyjs_assets)
+        key = artifact_key(model_hash, spec['builder'], params)
+        if cache.is_fresh(spec['filename'], key):
+            continue
+        try:
+            _, output_file = module.build_version(version, data, output_dir)
+        except Exception as e:
+            print(f"  [{locale}] {version:<12} failed: {e}")
+            continue
+        cache.record(spec['filename'], key, module.DATA_FILE, model_hash, spec['builder'], params)
+        # Saved after every artifact so an interrupted watch leaves an accurate cache
+        cache.save()
+        print(f"  [{locale}] {version:<12} {time.monotonic() - changed_at:7.2f}s after the change  {output_file}")
+
+def watch_models(locales=None, versions=None, output_dir=None, interval=0.05, delay=0.1):
+    """Rebuild a locale's versions whenever its model JSON changes, until interrupted"""
+    locales = locales or list(LOCALES)
+    output_dir = output_dir or load_locale_module(locales[0]).OUTPUT_DIR
+    model_locales = {}
+    for locale in locales:
+        model_locales.setdefault(os.path.abspath(load_locale_module(locale).DATA_FILE), []).append(locale)
+
+    def on_change(paths):
+        changed_at = time.monotonic()
+        for path in sorted(paths):
+            print(f"\nChanged: {path}")
+            for locale in model_locales[path]:
+                rebuild_locale(locale, versions, output_dir, changed_at)
+
+    # Import plotly now rather than on the first edit
+    import plotly.graph_objects
+
+    print(f"\nWatching {len(model_locales)} model file(s) for changes, press Ctrl+C to stop...")
+    try:
+        watch(list(model_locales), on_change, interval=interval, delay=delay)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build AI maturity fishbone diagrams for several locales and versions in parallel')
+    parser.add_argument(
+        '--locales',
+        nargs='+',
+        choices=list(LOCALES),
+        help='Locales to build (default: all)'
+    )
+    parser.add_argument(
+        '--versions',
+        nargs='+',
+        choices=['basic', 'detailed', 'static', 'ultra', 'interactive'],
+        help='Versions to build (default: every version available for each locale)'
+    )
+    parser.add_argument(
+        '--workers', '-j',
+        type=int,
+        help='Number of worker processes (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--output-dir', '-o',
+        help='Output directory (default: plotly/output)'
+    )
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help='Ignore the build cache and rebuild every requested artifact'
+    )
+    parser.add_argument(
+        '--watch', '-w',
+        action='store_true',
+        help='After building, keep watching the model JSON files and rebuild the affected locale on every change'
+    )
+
+    args = parser.parse_args()
+
+    exit_code = main(args.locales, args.versions, args.workers, args.output_dir, force=args.force)
+    if args.watch:
+        watch_models(args.locales, args.versions, args.output_dir)
+    sys.exit(exit_code)
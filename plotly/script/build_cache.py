@@ -0,0 +1,164 @@
+"""
+Content-addressed incremental build cache for the fishbone generators.
+
+Every artifact in the output directory is keyed by the hash of the model JSON,
+the source of the modules its builder function is built from and the
+builder's layout parameters. The index file records what each output was built from,
+and the files it consists of (the page, its precompressed siblings and the
+plotly.js bundle it references), so unchanged artifacts can be skipped
+without even parsing the model.
+"""
+
+import ast
+import functools
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from precompress import ENCODING_SUFFIXES, available_encodings
+
+INDEX_FILENAME = '.build_cache.json'
+INDEX_FORMAT = 2
+
+# plotly.js bundle referenced by a generated page
+PLOTLYJS_REFERENCE = re.compile(rb'src="/?(plotly-[0-9A-Za-z-]+\.min\.js)"')
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def builder_name(builder):
+    """Stable name of a builder, the same whether its script runs as __main__ or is imported"""
+    module_file = sys.modules[builder.__module__].__file__
+    return f'{os.path.splitext(os.path.basename(module_file))[0]}.{builder.__qualname__}'
+
+@functools.lru_cache(maxsize=None)
+def module_source_sha256(path):
+    """Hash the source file of a module"""
+    return file_sha256(path)
+
+@functools.lru_cache(maxsize=None)
+def local_imports(path):
+    """Source files next to a module that it imports anywhere, including inside functions"""
+    directory = os.path.dirname(path)
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split('.')[0])
+    return tuple(sorted(os.path.join(directory, f'{name}.py') for name in names
+                        if os.path.isfile(os.path.join(directory, f'{name}.py'))))
+
+def local_dependencies(module_name):
+    """Source files of a module and of every module next to it that it imports, directly or transitively"""
+    pending = [os.path.abspath(sys.modules[module_name].__file__)]
+    paths = set()
+    while pending:
+        path = pending.pop()
+        if path not in paths:
+            paths.add(path)
+            pending.extend(local_imports(path))
+    # By file name, so the order is the same whether the script runs as __main__ or is imported
+    return sorted(paths, key=os.path.basename)
+
+def builder_source_sha256(builder):
+    """Hash the source of the module defining a builder and of the local modules it uses
+
+    Whole modules are hashed rather than the function alone, and the local
+    imports are followed transitively, so edits to the helpers, templates,
+    shared rendering engine, layout and model representation a builder
+    relies on also invalidate its outputs.
+    """
+    digest = hashlib.sha256()
+    for path in local_dependencies(builder.__module__):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        digest.update(module_source_sha256(path).encode('ascii'))
+    return digest.hexdigest()
+
+def artifact_outputs(output_dir, filename):
+    """Files an artifact consists of: the page, the plotly.js bundle it references and their precompressed siblings"""
+    files = [filename]
+    with open(os.path.join(output_dir, filename), 'rb') as f:
+        files += sorted({match.decode('ascii') for match in PLOTLYJS_REFERENCE.findall(f.read())})
+    suffixes = [ENCODING_SUFFIXES[encoding] for encoding in available_encodings()]
+    return [name + suffix for name in files for suffix in [''] + suffixes]
+
+def version_params(spec, plotlyjs=None):
+    """Layout parameters of a VERSIONS entry that affect the written artifact
+
+    Args:
+        plotlyjs (list): File names of the plotly.js bundles the page may reference
+    """
+    return {
+        'filename': spec['filename'],
+        'config': spec['config'],
+        'interactive': bool(spec.get('interactive')),
+        'plotlyjs': plotlyjs,
+        'encodings': available_encodings(),
+    }
+
+def artifact_key(model_sha256, builder, params):
+    """Compute the cache key of an artifact"""
+    payload = json.dumps({
+        'model': model_sha256,
+        'builder': builder_name(builder),
+        'source': builder_source_sha256(builder),
+        'params': params,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class BuildCache:
+    """Index of the artifacts in an output directory and the inputs they were built from"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.index_file = os.path.join(output_dir, INDEX_FILENAME)
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get('format') != INDEX_FORMAT:
+            return {}
+        return index.get('artifacts', {})
+
+    def is_fresh(self, filename, key):
+        """True if every file of the artifact exists and it was built from exactly these inputs"""
+        entry = self.entries.get(filename)
+        return (entry is not None
+                and entry.get('key') == key
+                and all(os.path.exists(os.path.join(self.output_dir, name)) for name in entry.get('outputs', [filename])))
+
+    def record(self, filename, key, model_file, model_sha256, builder, params):
+        """Record the inputs an artifact has just been built from"""
+        self.entries[filename] = {
+            'key': key,
+            'model': os.path.basename(model_file),
+            'model_sha256': model_sha256,
+            'builder': builder_name(builder),
+            'builder_source_sha256': builder_source_sha256(builder),
+            'params': params,
+            'outputs': artifact_outputs(self.output_dir, filename),
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        }
+
+    def save(self):
+        """Atomically write the index next to the artifacts"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        temp_file = f'{self.index_file}.{os.getpid()}.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'format': INDEX_FORMAT, 'artifacts': self.entries}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_file, self.index_file)
@@ -0,0 +1,129 @@
+"""
+Per-stage build timings and the machine-readable build summary.
+
+Used by the generator scripts in headless mode so unattended builds (cron,
+containers) get deterministic exit codes and a JSON report of what was
+produced, how large it is and where the time went.
+
+Stages nest: while a StageTimer stage is running, code further down (e.g.
+the rendering engine) can report a sub-stage with the module-level stage()
+hook without being handed the timer. A stage's time excludes the time of
+the stages nested in it.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Exit codes of the generator scripts
+EXIT_OK = 0
+EXIT_BUILD_FAILED = 1
+EXIT_USAGE = 2
+
+# Timers with a stage in progress, innermost last
+ACTIVE_TIMERS = []
+
+class StageTimer:
+    """Accumulates wall-clock seconds, CPU seconds and (optionally) tracemalloc peaks per named build stage
+
+    Args:
+        trace_memory (bool): Record the tracemalloc peak of every stage; tracemalloc
+            must be started by the caller
+    """
+
+    def __init__(self, trace_memory=False):
+        self.stages = {}
+        self.cpu = {}
+        self.peaks = {}
+        self.trace_memory = trace_memory
+        self._nested = []
+
+    @contextmanager
+    def stage(self, name):
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        # [wall, cpu, absolute peak] of the stages nested in this one
+        nested = [0.0, 0.0, 0]
+        self._nested.append(nested)
+        # Register the stage up front so stages are listed in the order they start
+        self.stages.setdefault(name, 0.0)
+        ACTIVE_TIMERS.append(self)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+            ACTIVE_TIMERS.pop()
+            self._nested.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + wall - nested[0]
+            self.cpu[name] = self.cpu.get(name, 0.0) + cpu - nested[1]
+            peak = 0
+            if tracing:
+                # Nested stages reset the peak, so take the highest one seen while they ran
+                peak = max(tracemalloc.get_traced_memory()[1], nested[2])
+                self.peaks[name] = max(self.peaks.get(name, 0), peak - base)
+            if self._nested:
+                parent = self._nested[-1]
+                parent[0] += wall
+                parent[1] += cpu
+                parent[2] = max(parent[2], peak)
+
+    def as_dict(self):
+        return {name: round(seconds, 6) for name, seconds in self.stages.items()}
+
+    def profile_dict(self):
+        """Wall time, CPU time and tracemalloc peak of every stage"""
+        return {
+            name: {
+                'wall': round(seconds, 6),
+                'cpu': round(self.cpu.get(name, 0.0), 6),
+                'peak_bytes': self.peaks.get(name),
+            }
+            for name, seconds in self.stages.items()
+        }
+
+@contextmanager
+def stage(name):
+    """Record a sub-stage on the timer of the stage in progress, if there is one"""
+    if not ACTIVE_TIMERS:
+        yield
+        return
+    with ACTIVE_TIMERS[-1].stage(name):
+        yield
+
+def format_profile(timer, title):
+    """Text table of a timer's per-stage wall time, CPU time and memory peak"""
+    lines = [title, f"  {'stage':<14} {'wall ms':>10} {'cpu ms':>10} {'peak MiB':>10}"]
+    for name, entry in timer.profile_dict().items():
+        peak = '-' if entry['peak_bytes'] is None else f"{entry['peak_bytes'] / 1024 / 1024:.2f}"
+        lines.append(f"  {name:<14} {entry['wall'] * 1000:>10.2f} {entry['cpu'] * 1000:>10.2f} {peak:>10}")
+    return '\n'.join(lines)
+
+def artifact_summary(version, output_file, status, timer=None, error=None):
+    """Summary entry of one version: path, byte size, status and stage timings"""
+    entry = {
+        'version': version,
+        'path': os.path.abspath(output_file),
+        'bytes': os.path.getsize(output_file) if os.path.exists(output_file) else None,
+        'status': status,
+        'stages': timer.as_dict() if timer else {},
+    }
+    if timer is not None and timer.trace_memory:
+        entry['profile'] = timer.profile_dict()
+    if error is not None:
+        entry['error'] = f'{type(error).__name__}: {error}'
+    return entry
+
+def write_summary(summary, destination):
+    """Write the JSON summary to a file, or to stdout when destination is '-'"""
+    if destination == '-':
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+        return
+    with open(destination, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
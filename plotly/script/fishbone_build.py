@@ -0,0 +1,343 @@
+"""
+Shared build pipeline and command line of the locale generator scripts.
+
+Each generator script (ai_maturity_fishbone_plotly.py, ai_maturity_fishbone_plotly_en.py)
+only supplies its locale-specific parts in a GENERATOR dict:
+
+* versions: its VERSIONS table (builder, output file name, whether a build shows it, write_html config)
+* all: name of the pseudo-version building every version ('all' / 'both')
+* data_file / output_dir: model file and default output directory
+* template: function returning the interactive HTML template
+* text: localized log messages, argparse help and --list output
+
+Everything else (building, in-memory rendering, the cached build loop and
+the argparse block) lives here, once for every locale.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import sys
+import tracemalloc
+from functools import partial
+
+from build_cache import BuildCache, artifact_key, file_sha256, version_params
+from build_stats import (EXIT_BUILD_FAILED, EXIT_OK, EXIT_USAGE, StageTimer, artifact_summary, format_profile,
+                         stage, write_summary)
+from model_snapshot import load_model
+from plotly_assets import available_plotlyjs, check_bundle_coverage, ensure_plotlyjs, figure_trace_types
+from precompress import write_precompressed
+
+
+def load_maturity_data(file_path):
+    """Load AI maturity model data (through its compiled snapshot, recompiled when the source changes)"""
+    return load_model(file_path)
+
+def generate_capabilities_data(data):
+    """Generate capabilities data in JSON format for JavaScript usage"""
+    return data.capabilities_index()
+
+def figure_div_id(version, data):
+    """Deterministic id of the chart div, so identical pages are byte-identical in every process
+
+    plotly otherwise gives each div a random UUID, which changes the page (and
+    its ETag) on every render.
+    """
+    if data.source_sha256:
+        return f'fishbone-{version}-{data.source_sha256[:16]}'
+    return f'fishbone-{version}'
+
+def page_config(spec):
+    """Copy of a version's write_html config for plotly
+
+    plotly adds its defaults (e.g. responsive) to the config dict it is given;
+    the VERSIONS entry itself must stay unchanged, as it is part of the build cache key.
+    """
+    return dict(spec['config']) if spec['config'] is not None else None
+
+@contextlib.contextmanager
+def replace_on_close(output_file):
+    """Text stream to a private temporary file that atomically replaces output_file once fully written
+
+    The server's artifact cache and the watch rebuilder read pages while they
+    are rebuilt; they see the old page or the new one, never a truncated one.
+    """
+    temp_file = f'{output_file}.{os.getpid()}.tmp'
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            yield f
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+def write_interactive_page(f, create_template, plot_div, capabilities_data, plotlyjs_src):
+    """Stream the interactive template pieces, plotly.js src, chart div and capabilities data to the text stream f
+
+    The template is split once at its placeholders and each piece is written
+    straight through, with no intermediate HTML file, regex extraction or
+    whole-document string replacement.
+    """
+    # Template assembly is reported as the template stage
+    with stage('template'):
+        template = create_template()
+        prologue, _, rest = template.partition('{plotlyjs_src}')
+        head, _, rest = rest.partition('{plot_div}')
+        middle, _, tail = rest.partition('{capabilities_json}')
+
+    f.write(prologue)
+    f.write(plotlyjs_src)
+    f.write(head)
+    f.write(plot_div)
+    f.write(middle)
+    json.dump(capabilities_data, f, ensure_ascii=False)
+    f.write(tail)
+
+def write_interactive_html(output_file, create_template, plot_div, capabilities_data, plotlyjs_src):
+    """Stream the interactive page to the output file, replacing it atomically"""
+    with replace_on_close(output_file) as f:
+        write_interactive_page(f, create_template, plot_div, capabilities_data, plotlyjs_src)
+
+def build_version(generator, version, data, output_dir=None, timer=None, plotlyjs_src=None):
+    """Build a single version of a generator and write it to the output directory
+
+    Args:
+        output_dir (str): Defaults to the generator's output directory
+        timer (StageTimer): Optional, records the construct/validate/capabilities/serialize/template/write/compress stage timings
+        plotlyjs_src (str): plotly.js asset the page references; defaults to the shared
+            fingerprinted bundle matching the figure's trace types, written into the output directory
+
+    Returns:
+        tuple: (fig, output_file)
+    """
+    spec = generator['versions'][version]
+    output_dir = output_dir or generator['output_dir']
+    timer = timer or StageTimer()
+
+    with timer.stage('construct'):
+        fig = spec['builder'](data)
+    # Pick the plotly.js bundle from the trace types actually used (the basic partial bundle when available)
+    trace_types = figure_trace_types(fig)
+    plotlyjs_src = plotlyjs_src or ensure_plotlyjs(output_dir, trace_types)
+    check_bundle_coverage(plotlyjs_src, trace_types)
+    output_file = os.path.join(output_dir, spec['filename'])
+    div_id = figure_div_id(version, data)
+
+    if spec.get('interactive'):
+        with timer.stage('capabilities'):
+            capabilities_data = generate_capabilities_data(data)
+        # Render only the chart div (the template loads plotly.js) and assemble the page in memory
+        with timer.stage('serialize'):
+            plot_div = fig.to_html(full_html=False, include_plotlyjs=False, config=page_config(spec), div_id=div_id)
+        with timer.stage('write'):
+            write_interactive_html(output_file, generator['template'], plot_div, capabilities_data, plotlyjs_src)
+    else:
+        with timer.stage('serialize'):
+            html = fig.to_html(config=page_config(spec), include_plotlyjs=plotlyjs_src, div_id=div_id)
+        with timer.stage('write'):
+            with replace_on_close(output_file) as f:
+                f.write(html)
+
+    with timer.stage('compress'):
+        write_precompressed(output_file)
+
+    return fig, output_file
+
+def render_page(generator, version, fig, data, plotlyjs_src):
+    """Render the complete page of a built figure in memory (used by the server's /render endpoint)
+
+    Returns:
+        str: The same HTML build_version writes to the output file
+    """
+    spec = generator['versions'][version]
+    check_bundle_coverage(plotlyjs_src, figure_trace_types(fig))
+    div_id = figure_div_id(version, data)
+    if spec.get('interactive'):
+        page = io.StringIO()
+        plot_div = fig.to_html(full_html=False, include_plotlyjs=False, config=page_config(spec), div_id=div_id)
+        write_interactive_page(page, generator['template'], plot_div, generate_capabilities_data(data), plotlyjs_src)
+        return page.getvalue()
+    return fig.to_html(config=page_config(spec), include_plotlyjs=plotlyjs_src, div_id=div_id)
+
+def main(generator, version=None, force=False, headless=False, summary_json=None, profile=False, profile_dump=None):
+    """Build the requested versions of a generator, skipping those the build cache reports as fresh
+
+    Args:
+        version (str): Version to generate, or the generator's 'all' name (default) for every version
+        force (bool): Ignore the build cache and rebuild every requested version
+        headless (bool): Headless batch mode, never calls fig.show() or initializes a renderer
+        summary_json (str): Path of the machine-readable build summary, '-' for stdout
+        profile (bool): Profiling mode, records wall time, CPU time and tracemalloc peak of every stage (implies force)
+        profile_dump (str): Optional directory receiving a cProfile <version>.pstats file per version (implies profile)
+
+    Returns:
+        int: Exit code (0 success, 1 a version failed to build, 2 invalid arguments)
+    """
+    versions_table = generator['versions']
+    text = generator['text']
+    data_file = generator['data_file']
+    version = version or generator['all']
+    # When the summary goes to stdout, progress messages go to stderr so the JSON stays parseable
+    log = partial(print, file=sys.stderr) if summary_json == '-' else print
+
+    if version != generator['all'] and version not in versions_table:
+        log(text['unknown_version'].format(version=version))
+        for line in text['version_list']:
+            log(line)
+        return EXIT_USAGE
+
+    # Profiling needs every version to actually be built, so the cache is bypassed
+    profile = profile or bool(profile_dump)
+    force = force or profile
+    if profile:
+        tracemalloc.start()
+
+    output_dir = generator['output_dir']
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        log(text['created_output_dir'].format(path=output_dir))
+
+    versions = list(versions_table) if version == generator['all'] else [version]
+    generated_files = []
+    cached_files = []
+    failed_files = []
+    artifacts = []
+    run_timer = StageTimer(trace_memory=profile)
+
+    # Build cache: skip versions whose model, builder and layout parameters are unchanged
+    cache = BuildCache(output_dir)
+    model_sha256 = file_sha256(data_file)
+    data = None
+
+    # Pages share content-fingerprinted plotly.js files; the bundles to choose from are part of the cache key
+    plotlyjs_assets = available_plotlyjs()
+
+    for name in versions:
+        spec = versions_table[name]
+        label = spec['label']
+        params = version_params(spec, plotlyjs_assets)
+        key = artifact_key(model_sha256, spec['builder'], params)
+        output_file = os.path.join(output_dir, spec['filename'])
+        if not force and cache.is_fresh(spec['filename'], key):
+            cached_files.append(f"- {label}: {output_file}")
+            artifacts.append(artifact_summary(name, output_file, 'cached'))
+            continue
+
+        # Only load the model when something actually needs rebuilding
+        if data is None:
+            with run_timer.stage('load'):
+                data = load_maturity_data(data_file)
+
+        log(text['generating'].format(label=label))
+        timer = StageTimer(trace_memory=profile)
+        profiler = cProfile.Profile() if profile_dump else None
+        try:
+            if profiler:
+                profiler.enable()
+            try:
+                fig, output_file = build_version(generator, name, data, output_dir, timer)
+            finally:
+                if profiler:
+                    profiler.disable()
+                    os.makedirs(profile_dump, exist_ok=True)
+                    profiler.dump_stats(os.path.join(profile_dump, f'{name}.pstats'))
+        except Exception as e:
+            log(text['failed'].format(label=label, error=e))
+            failed_files.append(f"- {label}: {e}")
+            artifacts.append(artifact_summary(name, output_file, 'failed', timer, error=e))
+            continue
+
+        if profile:
+            log(format_profile(timer, text['profile_version'].format(label=label)))
+        # Only the versions flagged 'show' open in the browser (the interactive page needs its template)
+        if not headless and spec.get('show'):
+            fig.show()
+        cache.record(spec['filename'], key, data_file, model_sha256, spec['builder'], params)
+        generated_files.append(f"- {label}: {output_file}")
+        artifacts.append(artifact_summary(name, output_file, 'built', timer))
+
+    cache.save()
+    if profile:
+        tracemalloc.stop()
+        if data is not None:
+            log(format_profile(run_timer, text['profile_load']))
+
+    for heading, files in ((text['generated_heading'], generated_files),
+                           (text['cached_heading'], cached_files),
+                           (text['failed_heading'], failed_files)):
+        if files:
+            log(f"\n{heading}")
+            for file_info in files:
+                log(file_info)
+
+    exit_code = EXIT_BUILD_FAILED if failed_files else EXIT_OK
+    if summary_json:
+        summary = {
+            'status': 'failed' if failed_files else 'ok',
+            'exit_code': exit_code,
+            'model': os.path.abspath(data_file),
+            'stages': run_timer.as_dict(),
+            'files': artifacts
+        }
+        if profile:
+            summary['profile'] = run_timer.profile_dict()
+        write_summary(summary, summary_json)
+
+    return exit_code
+
+def cli(generator, argv=None):
+    """Parse the generator script's command line and run the build
+
+    Returns:
+        int: Exit code of main, or 0 after --list
+    """
+    text = generator['text']
+    parser = argparse.ArgumentParser(description=text['description'])
+    parser.add_argument(
+        '--version', '-v',
+        choices=[generator['all'], *generator['versions']],
+        default=generator['all'],
+        help=text['version_help']
+    )
+    parser.add_argument(
+        '--list', '-l',
+        action='store_true',
+        help=text['list_help']
+    )
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help=text['force_help']
+    )
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        help=text['headless_help']
+    )
+    parser.add_argument(
+        '--summary-json',
+        metavar='PATH',
+        help=text['summary_json_help']
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help=text['profile_help']
+    )
+    parser.add_argument(
+        '--profile-dump',
+        metavar='DIR',
+        help=text['profile_dump_help']
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print(text['list'])
+        return EXIT_OK
+
+    return main(generator, args.version, force=args.force, headless=args.headless, summary_json=args.summary_json,
+                profile=args.profile, profile_dump=args.profile_dump)
@@ -0,0 +1,489 @@
+"""
+Locale-agnostic rendering engine for the ultra and interactive fishbone diagrams.
+
+The figure is computed in two steps:
+
+1. A skeleton — coordinates, traces, shapes and annotations — is built once per
+   model *structure* (number of levels, how many capabilities each
+   (dimension, level) cell has) and variant, with positions computed by
+   fishbone_layout for any number of dimensions and levels. Every locale-dependent value in it (dimension names, colors,
+   capability lists, titles, reference lines) is a ``@@key@@`` token. The
+   skeleton is cached as a JSON string.
+2. A locale is applied by computing its overlay values from the model and its
+   translation catalog and substituting all tokens in one regex pass over the
+   cached skeleton JSON.
+
+Adding a locale therefore only needs a catalog and a model file; locales that
+share a model structure share the skeleton. A catalog may also override parts
+of a variant's geometry (its 'geometry' entry, see variant_geometry), which
+gives it a skeleton of its own.
+"""
+
+import functools
+import json
+import re
+
+from build_stats import stage
+from fishbone_layout import compute_layout, reference_x
+
+# Whole-string tokens may carry any JSON value, embedded tokens are spliced into strings
+TOKEN_PATTERN = re.compile(r'"@@([\w.]+)@@"|@@([\w.]+)@@')
+
+# Default geometry of each variant; a catalog's 'geometry' entry can override any of it per variant
+VARIANTS = {
+    'ultra': {
+        'x_start': 3,
+        'x_step': 4,
+        'trunk_start': 0,
+        'trunk_overhang': 2.7,
+        'x_range_padding': (-3, 2),
+        # Minimum y range; it grows when the boxes need more room
+        'y_range': (-10, 12),
+        'y_range_padding': 1,
+        # Nominal pixels per data unit (x, y) used to size the boxes
+        'unit_px': (57, 45),
+        'first_row': 2,
+        'row_pitch': 2,
+        'box_gap': 0.2,
+        'dimension_label': dict(x=-0.5, size=20, borderwidth=3),
+        'cell_box': dict(width=400, align='left', content='list', line_px=14, padding_px=12),
+        # Invisible hover markers on the boxes (unbatched) and the level descriptions
+        'hover_markers': True,
+        'hover_marker_size': 80,
+        'hoverdistance': 40,
+        'description': dict(min_y=9, width=200, lines=8, line_px=12, arrow_px=40, clearance=1),
+        'reference_lines': True,
+        'layout': dict(
+            title_size=24,
+            axis_title_size=16,
+            tickfont_size=14,
+            width=1900,
+            height=1200,
+            margin=dict(l=200, r=100, t=100, b=100),
+        ),
+    },
+    'interactive': {
+        'x_start': 2,
+        'x_step': 3.5,
+        'trunk_start': -0.5,
+        'trunk_overhang': 1.2,
+        'x_range_padding': (-2.5, 1.5),
+        'y_range': (-8, 14),
+        'y_range_padding': 1,
+        # The chart is autosized; scale of a full-HD viewport next to the sidebar. Beyond the
+        # nominal y range the height is fixed to keep this scale (see fishbone_layout)
+        'unit_px': (70, 44),
+        'first_row': 2,
+        'row_pitch': 2,
+        'box_gap': 0.2,
+        'dimension_label': dict(x=-0.3, size=16, borderwidth=2),
+        'cell_box': dict(width=200, align='center', content='summary', summary_lines=2, line_px=14, padding_px=12),
+        'hover_markers': True,
+        'hover_marker_size': 60,
+        'hoverdistance': 30,
+        'description': dict(min_y=12, width=160, lines=8, line_px=12, arrow_px=40, clearance=1),
+        'reference_lines': False,
+        'yaxis_title_annotation': dict(x=-2.5),
+        'layout': dict(
+            title_size=18,
+            axis_title_size=14,
+            tickfont_size=12,
+            margin=dict(l=50, r=50, t=60, b=40),
+            autosize=True,
+        ),
+    },
+}
+
+def merge_geometry(base, overrides):
+    """Copy of base with overrides applied, nested dicts merged key by key"""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            value = merge_geometry(base[key], value)
+        merged[key] = value
+    return merged
+
+def geometry_overrides(catalog, variant):
+    """A catalog's geometry overrides of a variant as a canonical JSON string (hashable skeleton cache key)"""
+    return json.dumps(catalog.get('geometry', {}).get(variant, {}), sort_keys=True)
+
+def variant_geometry(variant, overrides='{}'):
+    """Geometry of a variant with a catalog's overrides (see geometry_overrides) applied"""
+    return merge_geometry(VARIANTS[variant], json.loads(overrides))
+
+def level_x_positions(variant, level_count, overrides='{}'):
+    """X coordinate of every maturity level for a variant"""
+    geometry = variant_geometry(variant, overrides)
+    return [geometry['x_start'] + i * geometry['x_step'] for i in range(level_count)]
+
+def model_structure(data, catalog):
+    """Locale-independent shape of a model: level count and the size of every cell
+
+    Returns:
+        tuple: (level_count, ((capability count, or None without a cell, for each level) for each dimension))
+    """
+    cells = tuple(
+        tuple(data.capability_count(dimension, level.key) for level in data.levels)
+        for dimension, _ in catalog['dimensions']
+    )
+    return len(data.levels), cells
+
+def token(key):
+    """Placeholder of a locale-dependent value in the skeleton"""
+    return f'@@{key}@@'
+
+def hover_trace(x, y, size, color, hover_keys, opacity=0):
+    """Marker trace (invisible by default) whose hover text comes from customdata tokens"""
+    return {
+        'type': 'scatter',
+        'x': x,
+        'y': y,
+        'mode': 'markers',
+        'marker': {'size': size, 'color': color, 'opacity': opacity},
+        'customdata': [token(key) for key in hover_keys],
+        'hovertemplate': '%{customdata}<extra></extra>',
+        'showlegend': False,
+    }
+
+def branch_traces(d, cells, geometry, batched):
+    """Connection lines, hover markers and end points of one dimension
+
+    Args:
+        cells (list): (level index, x, y) of every cell of the dimension
+    """
+    color = token(f'dim.{d}.color')
+    if not cells:
+        return []
+
+    if batched:
+        # One None-separated line trace and one marker trace per dimension
+        line_x, line_y = [], []
+        for _, x_pos, y_pos in cells:
+            line_x += [x_pos, x_pos, None]
+            line_y += [0, y_pos, None]
+        end_points = hover_trace([x for _, x, _ in cells], [y for _, _, y in cells], 12, color,
+                                 [f'cell.{d}.{l}.hover' for l, _, _ in cells], opacity=1)
+        return [
+            {
+                'type': 'scatter',
+                'x': line_x,
+                'y': line_y,
+                'mode': 'lines',
+                'line': {'color': color, 'width': 3},
+                'showlegend': False,
+                'hoverinfo': 'skip',
+            },
+            end_points,
+        ]
+
+    traces = []
+    for l, x_pos, y_pos in cells:
+        traces.append({
+            'type': 'scatter',
+            'x': [x_pos, x_pos],
+            'y': [0, y_pos],
+            'mode': 'lines',
+            'line': {'color': color, 'width': 3},
+            'showlegend': False,
+            'hoverinfo': 'skip',
+        })
+        if geometry['hover_markers']:
+            traces.append(hover_trace([x_pos], [y_pos], geometry['hover_marker_size'], color, [f'cell.{d}.{l}.hover']))
+        traces.append({
+            'type': 'scatter',
+            'x': [x_pos],
+            'y': [y_pos],
+            'mode': 'markers',
+            'marker': {'size': 12, 'color': color},
+            'showlegend': False,
+            'hoverinfo': 'skip',
+        })
+    return traces
+
+def reference_line(key, color, y_range):
+    """Dashed vertical reference line shape"""
+    return {
+        'type': 'line',
+        'x0': token(f'ref.{key}.x'),
+        'y0': y_range[0],
+        'x1': token(f'ref.{key}.x'),
+        'y1': y_range[1],
+        'line': {'color': color, 'width': 3, 'dash': 'dash'},
+        'editable': token('ref.editable'),
+        'name': token(f'ref.{key}.name'),
+    }
+
+def reference_label(key, color, y):
+    """Label annotation above a reference line"""
+    return {
+        'x': token(f'ref.{key}.x'),
+        'y': y,
+        'text': token(f'ref.{key}.label'),
+        'showarrow': True,
+        'arrowhead': 2,
+        'arrowcolor': color,
+        'font': {'size': 12, 'color': color},
+        'bgcolor': 'rgba(255, 255, 255, 0.9)',
+        'bordercolor': color,
+        'borderwidth': 2,
+        'ax': 0,
+        'ay': -30,
+    }
+
+@functools.lru_cache(maxsize=64)
+def skeleton_json(structure, variant, batched=True, overrides='{}'):
+    """Build (once per structure, variant and geometry overrides) the tokenized figure JSON"""
+    level_count, dimension_cells = structure
+    geometry = variant_geometry(variant, overrides)
+    placement = compute_layout(structure, geometry)
+    x_positions = placement['x_positions']
+    trunk_end = max(x_positions) + geometry['trunk_overhang']
+    y_range = placement['y_range']
+    description = geometry['description']
+    cell_box = geometry['cell_box']
+    layout_geometry = geometry['layout']
+
+    traces = [
+        # Main trunk
+        {
+            'type': 'scatter',
+            'x': [geometry['trunk_start'], trunk_end],
+            'y': [0, 0],
+            'mode': 'lines',
+            'line': {'color': 'black', 'width': 5},
+            'name': token('trunk_name'),
+            'showlegend': False,
+            'hoverinfo': 'skip',
+        },
+        # Maturity level markers
+        {
+            'type': 'scatter',
+            'x': x_positions,
+            'y': [0] * level_count,
+            'mode': 'markers',
+            'marker': {'size': 20, 'color': 'darkred', 'symbol': 'diamond'},
+            'name': token('levels_name'),
+            'showlegend': False,
+            'hoverinfo': 'skip',
+        },
+    ]
+    annotations = []
+
+    if 'yaxis_title_annotation' in geometry:
+        annotations.append({
+            'x': geometry['yaxis_title_annotation']['x'],
+            'y': 0,
+            'text': f"<b>{token('yaxis_title')}</b>",
+            'showarrow': False,
+            'font': {'size': 14, 'color': 'rgba(0, 0, 0, 0.5)'},
+            'xanchor': 'center',
+            'yanchor': 'middle',
+            'textangle': -90,
+            'bgcolor': 'rgba(255, 255, 255, 0.3)',
+            'bordercolor': 'rgba(128, 128, 128, 0.3)',
+            'borderwidth': 1,
+        })
+
+    # Arrow at the end of the trunk
+    annotations.append({
+        'x': trunk_end,
+        'y': 0,
+        'text': '▶',
+        'showarrow': False,
+        'font': {'size': 20, 'color': 'black'},
+        'xanchor': 'left',
+        'yanchor': 'middle',
+    })
+
+    for d, counts in enumerate(dimension_cells):
+        y_pos = placement['rows'][d]
+        color = token(f'dim.{d}.color')
+        label = geometry['dimension_label']
+
+        annotations.append({
+            'x': label['x'],
+            'y': y_pos,
+            'text': f"<b>{token(f'dim.{d}.name')}</b>",
+            'showarrow': False,
+            'font': {'size': label['size'], 'color': color},
+            'xanchor': 'right',
+            'yanchor': 'middle',
+            'bgcolor': 'rgba(255, 255, 255, 0.95)',
+            'bordercolor': color,
+            'borderwidth': label['borderwidth'],
+        })
+
+        cells = [(l, x_positions[l], placement['cells'][(d, l)]) for l, count in enumerate(counts) if count is not None]
+        for l, x_pos, cell_y in cells:
+            annotations.append({
+                'x': x_pos,
+                'y': cell_y,
+                'text': token(f"cell.{d}.{l}.{cell_box['content']}"),
+                'showarrow': False,
+                'font': {'size': 10, 'color': 'black'},
+                'bgcolor': 'rgba(255, 255, 255, 0.98)',
+                'bordercolor': color,
+                'borderwidth': 2,
+                'align': cell_box['align'],
+                'width': cell_box['width'],
+                'xanchor': 'center',
+                'yanchor': 'middle',
+            })
+
+        traces += branch_traces(d, cells, geometry, batched)
+
+    # Level descriptions along the top, with hover markers carrying the full text
+    description_y = placement['descriptions']
+    if geometry['hover_markers']:
+        if batched:
+            traces.append(hover_trace(x_positions, description_y, 50, 'darkred',
+                                      [f'level.{l}.hover' for l in range(level_count)]))
+        else:
+            for l, x_pos in enumerate(x_positions):
+                traces.append(hover_trace([x_pos], [description_y[l]], 50, 'darkred', [f'level.{l}.hover']))
+
+    for l, x_pos in enumerate(x_positions):
+        annotations.append({
+            'x': x_pos,
+            'y': description_y[l],
+            'text': token(f'level.{l}.description'),
+            'showarrow': True,
+            'arrowhead': 2,
+            'arrowsize': 1.5,
+            'arrowcolor': 'darkred',
+            'arrowwidth': 2,
+            'ax': 0,
+            'ay': -40,
+            'font': {'size': 9, 'color': 'darkred'},
+            'bgcolor': 'rgba(255, 248, 248, 0.98)',
+            'bordercolor': 'darkred',
+            'borderwidth': 2,
+            'align': 'left',
+            'width': description['width'],
+            'standoff': 10,
+        })
+
+    shapes = []
+    if geometry['reference_lines']:
+        shapes = [
+            reference_line('industry', 'orange', y_range),
+            reference_line('organization', 'purple', y_range),
+        ]
+        annotations += [
+            reference_label('industry', 'orange', y_range[1] - 1),
+            reference_label('organization', 'purple', y_range[1] - 1),
+        ]
+
+    layout = {
+        'title': {
+            'text': token(f'title.{variant}'),
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': layout_geometry['title_size'], 'color': 'darkblue'},
+        },
+        'xaxis': {
+            'title': {'text': token('xaxis_title'), 'font': {'size': layout_geometry['axis_title_size']}},
+            'tickmode': 'array',
+            'tickvals': x_positions,
+            'ticktext': [token(f'level.{l}.key') for l in range(level_count)],
+            'tickfont': {'size': layout_geometry['tickfont_size']},
+            'range': placement['x_range'],
+            'showgrid': True,
+            'gridcolor': 'lightgray',
+            'gridwidth': 1,
+        },
+        'yaxis': {
+            # The interactive variant titles the y axis with an annotation aligned to the trunk
+            'title': {'text': '' if 'yaxis_title_annotation' in geometry else token('yaxis_title'),
+                      'font': {'size': layout_geometry['axis_title_size']}},
+            'tickfont': {'size': layout_geometry['tickfont_size']},
+            'showticklabels': False,
+            'range': list(y_range),
+            'showgrid': True,
+            'gridcolor': 'lightgray',
+            'gridwidth': 1,
+        },
+        'showlegend': False,
+        'plot_bgcolor': 'white',
+        'paper_bgcolor': 'white',
+        'margin': layout_geometry['margin'],
+        'hovermode': 'closest',
+        # Batched markers are drawn at end-point size, widen the hover radius to the old invisible marker
+        'hoverdistance': geometry['hoverdistance'] if batched else 20,
+        'hoverlabel': {'bgcolor': 'white', 'bordercolor': 'gray', 'font': {'size': 12, 'family': 'Arial'}},
+        'annotations': annotations,
+        'shapes': shapes,
+    }
+    if placement['size'] is not None:
+        width, layout['height'] = placement['size']
+        if width is not None:
+            layout['width'] = width
+    if 'autosize' in layout_geometry:
+        layout['autosize'] = layout_geometry['autosize']
+
+    return json.dumps({'data': traces, 'layout': layout}, ensure_ascii=False)
+
+def locale_overlay(data, catalog, variant):
+    """Compute the value of every skeleton token for one locale"""
+    x_positions = level_x_positions(variant, len(data.levels), geometry_overrides(catalog, variant))
+    overlay = {
+        'trunk_name': catalog['trunk_name'],
+        'levels_name': catalog['levels_name'],
+        f'title.{variant}': catalog['titles'][variant],
+        'xaxis_title': catalog['xaxis_title'],
+        'yaxis_title': catalog['yaxis_title'],
+        'ref.editable': catalog['reference_lines_editable'],
+    }
+
+    for key, reference in catalog['reference_lines'].items():
+        # Reference lines sit between two levels; clamp to the levels the model actually has
+        overlay[f'ref.{key}.x'] = reference_x(x_positions, reference['levels'])
+        overlay[f'ref.{key}.name'] = reference['name']
+        overlay[f'ref.{key}.label'] = reference['label']
+
+    for l, level in enumerate(data.levels):
+        fields = dict(title=level.title, description=level.description, features=level.features)
+        overlay[f'level.{l}.key'] = level.key
+        overlay[f'level.{l}.description'] = catalog['level_description'].format(**fields)
+        overlay[f'level.{l}.hover'] = catalog['level_hover'].format(**fields)
+
+    for d, (dimension, color) in enumerate(catalog['dimensions']):
+        overlay[f'dim.{d}.name'] = dimension
+        overlay[f'dim.{d}.color'] = color
+        for l, level in enumerate(data.levels):
+            capabilities = data.capabilities(dimension, level.key)
+            if capabilities is None:
+                continue
+            capabilities_text = '<br>'.join([f'• {cap}' for cap in capabilities])
+            overlay[f'cell.{d}.{l}.list'] = capabilities_text
+            overlay[f'cell.{d}.{l}.summary'] = catalog['cell_summary'].format(count=len(capabilities))
+            overlay[f'cell.{d}.{l}.hover'] = catalog['cell_hover'].format(
+                dimension=dimension, level=level.key, capabilities=capabilities_text)
+
+    return overlay
+
+def apply_overlay(skeleton, overlay):
+    """Substitute every token of a skeleton JSON string in a single pass"""
+    def substitute(match):
+        if match.group(1) is not None:
+            return json.dumps(overlay[match.group(1)], ensure_ascii=False)
+        return json.dumps(overlay[match.group(2)], ensure_ascii=False)[1:-1]
+    return TOKEN_PATTERN.sub(substitute, skeleton)
+
+def render_figure_json(data, catalog, variant, batched=True):
+    """Figure JSON of a variant for one locale's model and catalog"""
+    skeleton = skeleton_json(model_structure(data, catalog), variant, batched, geometry_overrides(catalog, variant))
+    return apply_overlay(skeleton, locale_overlay(data, catalog, variant))
+
+def render_figure(data, catalog, variant, batched=True):
+    """Figure of a variant for one locale's model and catalog
+
+    Building the plotly Figure (which validates every property) is reported
+    as the 'validate' stage of the build in progress.
+    """
+    # Imported here so that importing the engine (e.g. for --list) does not pay for plotly
+    import plotly.graph_objects as go
+    
+    figure = json.loads(render_figure_json(data, catalog, variant, batched))
+    with stage('validate'):
+        return go.Figure(figure)
@@ -0,0 +1,191 @@
+"""
+Automatic layout of the fishbone diagrams.
+
+Branch positions, capability box sizes and level description placement are
+computed from the model structure (number of levels, number of capabilities
+in every (dimension, level) cell) instead of being hard-coded for five
+dimensions and six levels:
+
+* Dimensions are split between the two sides of the trunk, the first half
+  above it and the rest below, each side stacked outwards from the trunk.
+* Every capability box is sized from its line count and placed at its
+  level's x position on its dimension's row. A box that would overlap an
+  already placed box is pushed outwards, past the box it hits, until it is
+  free. Overlap queries go through a uniform-grid spatial hash, so a layout
+  of a few hundred boxes stays well under a second.
+* Level descriptions are placed above the outermost upper box the same way,
+  and the axis ranges grow to fit everything. Fixed-size variants grow the
+  figure size with them; autosized variants, which fill the viewport at
+  their nominal y range (the minimum range with the descriptions at their
+  lowest anchor), get a fixed (scrolling) height once the range outgrows
+  it, so boxes keep their nominal pixel size.
+
+All coordinates are in data units; box sizes are converted from pixels with
+the nominal pixels-per-unit scale of each variant.
+"""
+
+import math
+from collections import defaultdict
+
+class SpatialHash:
+    """Uniform grid of axis-aligned boxes for constant-time overlap queries"""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.buckets = defaultdict(list)
+
+    def _cells(self, box):
+        x0, y0, x1, y1 = box
+        size = self.cell_size
+        for i in range(math.floor(x0 / size), math.floor(x1 / size) + 1):
+            for j in range(math.floor(y0 / size), math.floor(y1 / size) + 1):
+                yield i, j
+
+    def insert(self, box):
+        for cell in self._cells(box):
+            self.buckets[cell].append(box)
+
+    def first_overlap(self, box):
+        """A placed box overlapping box, or None"""
+        x0, y0, x1, y1 = box
+        for cell in self._cells(box):
+            for other in self.buckets.get(cell, ()):
+                if x0 < other[2] and other[0] < x1 and y0 < other[3] and other[1] < y1:
+                    return other
+        return None
+
+def box_at(x, y, width, height):
+    """Box (x0, y0, x1, y1) centered on (x, y)"""
+    return (x - width / 2, y - height / 2, x + width / 2, y + height / 2)
+
+def place(index, x, y, width, height, side, gap):
+    """Push a box centered on (x, y) outwards (side: +1 up, -1 down) until it overlaps nothing
+
+    Returns:
+        tuple: (center y, box) of the placed box
+    """
+    box = box_at(x, y, width, height)
+    other = index.first_overlap(box)
+    while other is not None:
+        # Jump just past the box that was hit instead of creeping in small steps
+        y = other[3] + gap + height / 2 if side > 0 else other[1] - gap - height / 2
+        box = box_at(x, y, width, height)
+        other = index.first_overlap(box)
+    index.insert(box)
+    return y, box
+
+def dimension_sides(dimension_count):
+    """Side (+1 above, -1 below) and stacking rank (0 = next to the trunk) of every dimension
+
+    The first half of the dimensions goes above the trunk, listed from the
+    outermost row inwards, the rest below it, listed from the trunk outwards.
+    """
+    above = dimension_count // 2
+    return [(1, above - 1 - d) if d < above else (-1, d - above) for d in range(dimension_count)]
+
+def dimension_offsets(dimension_count, first_row=2, row_pitch=2):
+    """Nominal y of every dimension row when boxes are not taken into account"""
+    return [side * (first_row + rank * row_pitch) for side, rank in dimension_sides(dimension_count)]
+
+def reference_x(x_positions, levels):
+    """X coordinate between two levels (by index), clamped to the levels that exist"""
+    first, second = (min(l, len(x_positions) - 1) for l in levels)
+    return (x_positions[first] + x_positions[second]) / 2
+
+def compute_layout(structure, geometry):
+    """Lay out one variant of the figure for a model structure
+
+    Args:
+        structure (tuple): (level_count, ((capability count, or None without a cell, for each
+            level) for each dimension)), as returned by fishbone_engine.model_structure()
+        geometry (dict): A fishbone_engine.VARIANTS entry
+
+    Returns:
+        dict: x_positions, rows (label y of each dimension), cells ({(d, l): center y}),
+            descriptions (anchor y of each level), x_range, y_range and figure size
+            ((width, height), width None for autosized variants, or None when autosized entirely)
+    """
+    level_count, dimension_cells = structure
+    unit_x, unit_y = geometry['unit_px']
+    cell_box = geometry['cell_box']
+    description = geometry['description']
+    gap = geometry['box_gap']
+
+    x_positions = [geometry['x_start'] + i * geometry['x_step'] for i in range(level_count)]
+    cell_width = cell_box['width'] / unit_x
+
+    def cell_height(count):
+        lines = count if cell_box['content'] == 'list' else cell_box['summary_lines']
+        return (lines * cell_box['line_px'] + cell_box['padding_px']) / unit_y
+
+    # Grid cells about one box wide keep each query down to a handful of buckets
+    index = SpatialHash(max(cell_width, geometry['x_step']))
+
+    # Place each side from the trunk outwards
+    sides = dimension_sides(len(dimension_cells))
+    order = sorted(range(len(dimension_cells)), key=lambda d: (sides[d][0], sides[d][1]))
+    rows = [0] * len(dimension_cells)
+    cells = {}
+    frontier = {1: 0.0, -1: 0.0}
+    previous_row = {1: None, -1: None}
+    for d in order:
+        side, rank = sides[d]
+        counts = dimension_cells[d]
+        heights = [cell_height(count) for count in counts if count is not None]
+        tallest = max(heights, default=cell_height(1))
+        # Far enough from the trunk that the row's tallest box clears every box placed so far
+        offset = max(geometry['first_row'], frontier[side] + gap + tallest / 2)
+        if previous_row[side] is not None:
+            offset = max(offset, previous_row[side] + geometry['row_pitch'])
+        rows[d] = side * offset
+        previous_row[side] = offset
+
+        for l, count in enumerate(counts):
+            if count is None:
+                continue
+            y, box = place(index, x_positions[l], rows[d], cell_width, cell_height(count), side, gap)
+            cells[(d, l)] = y
+            frontier[side] = max(frontier[side], box[3] if side > 0 else -box[1])
+
+    # Level descriptions sit above the upper boxes; their box starts arrow_px above the anchor
+    description_width = description['width'] / unit_x
+    description_height = (description['lines'] * description['line_px'] + description['arrow_px']) / unit_y
+    anchor = max(description['min_y'], frontier[1] + description['clearance'])
+    descriptions = []
+    for x_pos in x_positions:
+        y, _ = place(index, x_pos, anchor + description_height / 2, description_width, description_height, 1, gap)
+        descriptions.append(y - description_height / 2)
+        frontier[1] = max(frontier[1], y + description_height / 2)
+
+    x_padding = geometry['x_range_padding']
+    x_range = [x_padding[0], max(x_positions, default=geometry['x_start']) + x_padding[1]]
+    y_range = [
+        min(geometry['y_range'][0], -frontier[-1] - geometry['y_range_padding']),
+        max(geometry['y_range'][1], frontier[1] + geometry['y_range_padding']),
+    ]
+
+    size = None
+    layout_geometry = geometry['layout']
+    margin = layout_geometry['margin']
+    height = round((y_range[1] - y_range[0]) * unit_y) + margin['t'] + margin['b']
+    if 'width' in layout_geometry:
+        size = (
+            max(layout_geometry['width'], round((x_range[1] - x_range[0]) * unit_x) + margin['l'] + margin['r']),
+            max(layout_geometry['height'], height),
+        )
+    else:
+        # Range the variant has at its nominal scale: the minimum one, topped by descriptions at their lowest anchor
+        nominal_top = max(geometry['y_range'][1],
+                          description['min_y'] + description_height + geometry['y_range_padding'])
+        if y_range[1] - y_range[0] > nominal_top - geometry['y_range'][0]:
+            size = (None, height)
+
+    return {
+        'x_positions': x_positions,
+        'rows': rows,
+        'cells': cells,
+        'descriptions': descriptions,
+        'x_range': x_range,
+        'y_range': y_range,
+        'size': size,
+    }
@@ -0,0 +1,250 @@
+"""
+Compact in-memory representation of a maturity model.
+
+Instead of the nested dicts of lists of strings returned by json.load(),
+a MaturityModel keeps:
+
+* Level and Dimension objects with __slots__, their keys interned;
+* array-backed capability ID tables: the dimension and level of every
+  capability ID (IDs follow the source order: level, dimension, position);
+* the capability texts as one UTF-8 buffer, NUL-separated in ID order, so
+  the texts of a cell are a single contiguous slice. When the model is
+  loaded from a snapshot the buffer is a memory map of the snapshot file:
+  the pages are shared by every process serving the model and are not
+  part of the Python heap;
+* a dense (dimension, level) cell table holding the capability ID range of
+  every cell, so capabilities(dimension, level) is two index lookups and a
+  slice instead of a dict-of-dict traversal.
+
+Capability texts are decoded when they are asked for.
+"""
+
+import sys
+from array import array
+
+# Start of a cell that does not exist in the model
+NO_CELL = -1
+
+TEXT_SEPARATOR = '\0'
+
+# Typecodes of the array tables, in the order of MaturityModel.tables()
+TABLE_TYPECODES = ('I', 'H', 'H', 'i', 'i')
+
+class Level:
+    """A maturity level (L0, L1, ...) with its descriptive texts"""
+
+    __slots__ = ('index', 'key', 'title', 'description', 'features', 'has_capabilities')
+
+    def __init__(self, index, key, title, description, features, has_capabilities):
+        self.index = index
+        self.key = sys.intern(key)
+        self.title = title
+        self.description = description
+        self.features = features
+        self.has_capabilities = has_capabilities
+
+    def __repr__(self):
+        return f'Level({self.key!r})'
+
+class Dimension:
+    """A capability dimension (Personnel, Process, ...)"""
+
+    __slots__ = ('index', 'name')
+
+    def __init__(self, index, name):
+        self.index = index
+        self.name = sys.intern(name)
+
+    def __repr__(self):
+        return f'Dimension({self.name!r})'
+
+class Capability:
+    """One capability, looked up by its stable ID"""
+
+    __slots__ = ('id', 'dimension', 'level', 'text')
+
+    def __init__(self, capability_id, dimension, level, text):
+        self.id = capability_id
+        self.dimension = dimension
+        self.level = level
+        self.text = text
+
+    def __repr__(self):
+        return f'Capability({self.id}, {self.dimension.name!r}, {self.level.key!r}, {self.text!r})'
+
+class MaturityModel:
+    """A loaded maturity model
+
+    Attributes:
+        levels (tuple): Level objects in source order
+        dimensions (tuple): Dimension objects in the order they first appear in the source
+        source_sha256 (str): Hash of the source JSON, or None if the model was not loaded from a file
+    """
+
+    __slots__ = ('levels', 'dimensions', 'source_sha256', '_level_index', '_dimension_index',
+                 '_texts', '_text_offsets', '_capability_dimension', '_capability_level',
+                 '_cell_start', '_cell_end')
+
+    @classmethod
+    def from_dict(cls, model, source_sha256=None):
+        """Build from a validated model dict in the format of model_of_level*.json"""
+        texts = bytearray()
+        text_offsets = array('I', [0])
+        levels = []
+        dimension_names = {}
+        capability_dimension = array('H')
+        capability_level = array('H')
+        cells = []
+        for l, (key, level_data) in enumerate(model['levels'].items()):
+            levels.append(Level(l, key, level_data['title'], level_data['description'], level_data['features'],
+                                'capabilities' in level_data))
+            for dimension, items in level_data.get('capabilities', {}).items():
+                d = dimension_names.setdefault(dimension, len(dimension_names))
+                start = len(capability_level)
+                for item in items:
+                    capability_dimension.append(d)
+                    capability_level.append(l)
+                    texts.extend((item + TEXT_SEPARATOR).encode('utf-8'))
+                    text_offsets.append(len(texts))
+                cells.append((d, l, start, len(capability_level)))
+
+        cell_start = array('i', [NO_CELL]) * (len(dimension_names) * len(levels))
+        cell_end = array('i', [NO_CELL]) * len(cell_start)
+        for d, l, start, end in cells:
+            cell_start[d * len(levels) + l] = start
+            cell_end[d * len(levels) + l] = end
+
+        self = cls.__new__(cls)
+        self._init(tuple(levels), tuple(Dimension(d, name) for name, d in dimension_names.items()),
+                   (text_offsets, capability_dimension, capability_level, cell_start, cell_end),
+                   bytes(texts), source_sha256)
+        return self
+
+    @classmethod
+    def from_tables(cls, tables, texts, source_sha256=None):
+        """Rebuild from the (tables, texts) pair returned by tables()
+
+        texts may be any buffer, e.g. a slice of a memory-mapped snapshot.
+        """
+        levels, dimension_names, *columns = tables
+        arrays = []
+        for typecode, raw in zip(TABLE_TYPECODES, columns):
+            column = array(typecode)
+            column.frombytes(raw)
+            arrays.append(column)
+
+        self = cls.__new__(cls)
+        self._init(tuple(Level(l, *fields) for l, fields in enumerate(levels)),
+                   tuple(Dimension(d, name) for d, name in enumerate(dimension_names)),
+                   arrays, texts, source_sha256)
+        return self
+
+    def _init(self, levels, dimensions, arrays, texts, source_sha256):
+        self.levels = levels
+        self.dimensions = dimensions
+        self.source_sha256 = source_sha256
+        self._level_index = {level.key: level.index for level in levels}
+        self._dimension_index = {dimension.name: dimension.index for dimension in dimensions}
+        (self._text_offsets, self._capability_dimension, self._capability_level,
+         self._cell_start, self._cell_end) = arrays
+        self._texts = memoryview(texts)
+
+    def tables(self):
+        """Everything the model holds as (marshal-serializable tables, texts bytes), see from_tables()"""
+        tables = (
+            tuple((level.key, level.title, level.description, level.features, level.has_capabilities)
+                  for level in self.levels),
+            tuple(dimension.name for dimension in self.dimensions),
+            self._text_offsets.tobytes(),
+            self._capability_dimension.tobytes(),
+            self._capability_level.tobytes(),
+            self._cell_start.tobytes(),
+            self._cell_end.tobytes(),
+        )
+        return tables, bytes(self._texts)
+
+    def __reduce__(self):
+        # Memory maps cannot be pickled (e.g. to send a model to build_all's workers); copy the texts
+        return (MaturityModel.from_tables, (*self.tables(), self.source_sha256))
+
+    def __len__(self):
+        """Number of capabilities"""
+        return len(self._capability_level)
+
+    def level(self, key):
+        """Level of a key such as 'L3' (KeyError if it does not exist)"""
+        return self.levels[self._level_index[key]]
+
+    def dimension(self, name):
+        """Dimension of a name, or None if no level has capabilities in it"""
+        d = self._dimension_index.get(name)
+        return None if d is None else self.dimensions[d]
+
+    def _decode(self, start, end):
+        """Texts of the capability IDs start to end - 1"""
+        if start == end:
+            return []
+        # The last text's separator is left out of the slice
+        return str(self._texts[self._text_offsets[start]:self._text_offsets[end] - 1], 'utf-8').split(TEXT_SEPARATOR)
+
+    def _cell(self, dimension, level):
+        """Capability ID range of a (dimension name, level key) cell, or None"""
+        d = self._dimension_index.get(dimension)
+        if d is None:
+            return None
+        cell = d * len(self.levels) + self._level_index[level]
+        start = self._cell_start[cell]
+        return None if start == NO_CELL else (start, self._cell_end[cell])
+
+    def capability_count(self, dimension, level):
+        """Number of capabilities of a (dimension name, level key) cell, or None without a cell"""
+        cell = self._cell(dimension, level)
+        return None if cell is None else cell[1] - cell[0]
+
+    def capabilities(self, dimension, level):
+        """Capability texts of a (dimension name, level key) cell, or None without a cell"""
+        cell = self._cell(dimension, level)
+        return None if cell is None else self._decode(*cell)
+
+    def level_capabilities(self, level):
+        """(dimension name, capability texts) of every cell of a level, in source order"""
+        l = self._level_index[level]
+        cells = sorted(
+            (self._cell_start[d * len(self.levels) + l], self._cell_end[d * len(self.levels) + l], dimension.name)
+            for d, dimension in enumerate(self.dimensions)
+            if self._cell_start[d * len(self.levels) + l] != NO_CELL
+        )
+        return [(dimension, self._decode(start, end)) for start, end, dimension in cells]
+
+    def capability(self, capability_id):
+        """Capability of a stable capability ID"""
+        return Capability(
+            capability_id,
+            self.dimensions[self._capability_dimension[capability_id]],
+            self.levels[self._capability_level[capability_id]],
+            self._decode(capability_id, capability_id + 1)[0],
+        )
+
+    def capabilities_index(self):
+        """{dimension: {level: [capabilities]}} for every cell, dimensions and levels in source order"""
+        index = {}
+        for dimension in self.dimensions:
+            cells = index[dimension.name] = {}
+            for level in self.levels:
+                capabilities = self.capabilities(dimension.name, level.key)
+                if capabilities is not None:
+                    cells[level.key] = capabilities
+        return index
+
+    def to_dict(self):
+        """The model in the format of model_of_level*.json"""
+        levels = {}
+        for level in self.levels:
+            level_data = levels[level.key] = {
+                'title': level.title,
+                'description': level.description,
+                'features': level.features,
+            }
+            if level.has_capabilities:
+                level_data['capabilities'] = dict(self.level_capabilities(level.key))
+        return {'levels': levels}
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Compiled binary snapshots of the maturity model JSON files.
+
+Compiling a model validates it once and stores its MaturityModel (see
+maturity_model.py) next to the source (``.snapshots/<name>.fbsnap``): the
+level and dimension tables, the stable integer capability IDs and the
+(dimension, level) cell table that generate_capabilities_data() would
+otherwise rebuild on every run, marshalled, followed by the raw capability
+text buffer. Loading a snapshot copies the small tables back without
+parsing JSON and memory-maps the text buffer.
+
+The snapshot header records the SHA-256 of the source file, so editing the
+JSON invalidates it and the next load recompiles it transparently.
+"""
+
+import argparse
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+
+from maturity_model import TEXT_SEPARATOR, MaturityModel
+
+SNAPSHOT_DIRNAME = '.snapshots'
+SNAPSHOT_SUFFIX = '.fbsnap'
+SNAPSHOT_MAGIC = b'FBMS'
+SNAPSHOT_FORMAT = 2
+
+# Magic, format, SHA-256 of the source, length of the marshalled tables, length of the
+# interpreter tag; then the tag, the tables and the text buffer up to the end of the file
+HEADER = struct.Struct('>4sH32sIB')
+
+# marshal output is only guaranteed to be readable by the same interpreter version,
+# and the arrays are stored in the native byte order
+INTERPRETER_TAG = f'{sys.implementation.cache_tag or sys.implementation.name}-{sys.byteorder}'.encode('ascii')
+
+LEVEL_FIELDS = ('title', 'description', 'features')
+
+class ModelValidationError(ValueError):
+    """The model JSON does not have the expected structure"""
+
+def snapshot_path(source_path):
+    """Path of the snapshot of a model file"""
+    directory, filename = os.path.split(os.path.abspath(source_path))
+    return os.path.join(directory, SNAPSHOT_DIRNAME, filename + SNAPSHOT_SUFFIX)
+
+def validate_model(model):
+    """Raise ModelValidationError unless model has the structure of model_of_level*.json"""
+    if not isinstance(model, dict) or not isinstance(model.get('levels'), dict):
+        raise ModelValidationError("the model must be an object with a 'levels' object")
+    for level, level_data in model['levels'].items():
+        if not isinstance(level_data, dict):
+            raise ModelValidationError(f"levels.{level} must be an object")
+        for field in LEVEL_FIELDS:
+            if not isinstance(level_data.get(field), str):
+                raise ModelValidationError(f"levels.{level}.{field} must be a string")
+        capabilities = level_data.get('capabilities', {})
+        if not isinstance(capabilities, dict):
+            raise ModelValidationError(f"levels.{level}.capabilities must be an object")
+        for dimension, items in capabilities.items():
+            if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+                raise ModelValidationError(f"levels.{level}.capabilities.{dimension} must be a list of strings")
+            if any(TEXT_SEPARATOR in item for item in items):
+                raise ModelValidationError(f"levels.{level}.capabilities.{dimension} must not contain NUL characters")
+
+def write_snapshot(path, tables, texts, source_sha256):
+    """Atomically write a snapshot file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = marshal.dumps(tables)
+    temp_file = f'{path}.{os.getpid()}.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, bytes.fromhex(source_sha256),
+                            len(payload), len(INTERPRETER_TAG)))
+        f.write(INTERPRETER_TAG)
+        f.write(payload)
+        f.write(texts)
+    os.replace(temp_file, path)
+
+def read_snapshot(path, source_sha256):
+    """(tables, memory-mapped texts) of a snapshot, or None if it is missing, stale or
+    written by another interpreter"""
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # ValueError: empty file
+        return None
+    if len(mapped) < HEADER.size:
+        return None
+    magic, snapshot_format, digest, payload_length, tag_length = HEADER.unpack_from(mapped)
+    tag_end = HEADER.size + tag_length
+    payload_end = tag_end + payload_length
+    if (magic != SNAPSHOT_MAGIC or snapshot_format != SNAPSHOT_FORMAT or digest.hex() != source_sha256
+            or mapped[HEADER.size:tag_end] != INTERPRETER_TAG or payload_end > len(mapped)):
+        return None
+    try:
+        tables = marshal.loads(mapped[tag_end:payload_end])
+    except (EOFError, ValueError, TypeError):
+        return None
+    # The map stays open for as long as the model references its texts
+    return tables, memoryview(mapped)[payload_end:]
+
+def compile_file(source_path, source=None):
+    """Validate a model file and write its snapshot
+
+    Returns:
+        tuple: (MaturityModel, snapshot path or None if it could not be written)
+    """
+    if source is None:
+        with open(source_path, 'rb') as f:
+            source = f.read()
+    source_sha256 = hashlib.sha256(source).hexdigest()
+    model = json.loads(source)
+    validate_model(model)
+    compiled = MaturityModel.from_dict(model, source_sha256)
+
+    path = snapshot_path(source_path)
+    try:
+        write_snapshot(path, *compiled.tables(), source_sha256)
+    except OSError:
+        # Read-only deployments still work, they just compile in memory every time
+        path = None
+    return compiled, path
+
+def load_model(source_path):
+    """Load a model through its snapshot, compiling it first if it is missing or stale
+
+    Returns:
+        MaturityModel: The loaded model
+    """
+    with open(source_path, 'rb') as f:
+        source = f.read()
+    source_sha256 = hashlib.sha256(source).hexdigest()
+    snapshot = read_snapshot(snapshot_path(source_path), source_sha256)
+    if snapshot is None:
+        model, _ = compile_file(source_path, source)
+        return model
+    return MaturityModel.from_tables(*snapshot, source_sha256)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Validate maturity model JSON files and compile their binary snapshots')
+    parser.add_argument('models', nargs='+', help='Model JSON files (e.g. resource/model_of_level.json)')
+
+    args = parser.parse_args()
+
+    exit_code = 0
+    for source_path in args.models:
+        try:
+            model, path = compile_file(source_path)
+        except (OSError, ValueError) as e:
+            print(f"Error: {source_path}: {e}", file=sys.stderr)
+            exit_code = 1
+            continue
+        size = os.path.getsize(path) if path else 0
+        print(f"{source_path}: {len(model.levels)} levels, {len(model.dimensions)} dimensions, "
+              f"{len(model)} capabilities -> {path or 'not written'} ({size} bytes, source {model.source_sha256[:12]})")
+    sys.exit(exit_code)
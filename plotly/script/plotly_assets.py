@@ -0,0 +1,157 @@
+"""
+Shared, content-fingerprinted plotly.js asset for the generated pages.
+
+Instead of inlining ~3.5 MB of plotly.js into every HTML file or pointing at
+the public CDN, the build writes a plotly.js bundle once as
+``plotly-<hash>.min.js`` next to the artifacts, and every page references it
+by that relative name. Because the name changes whenever the content does,
+the server can let browsers cache it forever.
+
+Pages whose figures only use trace types covered by plotly.js's ``basic``
+partial bundle reference ``plotly-basic-<hash>.min.js`` instead, when a copy
+of that bundle matching the installed plotly.js version is available (see
+BASIC_BUNDLE_FILE). Any other trace type falls back to the full bundle.
+
+The basic bundle is opt-in: the Python plotly package does not ship it and
+the repository does not vendor it, so without it every page silently uses the
+full bundle. Only a PLOTLY_BASIC_BUNDLE path that does not exist is reported.
+"""
+
+import functools
+import hashlib
+import os
+import re
+import sys
+
+from precompress import ENCODING_SUFFIXES, available_encodings, write_precompressed
+
+PLOTLYJS_PREFIX = 'plotly-'
+PLOTLYJS_SUFFIX = '.min.js'
+
+# Trace types included in plotly.js's "basic" partial bundle (plotly.js-basic-dist-min)
+BASIC_BUNDLE_TRACE_TYPES = frozenset({'scatter', 'bar', 'pie'})
+
+# Vendored copy of dist/plotly-basic.min.js, overridable with the PLOTLY_BASIC_BUNDLE environment variable
+BASIC_BUNDLE_FILE = os.environ.get(
+    'PLOTLY_BASIC_BUNDLE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'vendor', 'plotly-basic.min.js')
+)
+
+BUNDLE_VERSION_PATTERN = re.compile(rb'plotly\.js[^\n]*?v(\d+\.\d+\.\d+)')
+
+def fingerprint(source):
+    """Short content hash used in asset file names"""
+    return hashlib.sha256(source).hexdigest()[:16]
+
+@functools.lru_cache(maxsize=None)
+def plotlyjs_bundle():
+    """plotly.js source bundled with the installed plotly package and its fingerprint"""
+    from plotly.offline import get_plotlyjs
+    
+    source = get_plotlyjs().encode('utf-8')
+    return source, fingerprint(source)
+
+@functools.lru_cache(maxsize=None)
+def basic_plotlyjs_bundle():
+    """The basic partial bundle and its fingerprint, or None if it is unavailable
+
+    The bundle is only used when its header reports the same plotly.js version
+    as the full bundle the installed plotly package was built against.
+    """
+    try:
+        with open(BASIC_BUNDLE_FILE, 'rb') as f:
+            source = f.read()
+    except OSError:
+        # Without the opt-in this is the normal case, and cron or --summary-json runs should stay quiet
+        if 'PLOTLY_BASIC_BUNDLE' in os.environ:
+            print(f"Warning: PLOTLY_BASIC_BUNDLE file {BASIC_BUNDLE_FILE} not found; "
+                  f"using the full bundle", file=sys.stderr)
+        return None
+
+    from plotly.offline import get_plotlyjs_version
+    
+    match = BUNDLE_VERSION_PATTERN.search(source[:512])
+    expected = get_plotlyjs_version()
+    if match is None or match.group(1).decode('ascii') != expected:
+        found = match.group(1).decode('ascii') if match else 'unknown'
+        print(f"Warning: {BASIC_BUNDLE_FILE} is plotly.js {found}, expected {expected}; "
+              f"using the full bundle", file=sys.stderr)
+        return None
+    return source, fingerprint(source)
+
+def plotlyjs_filename():
+    """File name of the fingerprinted full plotly.js asset"""
+    _, digest = plotlyjs_bundle()
+    return f'{PLOTLYJS_PREFIX}{digest}{PLOTLYJS_SUFFIX}'
+
+def basic_plotlyjs_filename():
+    """File name of the fingerprinted basic partial bundle, or None if unavailable"""
+    bundle = basic_plotlyjs_bundle()
+    if bundle is None:
+        return None
+    return f'{PLOTLYJS_PREFIX}basic-{bundle[1]}{PLOTLYJS_SUFFIX}'
+
+def available_plotlyjs():
+    """Identity of the bundles a build may choose from, for build cache keys"""
+    return [name for name in (plotlyjs_filename(), basic_plotlyjs_filename()) if name]
+
+def figure_trace_types(fig):
+    """Set of trace types present in a figure"""
+    return {trace.type for trace in fig.data}
+
+def bundle_trace_types(plotlyjs_src):
+    """Trace types a plotly.js asset supports, or None for the full bundle (every type)"""
+    if os.path.basename(plotlyjs_src).startswith(f'{PLOTLYJS_PREFIX}basic-'):
+        return BASIC_BUNDLE_TRACE_TYPES
+    return None
+
+def check_bundle_coverage(plotlyjs_src, trace_types):
+    """Raise ValueError if the plotly.js asset cannot draw every given trace type"""
+    supported = bundle_trace_types(plotlyjs_src)
+    missing = set(trace_types) - supported if supported is not None else set()
+    if missing:
+        raise ValueError(f"{plotlyjs_src} does not include the trace types {', '.join(sorted(missing))}")
+
+def write_asset(output_dir, filename, source):
+    """Write an asset and its precompressed siblings into output_dir unless they already exist"""
+    path = os.path.join(output_dir, filename)
+    if not os.path.exists(path):
+        os.makedirs(output_dir, exist_ok=True)
+        # Write under a private name first so concurrent builds never expose a partial file
+        temp_file = f'{path}.{os.getpid()}.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(source)
+        os.replace(temp_file, path)
+        write_precompressed(path)
+    elif any(not os.path.exists(path + ENCODING_SUFFIXES[encoding]) for encoding in available_encodings()):
+        write_precompressed(path)
+
+def ensure_plotlyjs(output_dir, trace_types=None):
+    """Write the fingerprinted plotly.js asset a page needs into output_dir if missing
+
+    Args:
+        trace_types (set): Trace types of the page's figures; when they are all
+            covered by the basic partial bundle and it is available, that
+            bundle is used instead of the full one
+
+    Returns:
+        str: The asset's file name, usable as a relative script src
+    """
+    if trace_types is not None and set(trace_types) <= BASIC_BUNDLE_TRACE_TYPES:
+        filename = basic_plotlyjs_filename()
+        if filename:
+            write_asset(output_dir, filename, basic_plotlyjs_bundle()[0])
+            return filename
+
+    filename = plotlyjs_filename()
+    write_asset(output_dir, filename, plotlyjs_bundle()[0])
+    return filename
+
+def ensure_all_plotlyjs(output_dir):
+    """Write every available plotly.js bundle (and its precompressed siblings) into output_dir
+
+    Called once before parallel builds so worker processes never compress
+    the same multi-megabyte bundle concurrently.
+    """
+    ensure_plotlyjs(output_dir)
+    ensure_plotlyjs(output_dir, BASIC_BUNDLE_TRACE_TYPES)
@@ -0,0 +1,60 @@
+"""
+Build-time precompression of the generated artifacts.
+
+Every HTML page and plotly.js asset gets ``.gz`` (and, when the optional
+``brotli`` package is installed, ``.br``) siblings written next to it, so the
+server can hand out the compressed bytes directly instead of compressing on
+every request.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content-Encoding -> sibling file suffix
+ENCODING_SUFFIXES = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+
+def compress(data, encoding):
+    """Compress bytes with the strongest setting of an encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def available_encodings():
+    """Encodings the build can produce in this environment"""
+    return [encoding for encoding in ENCODING_SUFFIXES if encoding != 'br' or brotli is not None]
+
+def write_precompressed(path):
+    """Write the compressed siblings of a file
+
+    Siblings of encodings that are unavailable here are removed, so a stale
+    variant is never served for a rebuilt file.
+
+    Returns:
+        list: Paths of the written siblings
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    written = []
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        target = path + suffix
+        if encoding not in available_encodings():
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        # Write under a private name first so concurrent builds never expose a partial file
+        temp_file = f'{target}.{os.getpid()}.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(compress(data, encoding))
+        os.replace(temp_file, target)
+        written.append(target)
+    return written
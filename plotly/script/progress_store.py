@@ -0,0 +1,200 @@
+"""
+Server-side store of the capability checkboxes of team assessments.
+
+Progress is kept in a local SQLite database in WAL mode, so readers never
+wait for writers and every worker process of the server can share it. Each
+capability of an assessment is one row keyed by (assessment, capability):
+a batch of toggles is a single short transaction that bulk-upserts only the
+rows that changed, instead of rewriting the whole set of checked boxes.
+
+Every batch increments the assessment's revision and stamps the rows it
+writes with it. Clients that already hold revision N fetch only the rows
+changed after it, through the (assessment, revision) index.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    assessment_id TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS progress (
+    assessment_id TEXT NOT NULL,
+    capability_id TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    revision INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (assessment_id, capability_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS progress_revision ON progress (assessment_id, revision);
+"""
+
+UPSERT = """
+INSERT INTO progress (assessment_id, capability_id, completed, revision, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (assessment_id, capability_id) DO UPDATE SET
+    completed = excluded.completed,
+    revision = excluded.revision,
+    updated_at = excluded.updated_at
+WHERE progress.completed != excluded.completed
+"""
+
+def prefix_range(prefix):
+    """WHERE clause and parameters selecting the assessment IDs that start with prefix, as a primary key range scan"""
+    if not prefix:
+        return '1', ()
+    # The smallest string greater than every string starting with prefix
+    return 'assessment_id >= ? AND assessment_id < ?', (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+class ProgressStore:
+    """Capability progress of assessments in a SQLite database (one connection per thread and process)
+
+    Args:
+        path (str): Database file, created with its directory if missing
+        timeout (float): Seconds a writer waits for another writer's transaction
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        self.schema_lock = threading.Lock()
+        self.schema_ready = False
+
+    def connection(self):
+        """This thread's connection; a forked worker process opens its own instead of reusing the parent's"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None and self.local.pid == os.getpid():
+            return connection
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly below
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # In WAL mode NORMAL only fsyncs at checkpoints; commits stay atomic and durable across application crashes
+        connection.execute('PRAGMA synchronous=NORMAL')
+        with self.schema_lock:
+            if not self.schema_ready:
+                connection.executescript(SCHEMA)
+                self.schema_ready = True
+        self.local.connection = connection
+        self.local.pid = os.getpid()
+        return connection
+
+    def close(self):
+        """Close this thread's connection; the next call opens a new one"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None and self.local.pid == os.getpid():
+            connection.close()
+        self.local.connection = None
+
+    def apply(self, assessment_id, operations):
+        """Apply a batch of toggles in one transaction
+
+        Args:
+            operations (dict): capability_id -> completed (bool); a capability
+                toggled several times in a batch carries only its final state
+
+        Returns:
+            int: Revision of the assessment after the batch
+        """
+        now = time.time()
+        connection = self.connection()
+        # Take the write lock up front, so two batches never both read and then deadlock upgrading
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'INSERT INTO assessments (assessment_id, revision, updated_at) VALUES (?, 1, ?) '
+                'ON CONFLICT (assessment_id) DO UPDATE SET revision = revision + 1, updated_at = excluded.updated_at',
+                (assessment_id, now),
+            )
+            revision = connection.execute(
+                'SELECT revision FROM assessments WHERE assessment_id = ?', (assessment_id,)
+            ).fetchone()[0]
+            connection.executemany(UPSERT, [
+                (assessment_id, capability_id, int(bool(completed)), revision, now)
+                for capability_id, completed in operations.items()
+            ])
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return revision
+
+    def revision(self, assessment_id):
+        """Current revision of an assessment (0 if it has no progress yet)"""
+        row = self.connection().execute(
+            'SELECT revision FROM assessments WHERE assessment_id = ?', (assessment_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def completed(self, assessment_id):
+        """(revision, sorted list of the completed capability IDs)"""
+        connection = self.connection()
+        # One read transaction: the revision and the rows come from the same snapshot
+        connection.execute('BEGIN')
+        try:
+            revision = self.revision(assessment_id)
+            rows = connection.execute(
+                'SELECT capability_id FROM progress WHERE assessment_id = ? AND completed = 1 ORDER BY capability_id',
+                (assessment_id,),
+            ).fetchall()
+        finally:
+            connection.execute('COMMIT')
+        return revision, [row[0] for row in rows]
+
+    def changes(self, assessment_id, since):
+        """(revision, {capability_id: completed}) of the rows changed after revision since"""
+        connection = self.connection()
+        connection.execute('BEGIN')
+        try:
+            revision = self.revision(assessment_id)
+            rows = connection.execute(
+                'SELECT capability_id, completed FROM progress WHERE assessment_id = ? AND revision > ?',
+                (assessment_id, since),
+            ).fetchall()
+        finally:
+            connection.execute('COMMIT')
+        return revision, {capability_id: bool(completed) for capability_id, completed in rows}
+
+    def state(self, prefix=''):
+        """(assessment count, sum of their revisions) of the assessments whose ID starts with prefix
+
+        Every applied batch increments a revision, so the pair changes whenever their progress may have.
+        """
+        where, params = prefix_range(prefix)
+        count, total = self.connection().execute(
+            f'SELECT count(*), total(revision) FROM assessments WHERE {where}', params
+        ).fetchone()
+        return count, int(total)
+
+    def completed_pairs(self, prefix=''):
+        """(assessment_id, capability_id) of every completed capability of the assessments whose ID starts with prefix"""
+        where, params = prefix_range(prefix)
+        return self.connection().execute(
+            f'SELECT assessment_id, capability_id FROM progress WHERE {where} AND completed = 1', params
+        ).fetchall()
+
+    def assessments_with_pairs(self, prefix=''):
+        """(sorted IDs of the assessments whose ID starts with prefix, their completed_pairs())
+
+        Both come from the same snapshot, and the IDs include the assessments
+        that have no completed capability (e.g. every box unchecked again).
+        """
+        where, params = prefix_range(prefix)
+        connection = self.connection()
+        connection.execute('BEGIN')
+        try:
+            assessment_ids = [row[0] for row in connection.execute(
+                f'SELECT assessment_id FROM assessments WHERE {where} ORDER BY assessment_id', params
+            )]
+            pairs = self.completed_pairs(prefix)
+        finally:
+            connection.execute('COMMIT')
+        return assessment_ids, pairs
@@ -0,0 +1,99 @@
+"""
+Memory-bounded LRU cache for pages rendered on demand by the server.
+
+Entries are evicted least recently used first once the total size of the
+cached bodies exceeds the budget, so the cache holds as many renders as fit
+in memory whatever their size. Concurrent misses on the same key render it
+only once: the other requests wait for that render and reuse it.
+"""
+
+import threading
+from collections import OrderedDict
+
+class RenderCache:
+    """Thread-safe LRU cache bounded by the total byte size of its entries
+
+    Args:
+        max_bytes (int): Memory budget; entries larger than it are never cached
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        # Key -> lock held while the key is being rendered
+        self.rendering = {}
+
+    def get(self, key):
+        """Cached value of a key (marking it most recently used), or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        """Cache a value of the given size, evicting the least recently used entries to make room"""
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def get_or_render(self, key, render):
+        """Cached value of a key, rendering and caching it on a miss
+
+        Args:
+            render (callable): Returns (value, size in bytes)
+
+        Returns:
+            tuple: (value, hit) where hit is False if this call rendered the value
+        """
+        value = self.get(key)
+        if value is not None:
+            with self.lock:
+                self.hits += 1
+            return value, True
+
+        with self.lock:
+            key_lock = self.rendering.setdefault(key, threading.Lock())
+        with key_lock:
+            # Rendered by a concurrent request while this one was waiting
+            value = self.get(key)
+            if value is not None:
+                with self.lock:
+                    self.hits += 1
+                return value, True
+            try:
+                value, size = render()
+                self.put(key, value, size)
+            finally:
+                with self.lock:
+                    self.rendering.pop(key, None)
+        with self.lock:
+            self.misses += 1
+        return value, False
+
+    def stats(self):
+        """Entry count, size, budget and hit/miss/eviction counters"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -1,5 +1,15 @@
-from flask import Flask, send_file, render_template_string
+from flask import Flask, abort, request, send_file, render_template_string
+import hashlib
+import importlib
+import json
+import mimetypes
 import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
 from pathlib import Path
 
 app = Flask(__name__)
@@ -8,6 +18,223 @@ app = Flask(__name__)
 current_dir = Path(__file__).parent
 outpt_dir = current_dir / 'output'
 
+# 生成脚本所在目录，供图表JSON接口导入
+sys.path.insert(0, str(current_dir / 'script'))
+
+from build_cache import INDEX_FILENAME, BuildCache, file_sha256
+from progress_store import ProgressStore
+from render_cache import RenderCache
+from watch import file_state
+
+# 语言 -> 生成脚本模块
+FIGURE_LOCALES = {
+    'zh': 'ai_maturity_fishbone_plotly',
+    'en': 'ai_maturity_fishbone_plotly_en',
+}
+
+# 可通过JSON接口获取的版本
+FIGURE_VERSIONS = ('ultra', 'interactive')
+
+# 外壳页面很少变化，可缓存一小时；图表JSON每次都通过ETag协商
+FIGURE_SHELL_MAX_AGE = 3600
+
+# Flask的代码重载器会再启动一个子进程（进程启动两次），只在开发时通过 SERVER_RELOAD=1 开启
+USE_RELOADER = os.environ.get('SERVER_RELOAD') == '1'
+
+# 开发时的实时刷新：SERVER_LIVE_RELOAD=1 时，页面通过 /events（Server-Sent Events）在输出文件
+# 重新生成（如 build_all.py --watch）后自动刷新，图表外壳页面在模型变化后用 Plotly.react 更新
+LIVE_RELOAD = os.environ.get('SERVER_LIVE_RELOAD') == '1'
+
+# 轮询输出文件和模型文件的间隔（秒），以及文件写完（不再变化）后再通知页面的等待时间
+LIVE_RELOAD_INTERVAL = 0.05
+LIVE_RELOAD_DELAY = 0.1
+
+# 没有事件时定期发送注释行，以便及时发现断开的连接
+LIVE_RELOAD_HEARTBEAT = 15
+
+# 每个已连接页面一个事件队列
+live_reload_clients = set()
+live_reload_lock = threading.Lock()
+live_reload_thread = None
+
+# (locale, version) -> (模型文件状态, 图表JSON, ETag, 图表所需的plotly.js文件名)
+figure_cache = {}
+figure_cache_lock = threading.Lock()
+
+# 带指纹的plotly.js缓存一年
+PLOTLYJS_MAX_AGE = 365 * 24 * 3600
+
+# trace类型集合 -> 输出目录中对应的plotly.js文件名。启动时由prepare_plotlyjs()写入所有bundle，
+# 之后每个进程对每种组合只解析一次，请求线程不再写入或压缩bundle
+plotlyjs_assets = {}
+plotlyjs_assets_lock = threading.Lock()
+
+# 内存中的产物缓存：文件路径 -> 文件及其预压缩兄弟文件的内容、ETag和修改时间。
+# 每次请求只需stat确认文件未变，无需打开和读取文件；超过此大小的文件直接从磁盘发送
+ARTIFACT_CACHE_MAX_FILE_SIZE = 16 * 1024 * 1024
+artifact_cache = {}
+artifact_cache_lock = threading.Lock()
+
+# 在反向代理之后运行时，把产物交给代理以sendfile()零拷贝发送（包括Range请求），Python不再读取或传输文件内容：
+# SERVER_SENDFILE=x-sendfile（Apache mod_xsendfile、lighttpd）发送 X-Sendfile 头；
+# SERVER_SENDFILE=x-accel-redirect（nginx）发送 X-Accel-Redirect 头，指向映射到输出目录的internal location
+SENDFILE = os.environ.get('SERVER_SENDFILE', '').lower()
+if SENDFILE not in ('', 'x-sendfile', 'x-accel-redirect'):
+    raise ValueError(f"SERVER_SENDFILE must be x-sendfile or x-accel-redirect, not {SENDFILE!r}")
+X_ACCEL_PREFIX = os.environ.get('SERVER_X_ACCEL_PREFIX', '/_output/')
+app.config['USE_X_SENDFILE'] = SENDFILE == 'x-sendfile'
+
+# 按需渲染（/render/<locale>/<version>）的LRU缓存预算，按缓存内容的总字节数淘汰
+RENDER_CACHE_MAX_BYTES = int(os.environ.get('SERVER_RENDER_CACHE_MB', 64)) * 1024 * 1024
+
+# 渲染选项 -> 允许的取值（第一个为默认值）；plotlyjs=cdn 时页面从CDN加载plotly.js
+RENDER_OPTIONS = {
+    'plotlyjs': ('local', 'cdn'),
+}
+
+render_cache = RenderCache(RENDER_CACHE_MAX_BYTES)
+
+# 评估统计（/api/stats）使用单独的LRU缓存，频繁变化的统计结果不会挤出已渲染的页面
+STATS_CACHE_MAX_BYTES = int(os.environ.get('SERVER_STATS_CACHE_MB', 8)) * 1024 * 1024
+
+stats_cache = RenderCache(STATS_CACHE_MAX_BYTES)
+
+# 评估进度数据库（SQLite，WAL模式），所有工作进程共享
+PROGRESS_DB = os.environ.get('SERVER_PROGRESS_DB', str(current_dir / 'data' / 'progress.db'))
+
+# 评估ID的格式，以及一批勾选变化的数量和请求体大小上限
+ASSESSMENT_ID_PATTERN = re.compile(r'[A-Za-z0-9_.-]{1,64}')
+CAPABILITY_ID_MAX_LENGTH = 256
+PROGRESS_MAX_OPERATIONS = 5000
+PROGRESS_MAX_BODY = 1024 * 1024
+
+progress_store = ProgressStore(PROGRESS_DB)
+
+# locale -> (模型文件状态, 已加载的模型)
+model_cache = {}
+model_cache_lock = threading.Lock()
+
+# 构建时预压缩的兄弟文件，按优先级排列：Content-Encoding -> 文件后缀
+PRECOMPRESSED_SUFFIXES = (
+    ('br', '.br'),
+    ('gzip', '.gz'),
+)
+
+# 图表外壳页面：通过Plotly.react加载图表JSON
+FIGURE_SHELL_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="{{ lang }}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>AI Maturity Model - {{ version }} ({{ locale }})</title>
+    <script src="/{{ plotlyjs }}"></script>
+    <style>
+        html, body { margin: 0; height: 100%; font-family: Arial, sans-serif; }
+        #chart { width: 100%; height: 100%; }
+    </style>
+</head>
+<body>
+    <div id="chart"></div>
+    <script>
+        function renderFigure() {
+            fetch('/api/figure/{{ locale }}/{{ version }}', { cache: 'no-cache' })
+                .then(function (response) { return response.json(); })
+                .then(function (figure) {
+                    Plotly.react('chart', figure.data, figure.layout, {{ config | tojson }});
+                });
+        }
+        renderFigure();
+    </script>
+    {% if live_reload %}<script src="/live-reload.js" data-locale="{{ locale }}"></script>{% endif %}
+</body>
+</html>
+"""
+
+# 实时刷新客户端：图表页面在自身文件重新生成后刷新（交互版的勾选状态保存在服务器的进度API中，重新加载后恢复），
+# 图表外壳页面在对应语言的模型变化后重新获取图表JSON并调用 Plotly.react
+LIVE_RELOAD_SCRIPT = """
+(function () {
+    var script = document.currentScript;
+    var source = new EventSource('/events');
+    source.addEventListener('reload', function (event) {
+        if (JSON.parse(event.data).files.indexOf(script.dataset.file) !== -1) {
+            location.reload();
+        }
+    });
+    source.addEventListener('figure', function (event) {
+        if (script.dataset.locale && JSON.parse(event.data).locales.indexOf(script.dataset.locale) !== -1) {
+            renderFigure();
+        }
+    });
+})();
+"""
+
+# 有固定路由的图表页面：(locale, version) -> URL；其他已构建的图表通过 /chart/<locale>/<version> 访问。
+# 这些页面尚未构建时会按需渲染，因此主页总是列出它们
+PAGE_ROUTES = {
+    ('zh', 'interactive'): '/interactive',
+    ('zh', 'ultra'): '/ultra',
+    ('en', 'interactive'): '/interactive_en',
+    ('en', 'ultra'): '/ultra_en',
+}
+
+# 主页卡片的图标和文案，按此顺序排列在前；清单中其他图表使用通用卡片
+HOME_CARDS = {
+    ('zh', 'interactive'): {
+        'icon': '🎯',
+        'title': 'Interactive Version',
+        'description': 'Includes sidebar checkbox functionality to track completed capabilities with progress saving. Best for practical use.',
+        'button': 'View Interactive Version',
+    },
+    ('zh', 'ultra'): {
+        'icon': '🌟',
+        'title': 'Ultra Clean Layout Version',
+        'description': 'Uses layered display strategy with the clearest information layout, includes draggable reference lines, suitable for presentation and analysis.',
+        'button': 'View Ultra Clean Version',
+    },
+    ('en', 'interactive'): {
+        'icon': '🔍',
+        'title': 'Interactive Version',
+        'description': 'English interactive chart with sidebar checkbox functionality, suitable for international display and use.',
+        'button': 'View Interactive (EN)',
+    },
+    ('en', 'ultra'): {
+        'icon': '👁️',
+        'title': 'Ultra Clean Layout Version',
+        'description': 'English ultra clean layout chart with layered display strategy, suitable for international presentation and analysis.',
+        'button': 'View Ultra Clean (EN)',
+    },
+    ('zh', 'basic'): {
+        'icon': '📊',
+        'title': 'Basic Version',
+        'description': 'Basic fishbone diagram of the maturity levels and capability dimensions.',
+        'button': 'View Basic Version',
+    },
+    ('zh', 'detailed'): {
+        'icon': '📋',
+        'title': 'Detailed Version',
+        'description': 'Lists every capability of each dimension and level in full.',
+        'button': 'View Detailed Version',
+    },
+    ('zh', 'static'): {
+        'icon': '🖼️',
+        'title': 'Static Display Version',
+        'description': 'Fixed layout for printing and exporting images.',
+        'button': 'View Static Version',
+    },
+}
+
+LOCALE_NAMES = {
+    'zh': 'Chinese',
+    'en': 'English',
+}
+
+# 输出目录清单（/list 和主页的数据来源），输出目录或构建缓存索引变化时重建。
+# 构建以替换文件的方式写入预压缩文件和索引，每次构建都会改变输出目录的mtime
+manifest = None
+manifest_lock = threading.Lock()
+
 # 主页模板
 HOME_TEMPLATE = """
 <!DOCTYPE html>
@@ -131,51 +358,17 @@ HOME_TEMPLATE = """
         </div>
         
         <div class="charts-grid">
+            {% for card in cards %}
             <div class="chart-card">
-                <div class="chart-icon">🎯</div>
-                <h3 class="chart-title">
-                    Interactive Version
-                </h3>
-                <span class="interactive-badge english">Chinese</span>
-                <p class="chart-description">
-                    Includes sidebar checkbox functionality to track completed capabilities with progress saving. Best for practical use.
-                </p>
-                <a href="/interactive" class="chart-button">View Interactive Version</a>
-            </div>
-            
-            <div class="chart-card">
-                <div class="chart-icon">🌟</div>
-                <h3 class="chart-title">Ultra Clean Layout Version</h3>
-                <span class="interactive-badge english">Chinese</span>
-                <p class="chart-description">
-                    Uses layered display strategy with the clearest information layout, includes draggable reference lines, suitable for presentation and analysis.
-                </p>
-                <a href="/ultra" class="chart-button">View Ultra Clean Version</a>
-            </div>
-            
-            <div class="chart-card">
-                <div class="chart-icon">🔍</div>
-                <h3 class="chart-title">
-                    Interactive Version
-                </h3>
-                <span class="interactive-badge english">English</span>
+                <div class="chart-icon">{{ card.icon }}</div>
+                <h3 class="chart-title">{{ card.title }}</h3>
+                <span class="interactive-badge english">{{ card.language }}</span>
                 <p class="chart-description">
-                    English interactive chart with sidebar checkbox functionality, suitable for international display and use.
+                    {{ card.description }}
                 </p>
-                <a href="/interactive_en" class="chart-button">View Interactive (EN)</a>
-            </div>
-            
-            <div class="chart-card">
-                <div class="chart-icon">👁️</div>
-                <h3 class="chart-title">
-                    Ultra Clean Layout Version
-                </h3>
-                <span class="interactive-badge english">English</span>
-                <p class="chart-description">
-                    English ultra clean layout chart with layered display strategy, suitable for international presentation and analysis.
-                </p>
-                <a href="/ultra_en" class="chart-button">View Ultra Clean (EN)</a>
+                <a href="{{ card.url }}" class="chart-button">{{ card.button }}</a>
             </div>
+            {% endfor %}
         </div>
         
         <div class="footer">
@@ -188,62 +381,649 @@ HOME_TEMPLATE = """
 </html>
 """
 
+def send_precompressed(file_path, mimetype=None, **kwargs):
+    """Send a file, preferring a precompressed sibling the client accepts
+
+    The .br/.gz siblings are written at build time, so no CPU is spent
+    compressing per request. A sibling older than the file itself is ignored.
+    """
+    mimetype = mimetype or mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+    source_mtime = file_path.stat().st_mtime
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+        compressed_path = file_path.with_name(file_path.name + suffix)
+        if (request.accept_encodings[encoding] > 0
+                and compressed_path.exists()
+                and compressed_path.stat().st_mtime >= source_mtime):
+            response = send_file(compressed_path, mimetype=mimetype, **kwargs)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_file(file_path, mimetype=mimetype, **kwargs)
+    # 同一URL的响应体随Accept-Encoding变化，缓存必须区分
+    response.vary.add('Accept-Encoding')
+    # send_file(conditional=True) 支持Range请求
+    response.accept_ranges = 'bytes'
+    return response
+
+def artifact_state(file_path):
+    """(mtime_ns, size) of a file and of each of its precompressed siblings (None where missing)"""
+    state = []
+    for path in [file_path] + [file_path.with_name(file_path.name + suffix) for _, suffix in PRECOMPRESSED_SUFFIXES]:
+        try:
+            stat = path.stat()
+        except OSError:
+            state.append(None)
+        else:
+            state.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(state)
+
+def load_artifact(file_path):
+    """Cached bodies, ETags and modification time of a file and its fresh precompressed siblings
+
+    Returns None if the file does not exist or is too large to be held in memory.
+    The entry is reloaded whenever the file or one of its siblings changes.
+    """
+    state = artifact_state(file_path)
+    if state[0] is None or state[0][1] > ARTIFACT_CACHE_MAX_FILE_SIZE:
+        return None
+    cached = artifact_cache.get(file_path)
+    if cached is not None and cached['state'] == state:
+        return cached
+
+    try:
+        body = file_path.read_bytes()
+    except OSError:
+        return None
+    digest = hashlib.sha256(body).hexdigest()
+    # 同一内容的不同编码是不同的字节，强ETag必须各不相同
+    bodies = {'identity': (body, digest)}
+    for (encoding, suffix), sibling_state in zip(PRECOMPRESSED_SUFFIXES, state[1:]):
+        # 比源文件旧的兄弟文件已过期，忽略
+        if sibling_state is not None and sibling_state[0] >= state[0][0]:
+            try:
+                bodies[encoding] = (file_path.with_name(file_path.name + suffix).read_bytes(), f'{digest}-{encoding}')
+            except OSError:
+                pass
+    cached = {
+        'state': state,
+        'bodies': bodies,
+        'last_modified': state[0][0] / 1e9,
+        'mimetype': mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream',
+    }
+    with artifact_cache_lock:
+        artifact_cache[file_path] = cached
+    return cached
+
+def send_offloaded(file_path, mimetype=None, cache_control='no-cache'):
+    """Hand a file over to the reverse proxy (SERVER_SENDFILE), which sends it with sendfile()"""
+    if SENDFILE == 'x-sendfile':
+        # USE_X_SENDFILE：send_file只设置X-Sendfile头（预压缩文件的绝对路径），不打开文件
+        response = send_precompressed(file_path.resolve(), mimetype=mimetype)
+    else:
+        # nginx自行选择预压缩文件（gzip_static / brotli_static），并处理Range和条件请求
+        response = app.response_class(mimetype=mimetype or mimetypes.guess_type(file_path.name)[0])
+        response.headers['X-Accel-Redirect'] = X_ACCEL_PREFIX + file_path.relative_to(outpt_dir).as_posix()
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def send_artifact(file_path, mimetype=None, cache_control='no-cache'):
+    """Send a file from the in-memory artifact cache, answering conditional and Range requests
+
+    Picks the best precompressed encoding the client accepts. Files too large
+    for the cache are streamed by send_file(), through the server's sendfile()
+    support where available; with SERVER_SENDFILE every file is sent by the
+    reverse proxy. Returns None if the file does not exist.
+    """
+    if SENDFILE:
+        return send_offloaded(file_path, mimetype, cache_control) if file_path.exists() else None
+    entry = load_artifact(file_path)
+    if entry is None:
+        # 文件不存在，或太大而不缓存
+        return send_precompressed(file_path, mimetype=mimetype) if file_path.exists() else None
+    return send_entry(entry, mimetype, cache_control)
+
+def send_entry(entry, mimetype=None, cache_control='no-cache'):
+    """Send a cached entry (see load_artifact) in the best encoding the client accepts
+
+    Answers If-None-Match / If-Modified-Since with 304 and byte-range requests
+    (resumed downloads) with 206, on the bytes of the chosen encoding.
+    """
+    for encoding, _ in PRECOMPRESSED_SUFFIXES:
+        if encoding in entry['bodies'] and request.accept_encodings[encoding] > 0:
+            break
+    else:
+        encoding = 'identity'
+    body, etag = entry['bodies'][encoding]
+    response = app.response_class(body, mimetype=mimetype or entry['mimetype'])
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.last_modified = entry['last_modified']
+    response.headers['Cache-Control'] = cache_control
+    response.accept_ranges = 'bytes'
+    # If-None-Match / If-Modified-Since 匹配时返回304，不发送内容；Range请求返回206和对应的字节区间
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(body))
+
+def send_page(file_path):
+    """Send a generated chart page; with live reload, inject the client that reloads it when it is rebuilt
+
+    Returns None if the page does not exist.
+    """
+    if not LIVE_RELOAD:
+        return send_artifact(file_path)
+    try:
+        html = file_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return None
+    snippet = f'<script src="/live-reload.js" data-file="{file_path.name}"></script>'
+    position = html.rfind('</body>')
+    html = html[:position] + snippet + html[position:] if position != -1 else html + snippet
+    response = app.response_class(html, mimetype='text/html')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def live_reload_paths():
+    """Files whose changes are pushed to the open pages: the generated pages and the models"""
+    models = [importlib.import_module(module).DATA_FILE for module in FIGURE_LOCALES.values()]
+    return [str(path) for path in outpt_dir.glob('*.html')] + [os.path.abspath(path) for path in models]
+
+def publish(event, payload):
+    """Send a Server-Sent Event to every connected page"""
+    message = f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+    with live_reload_lock:
+        for client in live_reload_clients:
+            client.put(message)
+
+def live_reload_watch():
+    """Background thread: publish 'reload' when a page is rewritten and 'figure' when a model changes"""
+    from watch import watch
+    models = {
+        os.path.abspath(importlib.import_module(module).DATA_FILE): locale
+        for locale, module in FIGURE_LOCALES.items()
+    }
+
+    def on_change(changed):
+        files = sorted(Path(path).name for path in changed if path.endswith('.html'))
+        locales = sorted(models[path] for path in changed if path in models)
+        if files:
+            publish('reload', {'files': files})
+        if locales:
+            publish('figure', {'locales': locales})
+
+    watch(live_reload_paths, on_change, interval=LIVE_RELOAD_INTERVAL, delay=LIVE_RELOAD_DELAY)
+
+def start_live_reload():
+    """Start the file watcher thread on the first live reload connection"""
+    global live_reload_thread
+    with live_reload_lock:
+        if live_reload_thread is None:
+            live_reload_thread = threading.Thread(target=live_reload_watch, name='live-reload', daemon=True)
+            live_reload_thread.start()
+
+def figure_module(locale, version):
+    """Generator module of a locale, or 404 if the locale or version is unknown"""
+    if locale not in FIGURE_LOCALES or version not in FIGURE_VERSIONS:
+        abort(404)
+    module = importlib.import_module(FIGURE_LOCALES[locale])
+    if version not in module.VERSIONS:
+        abort(404)
+    return module
+
+def load_model(locale):
+    """Loaded model of a locale and the state of its file, reloaded only when the model file changes"""
+    module = importlib.import_module(FIGURE_LOCALES[locale])
+    stat = os.stat(module.DATA_FILE)
+    model_state = (stat.st_mtime_ns, stat.st_size)
+    with model_cache_lock:
+        cached = model_cache.get(locale)
+        if cached is None or cached[0] != model_state:
+            cached = (model_state, module.load_maturity_data(module.DATA_FILE))
+            model_cache[locale] = cached
+    return cached[1], model_state
+
+def figure_entry(locale, version):
+    """(model state, figure JSON, strong ETag, plotly.js asset) of a version, rebuilt only when the model file changes"""
+    from plotly_assets import figure_trace_types
+    module = figure_module(locale, version)
+    data, model_state = load_model(locale)
+    with figure_cache_lock:
+        cached = figure_cache.get((locale, version))
+        if cached is None or cached[0] != model_state:
+            fig = module.VERSIONS[version]['builder'](data)
+            body = fig.to_json().encode('utf-8')
+            cached = (model_state, body, hashlib.sha256(body).hexdigest(), plotlyjs_asset(figure_trace_types(fig)))
+            figure_cache[(locale, version)] = cached
+    return cached
+
+def figure_json(locale, version):
+    """Figure JSON of a version and its strong ETag"""
+    _, body, etag, _ = figure_entry(locale, version)
+    return body, etag
+
+def prepare_plotlyjs():
+    """Write every available plotly.js bundle and its precompressed siblings into the output directory
+
+    Called once at startup, so that no request thread ever compresses a multi-megabyte bundle.
+    """
+    from plotly_assets import ensure_all_plotlyjs
+    ensure_all_plotlyjs(str(outpt_dir))
+
+def plotlyjs_asset(trace_types):
+    """File name of the plotly.js bundle covering the trace types, resolved once per process"""
+    key = frozenset(trace_types)
+    filename = plotlyjs_assets.get(key)
+    if filename is None or not (outpt_dir / filename).exists():
+        from plotly_assets import ensure_plotlyjs
+        with plotlyjs_assets_lock:
+            filename = ensure_plotlyjs(str(outpt_dir), key)
+            plotlyjs_assets[key] = filename
+    return filename
+
+def render_options(args):
+    """Render options from query arguments, with defaults for the missing ones; 400 for an invalid value"""
+    options = {}
+    for name, choices in RENDER_OPTIONS.items():
+        value = args.get(name, choices[0])
+        if value not in choices:
+            abort(400, f"Invalid {name}: {value} (expected one of {', '.join(choices)})")
+        options[name] = value
+    return tuple(sorted(options.items()))
+
+def render_artifact(locale, version, options):
+    """Render a version's page from the current model, through the LRU render cache
+
+    The cache key includes the model's content hash, so the first request after
+    a model change renders the new page and the stale renders age out of the cache.
+
+    Returns:
+        tuple: (cache entry in the load_artifact format, whether it was a cache hit)
+    """
+    if locale not in FIGURE_LOCALES:
+        abort(404)
+    module = importlib.import_module(FIGURE_LOCALES[locale])
+    if version not in module.VERSIONS:
+        abort(404)
+    data, model_state = load_model(locale)
+
+    def render():
+        from plotly_assets import figure_trace_types
+        from precompress import compress
+        fig = module.VERSIONS[version]['builder'](data)
+        if dict(options)['plotlyjs'] == 'cdn':
+            from plotly.offline import get_plotlyjs_version
+            plotlyjs_src = f'https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js'
+        else:
+            # 绝对路径：页面位于 /render/<locale>/ 下
+            plotlyjs_src = '/' + plotlyjs_asset(figure_trace_types(fig))
+        body = module.render_page(version, fig, data, plotlyjs_src).encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        # 只做gzip压缩：最高质量的brotli比渲染本身还慢
+        compressed = compress(body, 'gzip')
+        entry = {
+            'bodies': {'identity': (body, digest), 'gzip': (compressed, f'{digest}-gzip')},
+            'last_modified': model_state[0] / 1e9,
+            'mimetype': 'text/html',
+        }
+        return entry, len(body) + len(compressed)
+
+    return render_cache.get_or_render((data.source_sha256, locale, version, options), render)
+
+def send_render(locale, version, options):
+    """Send a page rendered on demand, revalidated via ETag"""
+    entry, hit = render_artifact(locale, version, options)
+    response = send_entry(entry)
+    response.headers['X-Render-Cache'] = 'hit' if hit else 'miss'
+    return response
+
+def preload_artifacts():
+    """Write the plotly.js bundles, then load the output manifest and every generated page, bundle and figure JSON into the in-memory caches
+
+    Called before the production workers are forked, so that each of them starts with warm caches.
+
+    Returns:
+        int: Number of artifacts loaded
+    """
+    prepare_plotlyjs()
+    output_manifest()
+    count = 0
+    if outpt_dir.exists():
+        for file_path in sorted(outpt_dir.glob('*.html')) + sorted(outpt_dir.glob('plotly-*.min.js')):
+            if load_artifact(file_path) is not None:
+                count += 1
+    for locale, module_name in FIGURE_LOCALES.items():
+        module = importlib.import_module(module_name)
+        for version in FIGURE_VERSIONS:
+            if version in module.VERSIONS:
+                figure_json(locale, version)
+                count += 1
+    return count
+
+def manifest_state():
+    """(mtime_ns of the output directory, state of the build cache index), or None without an output directory"""
+    try:
+        stat = outpt_dir.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, file_state(outpt_dir / INDEX_FILENAME)
+
+def build_manifest():
+    """Name, size, hash, locale, version and build time of every page in the output directory"""
+    filenames = {}
+    for locale, module_name in FIGURE_LOCALES.items():
+        for version, spec in importlib.import_module(module_name).VERSIONS.items():
+            filenames[spec['filename']] = (locale, version)
+    built_at = {name: entry.get('built_at') for name, entry in BuildCache(str(outpt_dir)).entries.items()}
+
+    artifacts = []
+    for file_path in sorted(outpt_dir.glob('*.html')):
+        try:
+            stat = file_path.stat()
+            digest = file_sha256(file_path)
+        except OSError:
+            # 扫描期间被删除
+            continue
+        locale, version = filenames.get(file_path.name, (None, None))
+        artifacts.append({
+            'name': file_path.name,
+            'bytes': stat.st_size,
+            'size': f"{stat.st_size / 1024 / 1024:.1f}MB",
+            'sha256': digest,
+            'locale': locale,
+            'version': version,
+            'built_at': built_at.get(file_path.name) or time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(stat.st_mtime)),
+        })
+    return artifacts
+
+def home_cards(artifacts):
+    """Cards of the home page: the routed pages (rendered on demand if needed) and every other built chart"""
+    pages = list(PAGE_ROUTES)
+    pages += sorted({(a['locale'], a['version']) for a in artifacts if a['locale']} - set(pages),
+                    key=lambda page: (list(HOME_CARDS).index(page) if page in HOME_CARDS else len(HOME_CARDS), page))
+    cards = []
+    for locale, version in pages:
+        card = HOME_CARDS.get((locale, version))
+        if card is None:
+            module = importlib.import_module(FIGURE_LOCALES[locale])
+            card = {
+                'icon': '📈',
+                'title': module.VERSIONS[version]['label'],
+                'description': module.VERSIONS[version]['filename'],
+                'button': 'View Chart',
+            }
+        cards.append(dict(
+            card,
+            language=LOCALE_NAMES.get(locale, locale),
+            url=PAGE_ROUTES.get((locale, version), f'/chart/{locale}/{version}'),
+        ))
+    return cards
+
+def output_manifest():
+    """Cached manifest of the output directory, with the /list body and the pre-rendered home page
+
+    Rebuilt only when the output directory changes, so serving either costs one stat().
+    """
+    global manifest
+    state = manifest_state()
+    cached = manifest
+    if cached is not None and cached['state'] == state:
+        return cached
+    with manifest_lock:
+        cached = manifest
+        if cached is not None and cached['state'] == state:
+            return cached
+        artifacts = build_manifest() if state is not None else []
+        listing = json.dumps({
+            'files': artifacts,
+            'total': len(artifacts),
+        }, ensure_ascii=False).encode('utf-8')
+        with app.app_context():
+            home = render_template_string(HOME_TEMPLATE, cards=home_cards(artifacts)).encode('utf-8')
+        cached = {
+            'state': state,
+            'artifacts': artifacts,
+            'list': (listing, hashlib.sha256(listing).hexdigest()),
+            'home': (home, hashlib.sha256(home).hexdigest()),
+        }
+        manifest = cached
+    return cached
+
+def check_assessment_id(assessment_id):
+    """400 unless the assessment ID matches ASSESSMENT_ID_PATTERN"""
+    if not ASSESSMENT_ID_PATTERN.fullmatch(assessment_id):
+        abort(400, f'Invalid assessment ID: {assessment_id}')
+
+def etag_response(body, etag, mimetype, cache_control):
+    """Response with a strong ETag that answers matching conditional GETs with 304"""
+    response = app.response_class(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
 @app.route('/')
 def home():
     """Home page - Display all available charts"""
-    return render_template_string(HOME_TEMPLATE)
+    body, etag = output_manifest()['home']
+    return etag_response(body, etag, 'text/html', 'no-cache')
 
 @app.route('/interactive')
 def interactive():
     """Interactive version - with checkbox functionality"""
-    file_path = outpt_dir / 'ai_sd_maturity_interactive.html'
-    if file_path.exists():
-        return send_file(file_path)
-    else:
-        return "File not found", 404
+    response = send_page(outpt_dir / 'ai_sd_maturity_interactive.html')
+    if response is None:
+        # 尚未构建时按需渲染
+        response = send_render('zh', 'interactive', render_options({}))
+    return response
 
 @app.route('/ultra')
 def ultra():
     """Ultra clean layout version"""
-    file_path = outpt_dir / 'ai_sd_maturity_overview_ultra.html'
-    if file_path.exists():
-        return send_file(file_path)
-    else:
-        return "File not found", 404
+    response = send_page(outpt_dir / 'ai_sd_maturity_overview_ultra.html')
+    if response is None:
+        # 尚未构建时按需渲染
+        response = send_render('zh', 'ultra', render_options({}))
+    return response
 
 @app.route('/interactive_en')
 def interactive_en():
     """Interactive version (English) - with checkbox functionality"""
-    file_path = outpt_dir / 'ai_sd_maturity_interactive_en.html'
-    if file_path.exists():
-        return send_file(file_path)
-    else:
-        return "File not found", 404
+    response = send_page(outpt_dir / 'ai_sd_maturity_interactive_en.html')
+    if response is None:
+        # 尚未构建时按需渲染
+        response = send_render('en', 'interactive', render_options({}))
+    return response
 
 @app.route('/ultra_en')
 def ultra_en():
     """Ultra clean layout version (English)"""
-    file_path = outpt_dir / 'ai_sd_maturity_ultra_en.html'
-    if file_path.exists():
-        return send_file(file_path)
-    else:
+    response = send_page(outpt_dir / 'ai_sd_maturity_ultra_en.html')
+    if response is None:
+        # 尚未构建时按需渲染
+        response = send_render('en', 'ultra', render_options({}))
+    return response
+
+@app.route('/chart/<locale>/<version>')
+def chart(locale, version):
+    """Any built chart page, rendered on demand if it has not been built"""
+    module = importlib.import_module(FIGURE_LOCALES[locale]) if locale in FIGURE_LOCALES else None
+    if module is None or version not in module.VERSIONS:
+        abort(404)
+    response = send_page(outpt_dir / module.VERSIONS[version]['filename'])
+    if response is None:
+        response = send_render(locale, version, render_options({}))
+    return response
+
+@app.route('/plotly-<fingerprint>.min.js')
+def plotly_asset(fingerprint):
+    """Shared, content-fingerprinted plotly.js bundle (full or basic partial) referenced by the charts"""
+    file_path = outpt_dir / f'plotly-{fingerprint}.min.js'
+    digest = fingerprint[len('basic-'):] if fingerprint.startswith('basic-') else fingerprint
+    if not digest or not all(c in '0123456789abcdef' for c in digest):
+        return "File not found", 404
+    # 文件名随内容变化，浏览器可以永久缓存
+    response = send_artifact(file_path, mimetype='application/javascript',
+                             cache_control=f'public, max-age={PLOTLYJS_MAX_AGE}, immutable')
+    if response is None:
         return "File not found", 404
+    return response
+
+@app.route('/chart/<locale>/plotly-<fingerprint>.min.js')
+def chart_plotly_asset(locale, fingerprint):
+    """Shared plotly.js bundle, requested relative to a /chart/<locale>/<version> page"""
+    # 构建出的页面用相对路径引用plotly.js（以便直接从磁盘打开），经 /chart/<locale>/ 访问时解析到这里
+    if locale not in FIGURE_LOCALES:
+        abort(404)
+    return plotly_asset(fingerprint)
+
+@app.route('/render/<locale>/<version>')
+def render_version(locale, version):
+    """Any version rendered on demand from the current model, cached in memory by model hash and options"""
+    return send_render(locale, version, render_options(request.args))
+
+@app.route('/api/figure/<locale>/<version>')
+def figure_api(locale, version):
+    """Plotly figure JSON of the ultra/interactive version, revalidated via ETag"""
+    body, etag = figure_json(locale, version)
+    return etag_response(body, etag, 'application/json', 'no-cache')
+
+@app.route('/figure/<locale>/<version>')
+def figure_shell(locale, version):
+    """Thin HTML shell that renders /api/figure/<locale>/<version> with Plotly.react"""
+    module = figure_module(locale, version)
+    # 按图表实际使用的trace类型选择bundle，与构建出的页面一致
+    _, _, _, plotlyjs = figure_entry(locale, version)
+    html = render_template_string(
+        FIGURE_SHELL_TEMPLATE,
+        lang='zh-CN' if locale == 'zh' else 'en',
+        locale=locale,
+        version=version,
+        plotlyjs=plotlyjs,
+        config=module.VERSIONS[version]['config'],
+        live_reload=LIVE_RELOAD,
+    ).encode('utf-8')
+    return etag_response(html, hashlib.sha256(html).hexdigest(), 'text/html',
+                         f'public, max-age={FIGURE_SHELL_MAX_AGE}')
+
+@app.route('/events')
+def live_reload_events():
+    """Server-Sent Events stream of the live reload (SERVER_LIVE_RELOAD=1 only)"""
+    if not LIVE_RELOAD:
+        abort(404)
+    start_live_reload()
+    client = queue.Queue()
+    with live_reload_lock:
+        live_reload_clients.add(client)
+
+    def stream():
+        try:
+            # 断线后浏览器在1秒后自动重连
+            yield 'retry: 1000\n\n'
+            while True:
+                try:
+                    yield client.get(timeout=LIVE_RELOAD_HEARTBEAT)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            with live_reload_lock:
+                live_reload_clients.discard(client)
+
+    response = app.response_class(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # 禁止反向代理缓冲事件流
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/live-reload.js')
+def live_reload_script():
+    """Client of the live reload event stream"""
+    if not LIVE_RELOAD:
+        abort(404)
+    response = app.response_class(LIVE_RELOAD_SCRIPT, mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/progress/<assessment_id>', methods=['GET'])
+def get_progress(assessment_id):
+    """Completed capabilities of an assessment; with ?since=<revision>, only the capabilities changed after it"""
+    check_assessment_id(assessment_id)
+    since = request.args.get('since')
+    if since is None:
+        revision, completed = progress_store.completed(assessment_id)
+        payload = {'assessment': assessment_id, 'revision': revision, 'completed': completed}
+    else:
+        if not since.isdigit():
+            abort(400, f'Invalid revision: {since}')
+        revision, changes = progress_store.changes(assessment_id, int(since))
+        # 客户端的修订号比服务器的还新（例如数据库被重置过），增量无从计算，客户端需重新加载完整状态
+        if int(since) > revision:
+            abort(400, f'Stale revision {since}, the assessment is at revision {revision}')
+        payload = {'assessment': assessment_id, 'revision': revision, 'changes': changes}
+    response = app.response_class(json.dumps(payload, ensure_ascii=False), mimetype='application/json')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/api/progress/<assessment_id>', methods=['POST'])
+def update_progress(assessment_id):
+    """Apply a batch of toggles: {"operations": [{"id": <capability ID>, "done": true/false}, ...]}"""
+    check_assessment_id(assessment_id)
+    if (request.content_length or 0) > PROGRESS_MAX_BODY:
+        abort(413)
+    payload = request.get_json(silent=True)
+    operations = payload.get('operations') if isinstance(payload, dict) else None
+    if not isinstance(operations, list):
+        abort(400, 'Expected a JSON object with an "operations" list')
+    if len(operations) > PROGRESS_MAX_OPERATIONS:
+        abort(413, f'At most {PROGRESS_MAX_OPERATIONS} operations per batch')
+    # 同一批中多次勾选的能力只保留最后的状态
+    toggles = {}
+    for operation in operations:
+        capability_id = operation.get('id') if isinstance(operation, dict) else None
+        done = operation.get('done') if isinstance(operation, dict) else None
+        if not isinstance(capability_id, str) or not 0 < len(capability_id) <= CAPABILITY_ID_MAX_LENGTH \
+                or not isinstance(done, bool):
+            abort(400, f'Invalid operation: {operation!r}')
+        toggles[capability_id] = done
+    try:
+        revision = progress_store.apply(assessment_id, toggles) if toggles else progress_store.revision(assessment_id)
+    except sqlite3.OperationalError:
+        # 等待其他写入者超时（数据库被锁定）
+        abort(503)
+    response = app.response_class(
+        json.dumps({'assessment': assessment_id, 'revision': revision, 'applied': len(toggles)}),
+        mimetype='application/json',
+    )
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/api/stats/<locale>')
+def assessment_stats_api(locale):
+    """Completion statistics of the stored assessments of a locale's model (?prefix= selects e.g. one team)"""
+    if locale not in FIGURE_LOCALES:
+        abort(404)
+    prefix = request.args.get('prefix', '')
+    if prefix:
+        check_assessment_id(prefix)
+    data, _ = load_model(locale)
+
+    def render():
+        import assessment_stats
+        rows = assessment_stats.capability_rows(data)
+        matrix, _, ignored = assessment_stats.store_matrix(rows, progress_store, prefix)
+        stats = {'locale': locale, 'prefix': prefix, 'ignored_ids': ignored}
+        stats.update(assessment_stats.to_json(assessment_stats.aggregate(data, rows, matrix)))
+        body = json.dumps(stats, ensure_ascii=False).encode('utf-8')
+        return (body, hashlib.sha256(body).hexdigest()), len(body)
+
+    # 缓存键包含进度状态（评估数与修订号之和），任何一批勾选变化后重新聚合
+    key = (data.source_sha256, locale, prefix, progress_store.state(prefix))
+    (body, etag), _ = stats_cache.get_or_render(key, render)
+    return etag_response(body, etag, 'application/json', 'no-cache')
 
 @app.route('/list')
 def list_files():
     """List all available files"""
-    files = []
-    if outpt_dir.exists():
-        for file in outpt_dir.glob('*.html'):
-            files.append({
-                'name': file.name,
-                'size': f"{file.stat().st_size / 1024 / 1024:.1f}MB"
-            })
-    
-    return {
-        'files': files,
-        'total': len(files)
-    }
+    body, etag = output_manifest()['list']
+    return etag_response(body, etag, 'application/json', 'no-cache')
 
 if __name__ == '__main__':
     print("🚀 Starting AI Maturity Model Visualization Server...")
@@ -255,7 +1035,16 @@ if __name__ == '__main__':
     print("   - /ultra         Ultra clean layout version (Chinese)")
     print("   - /interactive_en Interactive version (English)")
     print("   - /ultra_en      Ultra clean layout version (English)")
+    print("   - /figure/<locale>/<version>     Chart shell loading the figure JSON (ultra/interactive, zh/en)")
+    print("   - /api/figure/<locale>/<version> Figure JSON API with ETag")
+    print("   - /render/<locale>/<version>     Any version rendered on demand (LRU cache by model hash)")
+    print("   - /chart/<locale>/<version>      Any built chart (rendered on demand if not built)")
     print("   - /list          File list API")
+    print("   - /api/progress/<assessment>   Assessment progress API (GET, POST batched toggles)")
+    print("   - /api/stats/<locale>            Completion statistics of the stored assessments (?prefix=)")
+    if LIVE_RELOAD:
+        print("   - /events        Live reload event stream (SERVER_LIVE_RELOAD=1)")
     print("=" * 50)
     
-    app.run(debug=True, host='0.0.0.0', port=8023) 
\ No newline at end of file
+    prepare_plotlyjs()
+    app.run(debug=True, host='0.0.0.0', port=8023, use_reloader=USE_RELOADER) 
\ No newline at end of file
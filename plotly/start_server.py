@@ -1,12 +1,28 @@
 #!/usr/bin/env python3
 """
 AI成熟度模型可视化服务器启动脚本
+
+默认以Flask开发服务器启动；--production 使用多进程、多线程的WSGI服务器
+（安装了gunicorn时为gunicorn gthread工作进程，否则为单进程多线程的werkzeug服务器）；
+--asgi 使用基于asyncio的uvicorn服务器（asgi_app.py），适合大量浏览器同时连接的场景。
 """
 
+import argparse
+import os
+import signal
 import subprocess
 import sys
+import threading
 from pathlib import Path
 
+# 生产模式的默认配置，可通过环境变量或命令行参数覆盖
+DEFAULT_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:5000')
+DEFAULT_WORKERS = int(os.environ.get('SERVER_WORKERS', os.cpu_count() or 1))
+DEFAULT_THREADS = int(os.environ.get('SERVER_THREADS', 8))
+DEFAULT_CONCURRENCY = int(os.environ.get('SERVER_ASGI_CONCURRENCY', 256))
+
+# 收到SIGTERM/SIGINT后，等待进行中的请求完成的最长时间（秒）
+GRACEFUL_TIMEOUT = 30
 
 def check_dependencies():
     """检查并安装依赖"""
@@ -32,7 +48,106 @@ def check_dependencies():
             print("请手动安装依赖：pip install flask")
             return False
 
-def main():
+def parse_bind(bind):
+    """Split HOST:PORT"""
+    host, _, port = bind.rpartition(':')
+    return host or '0.0.0.0', int(port)
+
+def run_gunicorn(app, bind, workers, threads):
+    """Serve app with gunicorn gthread workers
+
+    The app (and its caches, warmed by preload_artifacts() before this call) is
+    loaded once in the master process and shared with the forked workers.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    ProductionApplication(app, {
+        'bind': bind,
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': threads,
+        'preload_app': True,
+        'graceful_timeout': GRACEFUL_TIMEOUT,
+        'keepalive': 5,
+    }).run()
+
+def run_threaded(app, bind):
+    """Serve app with werkzeug's multi-threaded WSGI server in this process (no gunicorn, e.g. on Windows)"""
+    from werkzeug.serving import make_server
+
+    host, port = parse_bind(bind)
+    server = make_server(host, port, app, threaded=True)
+
+    def stop(signum, frame):
+        # shutdown()会等待serve_forever()退出，不能在其所在线程中直接调用
+        print("\n正在停止服务器，等待进行中的请求完成...")
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print("   每个请求一个线程；按 Ctrl+C 或发送 SIGTERM 平滑停止服务器")
+    print("=" * 40)
+    server.serve_forever()
+    server.server_close()
+
+def run_production(bind, workers, threads):
+    """生产模式：预加载全部产物后启动多进程、多线程的WSGI服务器"""
+    from server import app, preload_artifacts
+
+    count = preload_artifacts()
+    print(f"✅ 已预加载 {count} 个产物到内存缓存")
+    print(f"\n🌐 生产模式启动服务器: http://{bind}")
+    try:
+        import gunicorn
+    except ImportError:
+        print("⚠️  未安装 gunicorn（pip install gunicorn），使用单进程多线程的werkzeug服务器")
+        run_threaded(app, bind)
+        return
+    print(f"   gunicorn gthread: {workers} 个工作进程 × {threads} 个线程")
+    print("   按 Ctrl+C 或发送 SIGTERM 平滑停止服务器")
+    print("=" * 40)
+    run_gunicorn(app, bind, workers, threads)
+
+def run_asgi(bind, workers, concurrency):
+    """ASGI模式：uvicorn的asyncio事件循环接收连接，每个工作进程启动时预加载产物"""
+    try:
+        import a2wsgi
+        import uvicorn
+    except ImportError:
+        print("❌ ASGI模式需要 uvicorn 和 a2wsgi，请先安装：pip install uvicorn a2wsgi")
+        sys.exit(1)
+    host, port = parse_bind(bind)
+    # 工作进程重新导入asgi_app，并发上限通过环境变量传递
+    os.environ['SERVER_ASGI_CONCURRENCY'] = str(concurrency)
+    print(f"\n🌐 ASGI模式启动服务器: http://{bind}")
+    print(f"   uvicorn: {workers} 个工作进程，每个进程最多同时处理 {concurrency} 个请求")
+    print("   按 Ctrl+C 或发送 SIGTERM 平滑停止服务器")
+    print("=" * 40)
+    uvicorn.run(
+        'asgi_app:app',
+        host=host,
+        port=port,
+        workers=workers,
+        app_dir=str(Path(__file__).parent),
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        log_level='warning',
+    )
+
+def main(production=False, bind=DEFAULT_BIND, workers=DEFAULT_WORKERS, threads=DEFAULT_THREADS,
+         asgi=False, concurrency=DEFAULT_CONCURRENCY):
     """主函数"""
     print("🚀 AI成熟度模型可视化服务器")
     print("=" * 40)
@@ -42,36 +157,38 @@ def main():
         print("\n❌ 依赖检查失败，无法启动服务器")
         sys.exit(1)
     
-    # 检查文件是否存在
+    # 检查预先构建的文件；未构建的页面会在首次请求时按需渲染，因此只提示不退出
     current_dir = Path(__file__).parent
-    outpt_dir = current_dir / 'outpt'
+    outpt_dir = current_dir / 'output'
     
-    if not outpt_dir.exists():
-        print(f"❌ 输出目录不存在: {outpt_dir}")
-        print("请先运行 ai_maturity_fishbone_plotly.py 生成图表文件")
-        sys.exit(1)
-    
-    # 检查HTML文件
-    html_files = list(outpt_dir.glob('*.html'))
+    html_files = list(outpt_dir.glob('*.html')) if outpt_dir.exists() else []
     if not html_files:
-        print(f"❌ 在 {outpt_dir} 中没有找到HTML文件")
-        print("请先运行 ai_maturity_fishbone_plotly.py 生成图表文件")
-        sys.exit(1)
-    
-    print(f"✅ 找到 {len(html_files)} 个HTML文件")
-    for file in html_files:
-        size_mb = file.stat().st_size / 1024 / 1024
-        print(f"   - {file.name} ({size_mb:.1f}MB)")
+        print(f"⚠️  在 {outpt_dir} 中没有找到预先构建的HTML文件，页面将在首次请求时按需渲染")
+        print("   如需预先构建，请运行 script/build_all.py")
+    else:
+        print(f"✅ 找到 {len(html_files)} 个HTML文件")
+        for file in html_files:
+            size_mb = file.stat().st_size / 1024 / 1024
+            print(f"   - {file.name} ({size_mb:.1f}MB)")
     
+    if production:
+        run_production(bind, workers, threads)
+        return
+    if asgi:
+        run_asgi(bind, workers, concurrency)
+        return
+
+    host, port = parse_bind(bind)
     print("\n🌐 启动服务器...")
-    print("   访问地址: http://localhost:5000")
+    print(f"   访问地址: http://localhost:{port}")
     print("   按 Ctrl+C 停止服务器")
     print("=" * 40)
     
     # 启动服务器
     try:
-        from server import app
-        app.run(debug=True, host='0.0.0.0', port=5000)
+        from server import USE_RELOADER, app, prepare_plotlyjs
+        prepare_plotlyjs()
+        app.run(debug=True, host=host, port=port, use_reloader=USE_RELOADER)
     except KeyboardInterrupt:
         print("\n👋 服务器已停止")
     except Exception as e:
@@ -79,4 +196,41 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='启动AI成熟度模型可视化服务器')
+    parser.add_argument(
+        '--production',
+        action='store_true',
+        help='生产模式：多进程、多线程WSGI服务器（需要gunicorn），预加载产物，平滑停止，不开启调试器'
+    )
+    parser.add_argument(
+        '--asgi',
+        action='store_true',
+        help='ASGI模式：基于asyncio的uvicorn服务器（需要uvicorn和a2wsgi），有上限的并发请求数，预加载产物，平滑停止'
+    )
+    parser.add_argument(
+        '--bind', '-b',
+        default=DEFAULT_BIND,
+        help=f'监听地址 HOST:PORT（默认: {DEFAULT_BIND}，环境变量 SERVER_BIND）'
+    )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'生产模式和ASGI模式的工作进程数（默认: CPU核数 {DEFAULT_WORKERS}，环境变量 SERVER_WORKERS）'
+    )
+    parser.add_argument(
+        '--threads', '-t',
+        type=int,
+        default=DEFAULT_THREADS,
+        help=f'每个工作进程的线程数（默认: {DEFAULT_THREADS}，环境变量 SERVER_THREADS）'
+    )
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'ASGI模式下每个工作进程同时处理的请求数上限，超出的请求排队等待（默认: {DEFAULT_CONCURRENCY}，环境变量 SERVER_ASGI_CONCURRENCY）'
+    )
+
+    args = parser.parse_args()
+
+    main(args.production, args.bind, args.workers, args.threads, args.asgi, args.concurrency)
@@ -0,0 +1,219 @@
+"""
+ASGI entry point: Flask responses through a2wsgi and the native /events stream.
+
+Run from the repository root with ``python -m pytest plotly/tests``. The ASGI
+application is called directly on an asyncio event loop, the way uvicorn
+calls it, and serves a fake plotly.js bundle from a temporary output directory.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR))
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+
+# Keep the progress database out of the working tree
+os.environ.setdefault('SERVER_PROGRESS_DB', os.path.join(tempfile.mkdtemp(), 'progress.db'))
+
+import asgi_app
+import server
+
+URL = '/plotly-0123456789abcdef.min.js'
+# Larger than one file block, so a streamed body arrives in several chunks
+BODY = b'var x = 1;\n' * (asgi_app.FILE_CHUNK_SIZE // 4)
+
+def http_scope(path, method='GET', headers=()):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': b'',
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+
+class Connection:
+    """ASGI receive/send of one connection; the client hangs up after disconnect_after body messages"""
+
+    def __init__(self, disconnect_after=None):
+        self.disconnect_after = disconnect_after
+        self.disconnected = asyncio.Event()
+        self.messages = []
+        self.sent_after_disconnect = 0
+
+    async def receive(self):
+        if not self.disconnected.is_set() and not any(m['type'] == 'http.response.start' for m in self.messages):
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if self.disconnected.is_set():
+            # uvicorn drops what is sent after the client went away
+            self.sent_after_disconnect += 1
+            return
+        self.messages.append(message)
+        if self.disconnect_after is not None and len(self.body_messages()) >= self.disconnect_after:
+            self.disconnected.set()
+
+    def body_messages(self):
+        return [m for m in self.messages if m['type'] == 'http.response.body']
+
+    @property
+    def status(self):
+        return next(m['status'] for m in self.messages if m['type'] == 'http.response.start')
+
+    @property
+    def headers(self):
+        start = next(m for m in self.messages if m['type'] == 'http.response.start')
+        return {name.decode('latin-1'): value.decode('latin-1') for name, value in start['headers']}
+
+    @property
+    def body(self):
+        return b''.join(m.get('body', b'') for m in self.body_messages())
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+class FlaskThroughAsgiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output = tempfile.TemporaryDirectory()
+        self.previous_output = server.outpt_dir
+        server.outpt_dir = Path(self.output.name)
+        server.artifact_cache.clear()
+        (server.outpt_dir / URL[1:]).write_bytes(BODY)
+
+    def tearDown(self):
+        server.outpt_dir = self.previous_output
+        server.artifact_cache.clear()
+        self.output.cleanup()
+
+    def request(self, path=URL, method='GET', headers=(), disconnect_after=None):
+        async def call():
+            connection = Connection(disconnect_after)
+            await asgi_app.app(http_scope(path, method, headers), connection.receive, connection.send)
+            return connection
+        return run(call())
+
+    def test_in_memory_response(self):
+        connection = self.request()
+        self.assertEqual(connection.status, 200)
+        self.assertEqual(connection.body, BODY)
+        self.assertEqual(int(connection.headers['content-length']), len(BODY))
+        self.assertFalse(connection.body_messages()[-1].get('more_body', False))
+        # The server adds Date; the app never sends its own
+        self.assertNotIn('date', connection.headers)
+
+    def test_conditional_response_has_no_date(self):
+        etag = self.request().headers['etag']
+        connection = self.request(headers=[('If-None-Match', etag)])
+        self.assertEqual(connection.status, 304)
+        self.assertEqual(connection.body, b'')
+        self.assertNotIn('date', connection.headers)
+
+    def test_large_files_stream_in_blocks(self):
+        with mock.patch.object(server, 'ARTIFACT_CACHE_MAX_FILE_SIZE', 1024):
+            connection = self.request()
+        self.assertEqual(connection.status, 200)
+        self.assertEqual(connection.body, BODY)
+        sizes = [len(m.get('body', b'')) for m in connection.body_messages() if m.get('body')]
+        self.assertGreater(len(sizes), 1)
+        self.assertTrue(all(size <= asgi_app.FILE_CHUNK_SIZE for size in sizes))
+        self.assertEqual(sizes[0], asgi_app.FILE_CHUNK_SIZE)
+
+    def test_head(self):
+        connection = self.request(method='HEAD')
+        self.assertEqual(connection.status, 200)
+        self.assertEqual(connection.body, b'')
+        self.assertEqual(int(connection.headers['content-length']), len(BODY))
+
+    def test_not_found(self):
+        self.assertEqual(self.request('/plotly-missing.min.js').status, 404)
+
+    def test_disconnect_releases_the_request(self):
+        with mock.patch.object(server, 'ARTIFACT_CACHE_MAX_FILE_SIZE', 1024):
+            connection = self.request(disconnect_after=1)
+        self.assertEqual(len(connection.body_messages()), 1)
+        # The rest of the body is dropped, and the concurrency slot is free again
+        self.assertGreater(connection.sent_after_disconnect, 0)
+        self.assertFalse(asgi_app.semaphore.locked())
+        self.assertEqual(self.request().body, BODY)
+
+class EventStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(asgi_app, 'LIVE_RELOAD', True),
+            # No file watcher thread: the test publishes the events itself
+            mock.patch.object(asgi_app, 'start_live_reload'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def open_stream(self):
+        connection = Connection()
+        task = asyncio.ensure_future(asgi_app.app(http_scope('/events'), connection.receive, connection.send))
+        while len(connection.body_messages()) < 1:
+            await asyncio.sleep(0.01)
+        return connection, task
+
+    def test_stream_delivers_published_events(self):
+        async def call():
+            connection, task = await self.open_stream()
+            self.assertEqual(len(server.live_reload_clients), 1)
+            await asyncio.get_running_loop().run_in_executor(None, server.publish, 'reload', {'files': ['a.html']})
+            while len(connection.body_messages()) < 2:
+                await asyncio.sleep(0.01)
+            connection.disconnected.set()
+            await task
+            return connection
+
+        connection = run(call())
+        self.assertEqual(connection.status, 200)
+        self.assertEqual(connection.headers['content-type'], 'text/event-stream; charset=utf-8')
+        self.assertEqual(connection.body, b'retry: 1000\n\nevent: reload\ndata: {"files": ["a.html"]}\n\n')
+        self.assertEqual(len(server.live_reload_clients), 0)
+
+    def test_heartbeat(self):
+        async def call():
+            with mock.patch.object(asgi_app, 'LIVE_RELOAD_HEARTBEAT', 0.01):
+                connection, task = await self.open_stream()
+                while len(connection.body_messages()) < 3:
+                    await asyncio.sleep(0.01)
+            connection.disconnected.set()
+            await task
+            return connection
+
+        self.assertEqual(run(call()).body_messages()[1]['body'], b': keep-alive\n\n')
+
+    def test_cancellation_unregisters_the_client(self):
+        async def call():
+            _, task = await self.open_stream()
+            self.assertEqual(len(server.live_reload_clients), 1)
+            # uvicorn cancels open streams when the worker shuts down
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        run(call())
+        self.assertEqual(len(server.live_reload_clients), 0)
+        self.assertFalse(asgi_app.semaphore.locked())
+
+    def test_stream_takes_no_concurrency_slot(self):
+        async def call():
+            with mock.patch.object(asgi_app, 'semaphore', asyncio.Semaphore(1)):
+                async with asgi_app.semaphore:
+                    connection, task = await self.open_stream()
+            connection.disconnected.set()
+            await task
+
+        run(call())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Vectorized assessment statistics against the benchmark's plain-Python loop.
+
+Run from the repository root with ``python -m pytest plotly/tests``. The
+synthetic assessments of bench_assessment_stats are saved into a temporary
+progress store, together with assessments that have nothing checked.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+from pathlib import Path
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+sys.path.insert(0, str(PLOTLY_DIR / 'benchmarks'))
+
+from assessment_stats import MODEL_FILES, aggregate, capability_rows, sets_matrix, store_matrix
+from bench_assessment_stats import python_loop, synthetic_pairs
+from model_snapshot import load_model
+from progress_store import ProgressStore
+
+ASSESSMENTS = 300
+
+class StoreAggregationTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = load_model(MODEL_FILES['en'])
+        cls.rows = capability_rows(cls.model)
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.store = ProgressStore(os.path.join(cls.directory.name, 'progress.db'))
+
+        assessment_ids, capability_ids = synthetic_pairs(cls.rows, ASSESSMENTS)
+        checked = defaultdict(dict)
+        for assessment_id, capability_id in zip(assessment_ids, capability_ids):
+            checked[assessment_id][capability_id] = True
+        for assessment_id, operations in checked.items():
+            cls.store.apply(assessment_id, operations)
+        # Assessments with nothing checked: every box unchecked again, or only unknown IDs toggled off
+        first = cls.rows['ids'][0]
+        cls.store.apply('team-empty-1', {first: True})
+        cls.store.apply('team-empty-1', {first: False})
+        cls.store.apply('team-empty-2', {'Unknown-L1-0': False})
+        # Another team, and a capability ID of the other locale
+        cls.store.apply('other-1', {first: True})
+        cls.store.apply('team-000000', {'技术能力-L1-0': True})
+        cls.assessments = cls.store.state('team-')[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.store.close()
+        cls.directory.cleanup()
+
+    def test_matrix_has_a_column_per_stored_assessment(self):
+        matrix, assessments, ignored = store_matrix(self.rows, self.store, 'team-')
+        self.assertEqual(matrix.shape, (len(self.rows['ids']), self.assessments))
+        self.assertIn('team-empty-1', assessments)
+        self.assertIn('team-empty-2', assessments)
+        self.assertNotIn('other-1', assessments)
+        self.assertEqual(ignored, 1)
+
+    def test_aggregation_matches_the_python_loop(self):
+        matrix, _, _ = store_matrix(self.rows, self.store, 'team-')
+        stats = aggregate(self.model, self.rows, matrix)
+        _, pairs = self.store.assessments_with_pairs('team-')
+        completed, cell_counts = python_loop(self.rows, *zip(*pairs))
+
+        self.assertEqual(stats['assessments'], self.assessments)
+        expected = [completed.get(capability_id, 0) for capability_id in self.rows['ids']]
+        self.assertEqual(stats['capabilities']['completed'].tolist(), expected)
+        for capability_id, rate in stats['capabilities']['rate'].items():
+            self.assertAlmostEqual(rate, completed.get(capability_id, 0) / self.assessments)
+
+        cell_totals = defaultdict(int)
+        for (_, cell), count in cell_counts.items():
+            cell_totals[cell] += count
+        for cell, row in stats['cells'].iterrows():
+            with self.subTest(cell=cell):
+                # Assessments with nothing checked count in the denominator
+                self.assertAlmostEqual(row['coverage'], cell_totals[cell] / (row['capabilities'] * self.assessments))
+                complete = sum(1 for (_, other), count in cell_counts.items()
+                               if other == cell and count == row['capabilities'])
+                self.assertAlmostEqual(row['complete'], complete / self.assessments)
+
+    def test_store_and_sets_agree(self):
+        assessment_ids, pairs = self.store.assessments_with_pairs('team-')
+        sets = {assessment_id: [] for assessment_id in assessment_ids}
+        for assessment_id, capability_id in pairs:
+            sets[assessment_id].append(capability_id)
+        from_store = aggregate(self.model, self.rows, store_matrix(self.rows, self.store, 'team-')[0])
+        from_sets = aggregate(self.model, self.rows, sets_matrix(self.rows, sets)[0])
+        self.assertTrue(from_store['cells'].equals(from_sets['cells']))
+        self.assertTrue(from_store['levels_reached'].equals(from_sets['levels_reached']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Incremental build cache: which inputs keep an artifact fresh and which rebuild it.
+
+Run from the repository root with ``python -m pytest plotly/tests``. The
+English ultra page is built once from a copy of the model, and every case
+starts from a copy of that output directory; the builder-source cases use
+throwaway modules.
+"""
+
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+
+import ai_maturity_fishbone_plotly_en as generator
+import build_cache
+import fishbone_build
+from build_cache import BuildCache, artifact_key, builder_source_sha256, file_sha256, version_params
+
+class BuildFreshnessTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Compressing the plotly.js bundle dominates a first build, so it is paid once
+        cls.built = tempfile.TemporaryDirectory()
+        case = cls('build')
+        case.use_directory(cls.built.name)
+        cls.first_status = case.build()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.built.cleanup()
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        shutil.copytree(self.built.name, self.directory.name, dirs_exist_ok=True)
+        self.use_directory(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def use_directory(self, directory):
+        """Model copy, output directory and summary file inside directory"""
+        self.model_file = os.path.join(directory, 'model.json')
+        if not os.path.exists(self.model_file):
+            shutil.copy(generator.DATA_FILE, self.model_file)
+        self.output_dir = os.path.join(directory, 'output')
+        self.generator = dict(generator.GENERATOR, data_file=self.model_file, output_dir=self.output_dir)
+        self.summary = os.path.join(directory, 'summary.json')
+
+    def build(self, force=False):
+        """Status of the ultra page in the build summary"""
+        exit_code = fishbone_build.main(self.generator, 'ultra', force=force, headless=True, summary_json=self.summary)
+        self.assertEqual(exit_code, 0)
+        with open(self.summary, encoding='utf-8') as f:
+            return json.load(f)['files'][0]['status']
+
+    def output(self, name):
+        return os.path.join(self.output_dir, name)
+
+    def test_unchanged_inputs_are_cached(self):
+        self.assertEqual(self.first_status, 'built')
+        self.assertEqual(self.build(), 'cached')
+        self.assertEqual(self.build(force=True), 'built')
+
+    def test_index_records_every_output_file(self):
+        entry = BuildCache(self.output_dir).entries[generator.VERSIONS['ultra']['filename']]
+        self.assertEqual(entry['model_sha256'], file_sha256(self.model_file))
+        self.assertTrue(any(name.startswith('plotly-') for name in entry['outputs']))
+        for name in entry['outputs']:
+            self.assertTrue(os.path.exists(self.output(name)), name)
+
+    def test_editing_the_model_rebuilds(self):
+        with open(self.model_file, encoding='utf-8') as f:
+            model = json.load(f)
+        first = next(iter(model['levels'].values()))
+        first['description'] += ' (edited)'
+        with open(self.model_file, 'w', encoding='utf-8') as f:
+            json.dump(model, f, ensure_ascii=False)
+        self.assertEqual(self.build(), 'built')
+        with open(self.output(generator.VERSIONS['ultra']['filename']), encoding='utf-8') as f:
+            self.assertIn('(edited)', f.read())
+        self.assertEqual(self.build(), 'cached')
+
+    def test_missing_output_files_rebuild(self):
+        entry = BuildCache(self.output_dir).entries[generator.VERSIONS['ultra']['filename']]
+        for name in (entry['outputs'][1], next(name for name in entry['outputs'] if name.startswith('plotly-'))):
+            with self.subTest(removed=name):
+                os.remove(self.output(name))
+                self.assertEqual(self.build(), 'built')
+                self.assertTrue(os.path.exists(self.output(name)))
+
+    def test_corrupt_index_rebuilds(self):
+        with open(self.output(build_cache.INDEX_FILENAME), 'w', encoding='utf-8') as f:
+            f.write('{')
+        self.assertEqual(self.build(), 'built')
+        self.assertEqual(self.build(), 'cached')
+
+class BuilderSourceTest(unittest.TestCase):
+    """Editing a builder's module or a local module it imports, directly or transitively, changes the key"""
+
+    MODULES = {
+        'fake_builder': '''
+            import fake_helper
+
+            def build(data):
+                return fake_helper.render(data)
+        ''',
+        'fake_helper': '''
+            def render(data):
+                from fake_engine import draw
+                return draw(data)
+        ''',
+        'fake_engine': '''
+            def draw(data):
+                return data
+        ''',
+    }
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for name, source in self.MODULES.items():
+            self.write(name, source)
+        sys.path.insert(0, self.directory.name)
+        self.builder = importlib.import_module('fake_builder').build
+
+    def tearDown(self):
+        sys.path.remove(self.directory.name)
+        for name in self.MODULES:
+            sys.modules.pop(name, None)
+        self.clear_hashes()
+        self.directory.cleanup()
+
+    def write(self, name, source):
+        with open(os.path.join(self.directory.name, f'{name}.py'), 'w', encoding='utf-8') as f:
+            f.write(textwrap.dedent(source))
+
+    @staticmethod
+    def clear_hashes():
+        """Forget the per-process source hashes, as the next build process would"""
+        build_cache.module_source_sha256.cache_clear()
+        build_cache.local_imports.cache_clear()
+
+    def key(self):
+        params = version_params(generator.VERSIONS['ultra'], ['plotly-0123.min.js'])
+        return artifact_key('0' * 64, self.builder, params)
+
+    def test_follows_local_imports_transitively(self):
+        dependencies = [os.path.basename(path) for path in build_cache.local_dependencies('fake_builder')]
+        self.assertEqual(dependencies, ['fake_builder.py', 'fake_engine.py', 'fake_helper.py'])
+
+    def test_editing_any_dependency_changes_the_key(self):
+        for name in self.MODULES:
+            with self.subTest(module=name):
+                before = self.key()
+                self.write(name, textwrap.dedent(self.MODULES[name]) + '# edited\n')
+                self.clear_hashes()
+                self.assertNotEqual(self.key(), before)
+
+    def test_unrelated_files_do_not_change_the_key(self):
+        before = builder_source_sha256(self.builder)
+        self.write('unrelated', 'VALUE = 1\n')
+        self.clear_hashes()
+        self.assertEqual(builder_source_sha256(self.builder), before)
+
+if __name__ == '__main__':
+    unittest.main()
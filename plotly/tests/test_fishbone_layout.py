@@ -0,0 +1,183 @@
+"""
+Layout engine, spatial hash and @@token@@ overlay of the fishbone figures.
+
+Run from the repository root with ``python -m pytest plotly/tests``. The
+layout cases use hand-written model structures (level count and capability
+count of every cell) and check that no two placed boxes overlap.
+"""
+
+import itertools
+import json
+import sys
+import unittest
+from pathlib import Path
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+sys.path.insert(0, str(PLOTLY_DIR / 'benchmarks'))
+
+import ai_maturity_fishbone_plotly as generator_zh
+import ai_maturity_fishbone_plotly_en as generator_en
+from fishbone_engine import (VARIANTS, apply_overlay, geometry_overrides, model_structure, render_figure_json,
+                             skeleton_json, variant_geometry)
+from fishbone_layout import SpatialHash, box_at, compute_layout
+from maturity_model import MaturityModel
+from synthetic_model import generate_catalog, generate_model
+
+def structure(dimensions, levels, capabilities):
+    """Structure of a synthetic model: L0 without cells, every other cell with the same capability count"""
+    return levels, tuple((None,) + (capabilities,) * (levels - 1) for _ in range(dimensions))
+
+def placed_boxes(structure, geometry, placement):
+    """(label, box) of every capability box and level description of a layout"""
+    level_count, dimension_cells = structure
+    unit_x, unit_y = geometry['unit_px']
+    cell_box = geometry['cell_box']
+    description = geometry['description']
+    boxes = []
+    for (d, l), y in placement['cells'].items():
+        count = dimension_cells[d][l]
+        lines = count if cell_box['content'] == 'list' else cell_box['summary_lines']
+        height = (lines * cell_box['line_px'] + cell_box['padding_px']) / unit_y
+        boxes.append((f'cell {d}/{l}', box_at(placement['x_positions'][l], y, cell_box['width'] / unit_x, height)))
+    height = (description['lines'] * description['line_px'] + description['arrow_px']) / unit_y
+    for l, anchor in enumerate(placement['descriptions']):
+        boxes.append((f'description {l}', box_at(placement['x_positions'][l], anchor + height / 2,
+                                                 description['width'] / unit_x, height)))
+    return boxes
+
+class SpatialHashTest(unittest.TestCase):
+
+    def test_reports_an_overlapping_box(self):
+        index = SpatialHash(2)
+        index.insert((0, 0, 3, 1))
+        self.assertEqual(index.first_overlap((2, 0.5, 4, 2)), (0, 0, 3, 1))
+
+    def test_touching_boxes_do_not_overlap(self):
+        index = SpatialHash(2)
+        index.insert((0, 0, 3, 1))
+        self.assertIsNone(index.first_overlap((3, 0, 5, 1)))
+        self.assertIsNone(index.first_overlap((0, 1, 3, 2)))
+
+    def test_finds_boxes_across_buckets_and_negative_coordinates(self):
+        index = SpatialHash(1)
+        index.insert((-5, -5, 5, -4))
+        # The query only shares the far buckets of the wide box
+        self.assertEqual(index.first_overlap((4.5, -4.5, 4.8, -4.2)), (-5, -5, 5, -4))
+        self.assertIsNone(index.first_overlap((6, -5, 7, -4)))
+
+class LayoutTest(unittest.TestCase):
+
+    STRUCTURES = {
+        'real model': None,
+        'one dimension': structure(1, 6, 4),
+        'three levels': structure(5, 3, 4),
+        'two levels': structure(2, 2, 1),
+        'empty cells': (4, ((None, 0, 3, None), (2, None, 0, 5), (None, None, None, None))),
+        '40x10': structure(40, 10, 8),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        data = generator_en.load_maturity_data(generator_en.GENERATOR['data_file'])
+        cls.STRUCTURES = dict(cls.STRUCTURES, **{'real model': model_structure(data, generator_en.CATALOG)})
+
+    def layouts(self):
+        for (name, shape), variant in itertools.product(self.STRUCTURES.items(), VARIANTS):
+            geometry = VARIANTS[variant]
+            with self.subTest(structure=name, variant=variant):
+                yield shape, geometry, compute_layout(shape, geometry)
+
+    def test_boxes_do_not_overlap(self):
+        for shape, geometry, placement in self.layouts():
+            boxes = placed_boxes(shape, geometry, placement)
+            for (name, a), (other, b) in itertools.combinations(boxes, 2):
+                overlap = a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+                self.assertFalse(overlap, f'{name} overlaps {other}')
+
+    def test_boxes_fit_the_y_range(self):
+        for shape, geometry, placement in self.layouts():
+            low, high = placement['y_range']
+            for name, box in placed_boxes(shape, geometry, placement):
+                self.assertGreaterEqual(box[1], low, name)
+                self.assertLessEqual(box[3], high, name)
+
+    def test_every_cell_is_placed_on_its_side(self):
+        for shape, geometry, placement in self.layouts():
+            level_count, dimension_cells = shape
+            expected = {(d, l) for d, counts in enumerate(dimension_cells)
+                        for l, count in enumerate(counts) if count is not None}
+            self.assertEqual(set(placement['cells']), expected)
+            self.assertEqual(len(placement['x_positions']), level_count)
+            self.assertEqual(len(placement['descriptions']), level_count)
+            for (d, _), y in placement['cells'].items():
+                self.assertEqual(y > 0, placement['rows'][d] > 0)
+
+    def test_fixed_size_variant_grows_with_the_model(self):
+        small = compute_layout(structure(5, 6, 4), VARIANTS['ultra'])['size']
+        large = compute_layout(structure(40, 10, 8), VARIANTS['ultra'])['size']
+        # Never below the variant's nominal size
+        self.assertGreaterEqual(small[0], 1900)
+        self.assertGreaterEqual(small[1], 1200)
+        self.assertGreater(large[0], small[0])
+        self.assertGreater(large[1], small[1])
+
+    def test_interactive_variant_is_autosized_until_it_outgrows_the_viewport(self):
+        self.assertIsNone(compute_layout(self.STRUCTURES['real model'], VARIANTS['interactive'])['size'])
+        width, height = compute_layout(structure(10, 6, 6), VARIANTS['interactive'])['size']
+        self.assertIsNone(width)
+        self.assertGreater(height, 0)
+
+class OverlayTest(unittest.TestCase):
+
+    def test_substitutes_whole_and_embedded_tokens_with_escaping(self):
+        skeleton = json.dumps({'value': '@@whole@@', 'text': '<b>@@embedded@@</b>', 'flag': '@@flag@@'})
+        tricky = 'quote " backslash \\ newline \n tab \t 中文 @@whole@@'
+        figure = json.loads(apply_overlay(skeleton, {'whole': [1, None, tricky], 'embedded': tricky, 'flag': False}))
+        self.assertEqual(figure, {'value': [1, None, tricky], 'text': f'<b>{tricky}</b>', 'flag': False})
+
+    def test_rendered_figures_leave_no_tokens(self):
+        for generator in (generator_en, generator_zh):
+            data = generator.load_maturity_data(generator.GENERATOR['data_file'])
+            for variant, batched in itertools.product(VARIANTS, (True, False)):
+                with self.subTest(generator=generator.__name__, variant=variant, batched=batched):
+                    figure_json = render_figure_json(data, generator.CATALOG, variant, batched)
+                    self.assertNotIn('@@', figure_json)
+                    json.loads(figure_json)
+
+    def test_model_text_survives_the_overlay(self):
+        model = generate_model(dimensions=3, levels=4, capabilities=2)
+        capability = 'Say "hi" \\ to C:\\temp and 中文'
+        model['levels']['L2']['capabilities']['Dimension 2'][0] = capability
+        data = MaturityModel.from_dict(model)
+        catalog = generate_catalog(generator_en.CATALOG, 3)
+        figure = json.loads(render_figure_json(data, catalog, 'ultra'))
+        texts = [annotation['text'] for annotation in figure['layout']['annotations']]
+        self.assertTrue(any(capability in text for text in texts))
+
+class GeometryOverridesTest(unittest.TestCase):
+
+    def test_nested_overrides_merge_without_touching_the_defaults(self):
+        geometry = variant_geometry('ultra', json.dumps({'cell_box': {'width': 280}, 'layout': {'margin': {'l': 100}}}))
+        self.assertEqual(geometry['cell_box']['width'], 280)
+        self.assertEqual(geometry['cell_box']['align'], 'left')
+        self.assertEqual(geometry['layout']['margin'], dict(l=100, r=100, t=100, b=100))
+        self.assertEqual(VARIANTS['ultra']['cell_box']['width'], 400)
+        self.assertEqual(VARIANTS['ultra']['layout']['margin']['l'], 200)
+
+    def test_locales_keep_their_own_skeleton_geometry(self):
+        widths = {'ultra': (280, 400), 'interactive': (120, 200)}
+        for variant, (zh_width, en_width) in widths.items():
+            for generator, width in ((generator_zh, zh_width), (generator_en, en_width)):
+                data = generator.load_maturity_data(generator.GENERATOR['data_file'])
+                overrides = geometry_overrides(generator.CATALOG, variant)
+                figure = json.loads(skeleton_json(model_structure(data, generator.CATALOG), variant, False, overrides))
+                with self.subTest(generator=generator.__name__, variant=variant):
+                    cell_widths = {a['width'] for a in figure['layout']['annotations'] if '.list@@' in a['text']
+                                   or '.summary@@' in a['text']}
+                    self.assertEqual(cell_widths, {width})
+                    hover_only = [t for t in figure['data'] if t.get('marker', {}).get('opacity') == 0]
+                    self.assertEqual(bool(hover_only), generator is generator_en)
+
+if __name__ == '__main__':
+    unittest.main()
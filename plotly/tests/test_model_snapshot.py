@@ -0,0 +1,162 @@
+"""
+Typed MaturityModel and its compiled binary snapshots.
+
+Run from the repository root with ``python -m pytest plotly/tests``. Models
+are copied into a temporary directory, so their snapshots are written there.
+"""
+
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+sys.path.insert(0, str(PLOTLY_DIR / 'benchmarks'))
+
+import model_snapshot
+from maturity_model import MaturityModel
+from model_snapshot import ModelValidationError, load_model, read_snapshot, snapshot_path, validate_model
+from synthetic_model import generate_model
+
+RESOURCE_DIR = PLOTLY_DIR.parent / 'resource'
+MODEL_FILES = [RESOURCE_DIR / 'model_of_level.json', RESOURCE_DIR / 'model_of_level_en.json']
+
+def read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def write_json(path, model):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(model, f, ensure_ascii=False)
+
+class MaturityModelTest(unittest.TestCase):
+
+    def models(self):
+        for path in MODEL_FILES:
+            yield path.name, read_json(path)
+        yield 'synthetic', generate_model(dimensions=7, levels=4, capabilities=3)
+        # Levels without capabilities, an empty cell and multi-byte text
+        yield 'edge cases', {'levels': {
+            'L0': {'title': 'Start', 'description': '', 'features': ''},
+            'L1': {'title': '一', 'description': 'd', 'features': 'f',
+                   'capabilities': {'A': ['α', '"quoted"\\'], 'B': []}},
+            'L2': {'title': 'Empty', 'description': 'd', 'features': 'f', 'capabilities': {}},
+            'L3': {'title': 'B first', 'description': 'd', 'features': 'f', 'capabilities': {'B': ['b'], 'A': ['a']}},
+        }}
+
+    def test_round_trips_through_to_dict(self):
+        for name, model in self.models():
+            with self.subTest(model=name):
+                self.assertEqual(MaturityModel.from_dict(model).to_dict(), model)
+
+    def test_round_trips_through_tables_and_pickle(self):
+        for name, model in self.models():
+            with self.subTest(model=name):
+                compiled = MaturityModel.from_dict(model, 'abc')
+                rebuilt = MaturityModel.from_tables(*compiled.tables(), 'abc')
+                self.assertEqual(rebuilt.to_dict(), model)
+                self.assertEqual(rebuilt.capabilities_index(), compiled.capabilities_index())
+                self.assertEqual(pickle.loads(pickle.dumps(compiled)).to_dict(), model)
+
+    def test_capability_lookups(self):
+        model = dict(self.models())['edge cases']
+        compiled = MaturityModel.from_dict(model)
+        self.assertEqual(len(compiled), 4)
+        self.assertEqual(compiled.capabilities('A', 'L1'), ['α', '"quoted"\\'])
+        self.assertEqual(compiled.capability_count('B', 'L1'), 0)
+        self.assertIsNone(compiled.capabilities('A', 'L0'))
+        self.assertIsNone(compiled.capabilities('A', 'L2'))
+
+    def test_invalid_models_are_rejected(self):
+        invalid = [
+            [],
+            {'levels': []},
+            {'levels': {'L0': {'title': 'T', 'description': 'D'}}},
+            {'levels': {'L0': {'title': 'T', 'description': 'D', 'features': 'F', 'capabilities': []}}},
+            {'levels': {'L0': {'title': 'T', 'description': 'D', 'features': 'F', 'capabilities': {'A': [1]}}}},
+            {'levels': {'L0': {'title': 'T', 'description': 'D', 'features': 'F', 'capabilities': {'A': ['a\0b']}}}},
+        ]
+        for model in invalid:
+            with self.subTest(model=str(model)[:60]):
+                with self.assertRaises(ModelValidationError):
+                    validate_model(model)
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.model_file = os.path.join(self.directory.name, 'model.json')
+        shutil.copy(MODEL_FILES[1], self.model_file)
+        self.snapshot = snapshot_path(self.model_file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def source_sha256(self):
+        from build_cache import file_sha256
+        return file_sha256(self.model_file)
+
+    def test_first_load_compiles_the_snapshot(self):
+        self.assertFalse(os.path.exists(self.snapshot))
+        model = load_model(self.model_file)
+        self.assertEqual(model.to_dict(), read_json(self.model_file))
+        self.assertEqual(model.source_sha256, self.source_sha256())
+        self.assertIsNotNone(read_snapshot(self.snapshot, self.source_sha256()))
+
+    def test_snapshot_load_matches_the_source(self):
+        load_model(self.model_file)
+        # The second load goes through the snapshot
+        loaded = load_model(self.model_file)
+        self.assertEqual(loaded.to_dict(), read_json(self.model_file))
+        self.assertEqual(loaded.capabilities_index(), MaturityModel.from_dict(read_json(self.model_file)).capabilities_index())
+
+    def test_editing_the_source_invalidates_the_snapshot(self):
+        load_model(self.model_file)
+        stale_sha256 = self.source_sha256()
+        model = read_json(self.model_file)
+        level = next(iter(model['levels'].values()))
+        level['title'] = 'Edited title'
+        write_json(self.model_file, model)
+
+        self.assertIsNone(read_snapshot(self.snapshot, self.source_sha256()))
+        self.assertEqual(load_model(self.model_file).to_dict(), model)
+        # Recompiled for the new source
+        self.assertIsNotNone(read_snapshot(self.snapshot, self.source_sha256()))
+        self.assertIsNone(read_snapshot(self.snapshot, stale_sha256))
+
+    def test_unreadable_snapshots_are_recompiled(self):
+        load_model(self.model_file)
+        with open(self.snapshot, 'rb') as f:
+            valid = f.read()
+        corruptions = {
+            'empty': b'',
+            'truncated header': valid[:10],
+            'truncated tables': valid[:model_snapshot.HEADER.size + 40],
+            'bad magic': b'XXXX' + valid[4:],
+        }
+        for name, content in corruptions.items():
+            with self.subTest(snapshot=name):
+                with open(self.snapshot, 'wb') as f:
+                    f.write(content)
+                self.assertIsNone(read_snapshot(self.snapshot, self.source_sha256()))
+                self.assertEqual(load_model(self.model_file).to_dict(), read_json(self.model_file))
+
+    def test_snapshot_format_or_interpreter_change_invalidates(self):
+        load_model(self.model_file)
+        for attribute, value in (('SNAPSHOT_FORMAT', model_snapshot.SNAPSHOT_FORMAT + 1),
+                                 ('INTERPRETER_TAG', b'other-interpreter')):
+            with self.subTest(changed=attribute):
+                previous = getattr(model_snapshot, attribute)
+                setattr(model_snapshot, attribute, value)
+                try:
+                    self.assertIsNone(read_snapshot(self.snapshot, self.source_sha256()))
+                finally:
+                    setattr(model_snapshot, attribute, previous)
+
+if __name__ == '__main__':
+    unittest.main()
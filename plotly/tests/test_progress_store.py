@@ -0,0 +1,149 @@
+"""
+Assessment progress store and the /api/progress endpoints.
+
+Run from the repository root with ``python -m pytest plotly/tests``. Every
+case uses its own database in a temporary directory.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR))
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+
+# Keep the progress database out of the working tree
+os.environ.setdefault('SERVER_PROGRESS_DB', os.path.join(tempfile.mkdtemp(), 'progress.db'))
+
+import server
+from progress_store import ProgressStore
+
+class ProgressStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'nested', 'progress.db')
+        self.store = ProgressStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_every_batch_increments_the_revision(self):
+        self.assertEqual(self.store.revision('team'), 0)
+        self.assertEqual(self.store.apply('team', {'a': True, 'b': True}), 1)
+        self.assertEqual(self.store.apply('team', {'b': False}), 2)
+        # A batch that changes nothing still counts, so pollers see the revision move
+        self.assertEqual(self.store.apply('team', {'a': True}), 3)
+        self.assertEqual(self.store.completed('team'), (3, ['a']))
+        self.assertEqual(self.store.revision('other'), 0)
+
+    def test_changes_since_a_revision(self):
+        self.store.apply('team', {'a': True, 'b': True, 'c': True})
+        self.store.apply('team', {'b': False})
+        self.store.apply('team', {'c': True, 'd': True})
+        self.assertEqual(self.store.changes('team', 0), (3, {'a': True, 'b': False, 'c': True, 'd': True}))
+        self.assertEqual(self.store.changes('team', 1), (3, {'b': False, 'd': True}))
+        # A row rewritten with its current value keeps the revision it changed at
+        self.assertEqual(self.store.changes('team', 2), (3, {'d': True}))
+        self.assertEqual(self.store.changes('team', 3), (3, {}))
+
+    def test_prefix_selects_assessments_by_id(self):
+        self.store.apply('team-a.1', {'x': True, 'y': True})
+        self.store.apply('team-a.2', {'x': True})
+        self.store.apply('team-a.2', {'z': False})
+        self.store.apply('team-b.1', {'y': True})
+        # 'team-a/' sorts right after every 'team-a.*' ID: the range must not leak into it
+        self.store.apply('team-a/', {'x': True})
+        self.assertEqual(self.store.state('team-a.'), (2, 3))
+        self.assertEqual(self.store.state('team-'), (4, 5))
+        self.assertEqual(self.store.state(), (4, 5))
+        self.assertEqual(self.store.state('nobody'), (0, 0))
+        self.assertEqual(sorted(self.store.completed_pairs('team-a.')),
+                         [('team-a.1', 'x'), ('team-a.1', 'y'), ('team-a.2', 'x')])
+        self.assertEqual(len(self.store.completed_pairs()), 5)
+
+    def test_reopens_after_close(self):
+        self.store.apply('team', {'a': True})
+        self.store.close()
+        self.assertEqual(self.store.apply('team', {'b': True}), 2)
+        self.store.close()
+        reopened = ProgressStore(self.path)
+        try:
+            self.assertEqual(reopened.completed('team'), (2, ['a', 'b']))
+        finally:
+            reopened.close()
+
+class ProgressApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_store = server.progress_store
+        server.progress_store = ProgressStore(os.path.join(self.directory.name, 'progress.db'))
+        self.client = server.app.test_client()
+
+    def tearDown(self):
+        server.progress_store.close()
+        server.progress_store = self.previous_store
+        self.directory.cleanup()
+
+    def post(self, assessment_id, operations):
+        return self.client.post(f'/api/progress/{assessment_id}', json={'operations': operations})
+
+    def test_applies_batches_and_returns_changes(self):
+        response = self.post('team', [{'id': 'a', 'done': True}, {'id': 'b', 'done': True}, {'id': 'a', 'done': False}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'assessment': 'team', 'revision': 1, 'applied': 2})
+        self.post('team', [{'id': 'c', 'done': True}])
+
+        full = self.client.get('/api/progress/team')
+        self.assertEqual(full.get_json(), {'assessment': 'team', 'revision': 2, 'completed': ['b', 'c']})
+        self.assertEqual(full.headers['Cache-Control'], 'no-store')
+        delta = self.client.get('/api/progress/team?since=1').get_json()
+        self.assertEqual(delta, {'assessment': 'team', 'revision': 2, 'changes': {'c': True}})
+
+    def test_empty_batch_keeps_the_revision(self):
+        self.post('team', [{'id': 'a', 'done': True}])
+        self.assertEqual(self.post('team', []).get_json()['revision'], 1)
+
+    def test_invalid_operations_are_rejected(self):
+        invalid = [
+            {'operations': 'a'},
+            {'operations': [{'id': 'a'}]},
+            {'operations': [{'id': 'a', 'done': 1}]},
+            {'operations': [{'id': '', 'done': True}]},
+            {'operations': [{'id': 'a' * (server.CAPABILITY_ID_MAX_LENGTH + 1), 'done': True}]},
+            {'operations': ['a']},
+            ['a'],
+        ]
+        for payload in invalid:
+            with self.subTest(payload=str(payload)[:60]):
+                self.assertEqual(self.client.post('/api/progress/team', json=payload).status_code, 400)
+        self.assertEqual(self.client.post('/api/progress/team', data='{').status_code, 400)
+        # Nothing of a rejected batch is applied
+        self.assertEqual(self.client.get('/api/progress/team').get_json()['revision'], 0)
+
+    def test_too_many_operations_are_rejected(self):
+        operations = [{'id': str(i), 'done': True} for i in range(server.PROGRESS_MAX_OPERATIONS + 1)]
+        self.assertEqual(self.post('team', operations).status_code, 413)
+
+    def test_invalid_or_stale_revisions_are_rejected(self):
+        self.post('team', [{'id': 'a', 'done': True}])
+        for since in ('abc', '-1', '1.5', ''):
+            with self.subTest(since=since):
+                self.assertEqual(self.client.get(f'/api/progress/team?since={since}').status_code, 400)
+        # A client ahead of the server (e.g. after a database reset) has to reload the full state
+        self.assertEqual(self.client.get('/api/progress/team?since=2').status_code, 400)
+        self.assertEqual(self.client.get('/api/progress/team?since=1').status_code, 200)
+
+    def test_invalid_assessment_ids_are_rejected(self):
+        for assessment_id in ('a' * 65, 'team%20a', 'team:a'):
+            with self.subTest(assessment_id=assessment_id):
+                self.assertEqual(self.client.get(f'/api/progress/{assessment_id}').status_code, 400)
+                self.assertEqual(self.post(assessment_id, []).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+LRU render cache, and how the server keys pages and statistics into it.
+
+Run from the repository root with ``python -m pytest plotly/tests``. The
+server cases render into a temporary, empty output directory.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from werkzeug.datastructures import MultiDict
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR))
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+
+# Keep the progress database out of the working tree
+os.environ.setdefault('SERVER_PROGRESS_DB', os.path.join(tempfile.mkdtemp(), 'progress.db'))
+
+import server
+from progress_store import ProgressStore
+from render_cache import RenderCache
+
+class RenderCacheTest(unittest.TestCase):
+
+    def test_evicts_least_recently_used_entries_by_size(self):
+        cache = RenderCache(100)
+        cache.put('a', 'A', 40)
+        cache.put('b', 'B', 40)
+        # Reading a marks it as recently used, so b goes first
+        self.assertEqual(cache.get('a'), 'A')
+        cache.put('c', 'C', 40)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), ('A', 'C'))
+        cache.put('d', 'D', 90)
+        self.assertEqual(list(cache.entries), ['d'])
+        self.assertEqual(cache.stats()['bytes'], 90)
+        self.assertEqual(cache.stats()['evictions'], 3)
+
+    def test_replacing_an_entry_updates_the_size(self):
+        cache = RenderCache(100)
+        cache.put('a', 'A', 60)
+        cache.put('a', 'A2', 30)
+        cache.put('b', 'B', 70)
+        self.assertEqual((cache.get('a'), cache.get('b')), ('A2', 'B'))
+        self.assertEqual(cache.stats()['bytes'], 100)
+
+    def test_entries_over_the_budget_are_not_cached(self):
+        cache = RenderCache(100)
+        cache.put('a', 'A', 50)
+        self.assertEqual(cache.get_or_render('big', lambda: ('BIG', 101)), ('BIG', False))
+        self.assertIsNone(cache.get('big'))
+        self.assertEqual(cache.get('a'), 'A')
+
+    def test_concurrent_misses_render_once(self):
+        cache = RenderCache(100)
+        calls = []
+
+        def render():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value', 10
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_render('key', render)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(hit for _, hit in results), [False] + [True] * 7)
+        self.assertEqual(cache.stats()['hits'], 7)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+class ServerRenderCacheTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.output = tempfile.TemporaryDirectory()
+        cls.previous = server.outpt_dir, server.render_cache, server.stats_cache, server.progress_store
+        server.outpt_dir = Path(cls.output.name)
+        server.progress_store = ProgressStore(os.path.join(cls.output.name, 'progress.db'))
+        server.plotlyjs_assets.clear()
+        cls.client = server.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        server.progress_store.close()
+        server.outpt_dir, server.render_cache, server.stats_cache, server.progress_store = cls.previous
+        server.plotlyjs_assets.clear()
+        cls.output.cleanup()
+
+    def setUp(self):
+        server.render_cache = RenderCache(server.RENDER_CACHE_MAX_BYTES)
+        server.stats_cache = RenderCache(server.STATS_CACHE_MAX_BYTES)
+
+    def render(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response.headers['X-Render-Cache']
+
+    def test_render_options_default_and_ignore_unknown_arguments(self):
+        default = server.render_options(MultiDict())
+        self.assertEqual(default, (('plotlyjs', 'local'),))
+        self.assertEqual(server.render_options(MultiDict({'plotlyjs': 'local', 'other': 'x'})), default)
+        self.assertEqual(server.render_options(MultiDict({'plotlyjs': 'cdn'})), (('plotlyjs', 'cdn'),))
+
+    def test_equivalent_urls_share_one_render(self):
+        self.assertEqual(self.render('/render/en/ultra'), 'miss')
+        self.assertEqual(self.render('/render/en/ultra?plotlyjs=local'), 'hit')
+        self.assertEqual(self.render('/render/en/ultra?utm_source=mail'), 'hit')
+        self.assertEqual(self.render('/render/en/ultra?plotlyjs=cdn'), 'miss')
+        self.assertEqual(server.render_cache.stats()['entries'], 2)
+
+    def test_invalid_option_is_rejected(self):
+        response = self.client.get('/render/en/ultra?plotlyjs=inline')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(server.render_cache.stats()['entries'], 0)
+
+    def test_statistics_never_evict_pages(self):
+        self.render('/render/en/ultra')
+        first = self.client.get('/api/stats/en?prefix=team-a')
+        self.assertEqual(first.status_code, 200)
+        # Room for one statistics body: every other prefix evicts the previous one
+        server.stats_cache = RenderCache(len(first.get_data()) + 1)
+        for prefix in ('team-a', 'team-b', 'team-c'):
+            self.assertEqual(self.client.get(f'/api/stats/en?prefix={prefix}').status_code, 200)
+        self.assertEqual(server.stats_cache.stats()['entries'], 1)
+        self.assertEqual(server.stats_cache.stats()['evictions'], 2)
+        self.assertEqual(server.render_cache.stats()['entries'], 1)
+        self.assertEqual(self.render('/render/en/ultra'), 'hit')
+
+    def test_statistics_follow_progress_changes(self):
+        before = self.client.get('/api/stats/en?prefix=team-').get_json()
+        server.progress_store.apply('team-x', {})
+        after = self.client.get('/api/stats/en?prefix=team-').get_json()
+        self.assertEqual(after['assessments'], before['assessments'] + 1)
+        self.assertEqual(server.stats_cache.stats()['misses'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Conditional, range and content-negotiated responses of the in-memory artifact cache.
+
+Run from the repository root with ``python -m pytest plotly/tests``. A fake
+plotly.js bundle and hand-written precompressed siblings are served from a
+temporary output directory through the /plotly-<fingerprint>.min.js route.
+"""
+
+import gzip
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR))
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+
+# Keep the progress database out of the working tree
+os.environ.setdefault('SERVER_PROGRESS_DB', os.path.join(tempfile.mkdtemp(), 'progress.db'))
+
+import server
+
+URL = '/plotly-0123456789abcdef.min.js'
+BODY = b'/* plotly.js */ ' + b'var x = 1;\n' * 200
+# The server never decodes the siblings, any bytes stand for a brotli body
+BROTLI_BODY = b'brotli bytes'
+
+class SendEntryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output = tempfile.TemporaryDirectory()
+        self.previous_output = server.outpt_dir
+        server.outpt_dir = Path(self.output.name)
+        server.artifact_cache.clear()
+        self.path = server.outpt_dir / URL[1:]
+        self.path.write_bytes(BODY)
+        self.gzip_body = gzip.compress(BODY, mtime=0)
+        self.path.with_name(self.path.name + '.gz').write_bytes(self.gzip_body)
+        self.path.with_name(self.path.name + '.br').write_bytes(BROTLI_BODY)
+        self.digest = hashlib.sha256(BODY).hexdigest()
+        self.client = server.app.test_client()
+
+    def tearDown(self):
+        server.outpt_dir = self.previous_output
+        server.artifact_cache.clear()
+        self.output.cleanup()
+
+    def get(self, encoding=None, **headers):
+        if encoding is not None:
+            headers['Accept-Encoding'] = encoding
+        return self.client.get(URL, headers=headers)
+
+    def test_identity_response_headers(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), BODY)
+        self.assertEqual(response.mimetype, 'application/javascript')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('Accept-Encoding', response.vary)
+        self.assertEqual(response.get_etag(), (self.digest, False))
+        self.assertEqual(response.last_modified.timestamp(), int(self.path.stat().st_mtime))
+        self.assertEqual(response.headers['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+
+    def test_negotiates_the_best_accepted_encoding(self):
+        cases = [
+            ('gzip', 'gzip', self.gzip_body),
+            ('gzip, br', 'br', BROTLI_BODY),
+            ('br;q=0, gzip', 'gzip', self.gzip_body),
+            ('deflate', None, BODY),
+            ('*', 'br', BROTLI_BODY),
+        ]
+        for accept, encoding, body in cases:
+            with self.subTest(accept=accept):
+                response = self.get(accept)
+                self.assertEqual(response.headers.get('Content-Encoding'), encoding)
+                self.assertEqual(response.get_data(), body)
+                self.assertIn('Accept-Encoding', response.vary)
+                # Every encoding is its own representation with its own strong ETag
+                expected = self.digest if encoding is None else f'{self.digest}-{encoding}'
+                self.assertEqual(response.get_etag(), (expected, False))
+
+    def test_stale_siblings_are_ignored(self):
+        older = self.path.stat().st_mtime_ns - 10 ** 9
+        os.utime(self.path.with_name(self.path.name + '.gz'), ns=(older, older))
+        response = self.get('gzip')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.get_data(), BODY)
+
+    def test_if_none_match(self):
+        response = self.get(**{'If-None-Match': f'"{self.digest}"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(self.get('gzip', **{'If-None-Match': f'"{self.digest}-gzip"'}).status_code, 304)
+        # The identity ETag does not validate the gzip representation
+        self.assertEqual(self.get('gzip', **{'If-None-Match': f'"{self.digest}"'}).status_code, 200)
+
+    def test_if_modified_since(self):
+        modified = datetime.fromtimestamp(int(self.path.stat().st_mtime), timezone.utc)
+        self.assertEqual(self.get(**{'If-Modified-Since': format_datetime(modified, usegmt=True)}).status_code, 304)
+        earlier = format_datetime(modified - timedelta(hours=1), usegmt=True)
+        self.assertEqual(self.get(**{'If-Modified-Since': earlier}).status_code, 200)
+
+    def test_range_requests(self):
+        response = self.get(Range='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.get_data(), BODY[:10])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 0-9/{len(BODY)}')
+
+        # Ranges apply to the bytes of the chosen encoding
+        response = self.get('gzip', Range='bytes=-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.get_data(), self.gzip_body[-5:])
+        self.assertEqual(response.headers['Content-Range'],
+                         f'bytes {len(self.gzip_body) - 5}-{len(self.gzip_body) - 1}/{len(self.gzip_body)}')
+
+        response = self.get(Range=f'bytes={len(BODY)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers['Content-Range'], f'bytes */{len(BODY)}')
+
+    def test_head(self):
+        response = self.client.head(URL, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(int(response.headers['Content-Length']), len(self.gzip_body))
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.get_etag(), (f'{self.digest}-gzip', False))
+
+    def test_cache_reloads_a_rewritten_file(self):
+        self.assertEqual(self.get().get_data(), BODY)
+        self.assertIs(server.load_artifact(self.path), server.load_artifact(self.path))
+        self.path.write_bytes(b'rebuilt')
+        later = self.path.stat().st_mtime_ns + 10 ** 9
+        os.utime(self.path, ns=(later, later))
+        response = self.get()
+        self.assertEqual(response.get_data(), b'rebuilt')
+        self.assertEqual(response.get_etag(), (hashlib.sha256(b'rebuilt').hexdigest(), False))
+        # The siblings are now older than the file and no longer served
+        self.assertEqual(self.get('gzip, br').get_data(), b'rebuilt')
+
+    def test_missing_file(self):
+        self.path.unlink()
+        self.assertEqual(self.get().status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Every chart linked from the home page loads, and so does every script it references.
+
+Run from the repository root with ``python -m pytest plotly/tests`` (or
+``python -m unittest discover plotly/tests``). The pages are built into a
+temporary output directory, and a second case serves the same cards from an
+empty one, where every page is rendered on demand.
+"""
+
+import os
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+PLOTLY_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLOTLY_DIR))
+sys.path.insert(0, str(PLOTLY_DIR / 'script'))
+
+# Keep the progress database out of the working tree
+os.environ.setdefault('SERVER_PROGRESS_DB', os.path.join(tempfile.mkdtemp(), 'progress.db'))
+
+import build_all
+import server
+
+CARD_LINK = re.compile(r'<a href="([^"]+)" class="chart-button">')
+SCRIPT_SRC = re.compile(r'<script[^>]*\ssrc="([^"]+)"')
+
+class ServedPagesTest(unittest.TestCase):
+    """Cards and scripts of a server whose output directory holds every built page"""
+
+    build = True
+
+    @classmethod
+    def setUpClass(cls):
+        cls.output = tempfile.TemporaryDirectory()
+        if cls.build:
+            exit_code = build_all.main(output_dir=cls.output.name, workers=1)
+            assert exit_code == 0, f'build_all exited with {exit_code}'
+        cls.previous_output = server.outpt_dir
+        server.outpt_dir = Path(cls.output.name)
+        cls.reset_caches()
+        cls.client = server.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        server.outpt_dir = cls.previous_output
+        cls.reset_caches()
+        cls.output.cleanup()
+
+    @staticmethod
+    def reset_caches():
+        server.manifest = None
+        server.artifact_cache.clear()
+        server.plotlyjs_assets.clear()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, f'GET {url}')
+        return response
+
+    def card_urls(self):
+        return CARD_LINK.findall(self.get('/').get_data(as_text=True))
+
+    def test_home_lists_the_routed_pages(self):
+        urls = self.card_urls()
+        for url in server.PAGE_ROUTES.values():
+            self.assertIn(url, urls)
+
+    def test_every_card_loads_with_its_scripts(self):
+        for url in self.card_urls():
+            with self.subTest(page=url):
+                page = self.get(url).get_data(as_text=True)
+                scripts = SCRIPT_SRC.findall(page)
+                self.assertTrue(any('plotly' in src for src in scripts), f'{url} loads no plotly.js')
+                for src in scripts:
+                    # Resolve the src as a browser would, relative to the page's URL
+                    script_url = urljoin(f'http://localhost{url}', src)
+                    if urlparse(script_url).netloc != 'localhost':
+                        continue
+                    response = self.get(urlparse(script_url).path)
+                    self.assertEqual(response.mimetype, 'application/javascript', script_url)
+
+class OnDemandPagesTest(ServedPagesTest):
+    """The same cards and scripts from an empty output directory, every page rendered on demand"""
+
+    build = False
+
+    def test_home_lists_the_routed_pages(self):
+        self.assertEqual(self.card_urls(), list(server.PAGE_ROUTES.values()))
+
+if __name__ == '__main__':
+    unittest.main()